@@ -1,9 +1,12 @@
 from functools import lru_cache
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# "transformers" - plain HF pipelines; "onnx" - ONNX Runtime via optimum; "torch-int8" - dynamic int8 quantization
+InferenceBackend = Literal["transformers", "onnx", "torch-int8"]
+
 
 class Settings(BaseSettings):
     """Environment configuration for the ML microservice."""
@@ -33,6 +36,15 @@ class Settings(BaseSettings):
     SENTIMENT_MODEL_REVISION: Optional[str] = None
     NER_MODEL_REVISION: Optional[str] = None
 
+    # Inference backend per model; "onnx" and "torch-int8" are CPU-only
+    SUMMARIZATION_BACKEND: InferenceBackend = "transformers"
+    SENTIMENT_BACKEND: InferenceBackend = "transformers"
+    NER_BACKEND: InferenceBackend = "transformers"
+    ONNX_MODEL_DIR: Optional[str] = Field(
+        default=None,
+        description="Output dir of scripts/export_models.py (one subdir per model); exported on load if missing.",
+    )
+
     # Runtime execution
     TORCH_DEVICE: Literal["cpu", "cuda", "cuda:0"] = "cpu"
     MAX_SUMMARY_TOKENS: int = Field(default=180, ge=32, le=512)
@@ -42,6 +54,37 @@ class Settings(BaseSettings):
     SUMMARIZATION_NUM_BEAMS: int = Field(default=4, ge=1, le=8)
     SUMMARY_LENGTH_PENALTY: float = 1.0
 
+    # Startup: "lazy" loads models on first request, "preload" loads PRELOAD_MODELS in the background
+    # at startup, "warmup" additionally runs a warmup batch through them. /ready turns green when done.
+    STARTUP_MODE: Literal["lazy", "preload", "warmup"] = "warmup"
+    PRELOAD_MODELS: List[Literal["summarization", "sentiment", "ner"]] = Field(
+        default_factory=lambda: ["summarization", "sentiment", "ner"],
+        description='Models loaded at startup, e.g. PRELOAD_MODELS=["sentiment","ner"].',
+    )
+
+    # Dynamic micro-batching: concurrent requests to one model run as a single padded batch
+    SUMMARIZATION_BATCH_SIZE: int = Field(default=8, ge=1, le=64)
+    SENTIMENT_BATCH_SIZE: int = Field(default=32, ge=1, le=256)
+    NER_BATCH_SIZE: int = Field(default=16, ge=1, le=256)
+    BATCH_MAX_WAIT_MS: float = Field(
+        default=10.0,
+        ge=0.0,
+        le=1000.0,
+        description="How long the first queued request waits for others to join its batch.",
+    )
+
+    # Inference result cache: repeated texts (syndicated stories, retried syncs) skip the models
+    INFERENCE_CACHE_SIZE: int = Field(
+        default=4096,
+        ge=0,
+        description="Results kept in the in-memory LRU per service; 0 disables caching.",
+    )
+    INFERENCE_CACHE_PATH: Optional[str] = Field(
+        default=None,
+        description="SQLite file for the on-disk cache tier (e.g. /models/cache/results.sqlite3).",
+    )
+    INFERENCE_CACHE_DISK_MAX_ENTRIES: int = Field(default=100_000, ge=1)
+
     LOGGER_NAME: str = "newsagent.ml"
 
     # Remote LLaMA/OpenAI-compatible summarization
@@ -63,6 +106,10 @@ class Settings(BaseSettings):
             return 0
         return -1
 
+    def backend_for(self, kind: str) -> InferenceBackend:
+        """Inference backend configured for a model kind ("summarization", "sentiment", "ner")."""
+        return getattr(self, f"{kind.upper()}_BACKEND")
+
     def remote_llama_enabled(self) -> bool:
         return bool(self.LLAMA_API_BASE and self.LLAMA_API_KEY and self.LLAMA_MODEL)
 
@@ -1,20 +1,35 @@
+import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Awaitable, Callable, List
 
 import uvicorn
 from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi.responses import JSONResponse
 
 from app.core.config import Settings, get_settings
 from app.schemas import (
+    BatchRequest,
+    FullAnalysisBatchItem,
+    FullAnalysisBatchRequest,
+    FullAnalysisBatchResponse,
     FullAnalysisRequest,
     FullAnalysisResponse,
+    NerBatchItem,
+    NerBatchResponse,
     NerRequest,
     NerResponse,
+    SentimentBatchItem,
+    SentimentBatchResponse,
     SentimentRequest,
     SentimentResponse,
+    SummarizationBatchItem,
+    SummarizationBatchRequest,
+    SummarizationBatchResponse,
     SummarizationRequest,
     SummarizationResponse,
+    text_min_length,
 )
 from app.services.pipeline import TextAnalyticsService
 
@@ -22,13 +37,36 @@ from app.services.pipeline import TextAnalyticsService
 def create_app(settings: Settings) -> FastAPI:
     """Application factory for easier testing."""
 
+    service = TextAnalyticsService(settings)
+    # "starting" until the startup models are loaded (and warmed up), then "ready" or "failed"
+    readiness: dict[str, Any] = {"status": "starting", "error": None}
+
+    async def prepare_models(logger: logging.Logger) -> None:
+        started = time.perf_counter()
+        try:
+            await service.warmup(settings.PRELOAD_MODELS, run_batch=settings.STARTUP_MODE == "warmup")
+        except Exception as exc:
+            logger.exception("Model %s failed", settings.STARTUP_MODE)
+            readiness.update(status="failed", error=str(exc))
+            return
+        readiness["status"] = "ready"
+        logger.info("Models ready in %.1f s (%s)", time.perf_counter() - started, settings.STARTUP_MODE)
+
     @asynccontextmanager
     async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
         logger = logging.getLogger(settings.LOGGER_NAME)
         logger.info("Starting ML microservice (version=%s)", settings.VERSION)
+        startup_task = None
+        if settings.STARTUP_MODE == "lazy":
+            readiness["status"] = "ready"
+        else:
+            # Loading runs in the background so /health answers while /ready is still red
+            startup_task = asyncio.create_task(prepare_models(logger))
         try:
             yield
         finally:
+            if startup_task is not None:
+                startup_task.cancel()
             logger.info("Shutting down ML microservice")
 
     app = FastAPI(
@@ -38,15 +76,42 @@ def create_app(settings: Settings) -> FastAPI:
         lifespan=lifespan,
     )
 
-    service = TextAnalyticsService(settings)
-
     async def get_service() -> TextAnalyticsService:
         return service
 
+    async def run_batch(texts: List[str], min_length: int, fn: Callable[[str], Awaitable[Any]]) -> List[Any]:
+        """
+        Run fn for every text concurrently; the model batchers merge the calls into padded batches.
+        Returns a result or an exception per text, so one failing item does not fail the request.
+        """
+
+        async def run_one(text: str) -> Any:
+            if len(text) < min_length:
+                raise ValueError(f"text must be at least {min_length} characters long")
+            return await fn(text)
+
+        results = await asyncio.gather(*(run_one(text) for text in texts), return_exceptions=True)
+        failed = [result for result in results if isinstance(result, Exception) and not isinstance(result, ValueError)]
+        if failed:
+            logging.getLogger(settings.LOGGER_NAME).error(
+                "Batch inference failed for %s of %s items: %s", len(failed), len(texts), failed[0]
+            )
+        return results
+
     @app.get("/health", tags=["meta"])
     async def health() -> dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/ready", tags=["meta"])
+    async def ready() -> JSONResponse:
+        body = {**readiness, "mode": settings.STARTUP_MODE, "load_times": service.load_times}
+        code = status.HTTP_200_OK if readiness["status"] == "ready" else status.HTTP_503_SERVICE_UNAVAILABLE
+        return JSONResponse(body, status_code=code)
+
+    @app.get("/v1/cache/stats", tags=["meta"])
+    async def cache_stats(svc: TextAnalyticsService = Depends(get_service)) -> dict[str, Any]:
+        return svc.cache.stats()
+
     @app.post("/v1/summarize", response_model=SummarizationResponse, tags=["summarization"])
     async def summarize(
         payload: SummarizationRequest,
@@ -116,6 +181,66 @@ def create_app(settings: Settings) -> FastAPI:
             entities=ner_response.entities,
         )
 
+    @app.post("/v1/summarize/batch", response_model=SummarizationBatchResponse, tags=["summarization"])
+    async def summarize_batch(
+        payload: SummarizationBatchRequest,
+        svc: TextAnalyticsService = Depends(get_service),
+    ) -> SummarizationBatchResponse:
+        results = await run_batch(
+            payload.texts,
+            text_min_length(SummarizationRequest),
+            lambda text: svc.summarize(text, min_tokens=payload.min_tokens, max_tokens=payload.max_tokens),
+        )
+        return SummarizationBatchResponse(results=[
+            SummarizationBatchItem(error=str(result)) if isinstance(result, Exception)
+            else SummarizationBatchItem(summary=result)
+            for result in results
+        ])
+
+    @app.post("/v1/sentiment/batch", response_model=SentimentBatchResponse, tags=["analysis"])
+    async def sentiment_batch(
+        payload: BatchRequest,
+        svc: TextAnalyticsService = Depends(get_service),
+    ) -> SentimentBatchResponse:
+        results = await run_batch(payload.texts, text_min_length(SentimentRequest), svc.sentiment)
+        return SentimentBatchResponse(results=[
+            SentimentBatchItem(error=str(result)) if isinstance(result, Exception)
+            else SentimentBatchItem(label=result.label, score=result.score)
+            for result in results
+        ])
+
+    @app.post("/v1/ner/batch", response_model=NerBatchResponse, tags=["analysis"])
+    async def ner_batch(
+        payload: BatchRequest,
+        svc: TextAnalyticsService = Depends(get_service),
+    ) -> NerBatchResponse:
+        results = await run_batch(payload.texts, text_min_length(NerRequest), svc.ner)
+        return NerBatchResponse(results=[
+            NerBatchItem(error=str(result)) if isinstance(result, Exception)
+            else NerBatchItem(entities=NerResponse.from_dataclasses(result).entities)
+            for result in results
+        ])
+
+    @app.post("/v1/analyze/batch", response_model=FullAnalysisBatchResponse, tags=["analysis"])
+    async def analyze_batch(
+        payload: FullAnalysisBatchRequest,
+        svc: TextAnalyticsService = Depends(get_service),
+    ) -> FullAnalysisBatchResponse:
+        results = await run_batch(
+            payload.texts,
+            text_min_length(FullAnalysisRequest),
+            lambda text: svc.full_analysis(text, min_tokens=payload.min_tokens, max_tokens=payload.max_tokens),
+        )
+        return FullAnalysisBatchResponse(results=[
+            FullAnalysisBatchItem(error=str(result)) if isinstance(result, Exception)
+            else FullAnalysisBatchItem(
+                summary=result["summary"],
+                sentiment=SentimentResponse.from_dataclass(result["sentiment"]),
+                entities=NerResponse.from_dataclasses(result["entities"]).entities,
+            )
+            for result in results
+        ])
+
     return app
 
 
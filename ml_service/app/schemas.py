@@ -1,5 +1,6 @@
-from typing import List, Optional
+from typing import List, Optional, Type
 
+from annotated_types import MinLen
 from pydantic import BaseModel, Field
 
 from app.services.pipeline import Entity, SentimentLabel
@@ -59,3 +60,64 @@ class FullAnalysisResponse(BaseModel):
     sentiment: SentimentResponse
     entities: List[EntityModel]
 
+
+def text_min_length(request: Type[BaseModel]) -> int:
+    """``min_length`` of the ``text`` field of a single-text request schema (0 if unconstrained)."""
+    for constraint in request.model_fields["text"].metadata:
+        if isinstance(constraint, MinLen):
+            return constraint.min_length
+    return 0
+
+
+# Batch endpoints: texts are validated per item against the single-text request schema's limits
+# (see text_min_length), so one bad text only fails its own slot.
+class BatchRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1, max_length=128, description="Texts to process in one request.")
+
+
+class SummarizationBatchRequest(BatchRequest):
+    min_tokens: Optional[int] = Field(default=None, ge=8, le=512)
+    max_tokens: Optional[int] = Field(default=None, ge=32, le=1024)
+
+
+class FullAnalysisBatchRequest(SummarizationBatchRequest):
+    pass
+
+
+class SummarizationBatchItem(BaseModel):
+    summary: Optional[str] = None
+    error: Optional[str] = None
+
+
+class SummarizationBatchResponse(BaseModel):
+    results: List[SummarizationBatchItem]
+
+
+class SentimentBatchItem(BaseModel):
+    label: Optional[str] = None
+    score: Optional[float] = None
+    error: Optional[str] = None
+
+
+class SentimentBatchResponse(BaseModel):
+    results: List[SentimentBatchItem]
+
+
+class NerBatchItem(BaseModel):
+    entities: Optional[List[EntityModel]] = None
+    error: Optional[str] = None
+
+
+class NerBatchResponse(BaseModel):
+    results: List[NerBatchItem]
+
+
+class FullAnalysisBatchItem(BaseModel):
+    summary: Optional[str] = None
+    sentiment: Optional[SentimentResponse] = None
+    entities: Optional[List[EntityModel]] = None
+    error: Optional[str] = None
+
+
+class FullAnalysisBatchResponse(BaseModel):
+    results: List[FullAnalysisBatchItem]
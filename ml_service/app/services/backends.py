@@ -0,0 +1,78 @@
+import logging
+from pathlib import Path
+from typing import Any, Optional
+
+from transformers import (
+    AutoModelForSeq2SeqLM,
+    AutoModelForSequenceClassification,
+    AutoModelForTokenClassification,
+    AutoTokenizer,
+    pipeline,
+)
+
+from app.core.config import InferenceBackend
+
+logger = logging.getLogger(__name__)
+
+# Pipeline task -> (transformers auto class, optimum.onnxruntime class name)
+_TASK_MODELS = {
+    "summarization": (AutoModelForSeq2SeqLM, "ORTModelForSeq2SeqLM"),
+    "text-classification": (AutoModelForSequenceClassification, "ORTModelForSequenceClassification"),
+    "token-classification": (AutoModelForTokenClassification, "ORTModelForTokenClassification"),
+}
+
+
+def onnx_model_class(task: str) -> Any:
+    """optimum.onnxruntime model class for a pipeline task; optimum is only needed for the onnx backend."""
+    try:
+        import optimum.onnxruntime as ort
+    except ImportError as exc:
+        raise RuntimeError(
+            "The onnx backend needs optimum[onnxruntime]: pip install -r requirements-onnx.txt"
+        ) from exc
+    return getattr(ort, _TASK_MODELS[task][1])
+
+
+def build_pipeline(
+    task: str,
+    model: str,
+    *,
+    backend: InferenceBackend,
+    device: int,
+    revision: Optional[str] = None,
+    onnx_path: Optional[Path] = None,
+    **kwargs: Any,
+):
+    """
+    Create a transformers pipeline for ``task`` running on the given backend.
+
+    The onnx and torch-int8 backends still return a regular pipeline (same pre/post-processing
+    and call signature), only the model underneath is swapped, so callers do not change.
+    """
+    if backend == "transformers":
+        return pipeline(task, model=model, revision=revision, device=device, **kwargs)
+
+    if device != -1:
+        raise ValueError(f"The {backend} backend runs on CPU only, set TORCH_DEVICE=cpu")
+
+    if backend == "torch-int8":
+        import torch
+
+        auto_model = _TASK_MODELS[task][0].from_pretrained(model, revision=revision)
+        # Linear layers hold nearly all weights of BART/BERT; their matmuls run in int8, activations stay fp32
+        quantized = torch.ao.quantization.quantize_dynamic(auto_model, {torch.nn.Linear}, dtype=torch.qint8)
+        tokenizer = AutoTokenizer.from_pretrained(model, revision=revision)
+        return pipeline(task, model=quantized, tokenizer=tokenizer, device=device, **kwargs)
+
+    if backend == "onnx":
+        ort_class = onnx_model_class(task)
+        if onnx_path is not None and onnx_path.is_dir():
+            ort_model = ort_class.from_pretrained(onnx_path)
+            tokenizer = AutoTokenizer.from_pretrained(onnx_path)
+        else:
+            logger.warning("No exported ONNX model for %s, exporting %s on load (run scripts/export_models.py)", task, model)
+            ort_model = ort_class.from_pretrained(model, revision=revision, export=True)
+            tokenizer = AutoTokenizer.from_pretrained(model, revision=revision)
+        return pipeline(task, model=ort_model, tokenizer=tokenizer, device=device, **kwargs)
+
+    raise ValueError(f"Unknown inference backend: {backend}")
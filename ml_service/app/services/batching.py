@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+# run_batch(key, items) -> one result per item, in the same order
+BatchRunner = Callable[[Hashable, List[Any]], List[Any]]
+
+_IDLE = object()
+
+
+class MicroBatcher:
+    """
+    Dynamic micro-batching for one model.
+
+    Concurrent ``submit`` calls are queued; a single worker task collects up to
+    ``max_batch_size`` items (or whatever arrived within ``max_wait_ms`` of the
+    oldest one) and runs them as one padded forward pass in a worker thread.
+    Results are scattered back to the waiting futures. Items are only batched
+    together when they share the same key (e.g. identical generation kwargs).
+    If a batch fails, its items are re-run one at a time, so only the failing item gets the error.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: BatchRunner,
+        max_batch_size: int,
+        max_wait_ms: float,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.name = name
+        self._run_batch = run_batch
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait = max(0.0, max_wait_ms) / 1000
+        self._logger = logger or logging.getLogger(__name__)
+
+        self._queues: Dict[Hashable, Deque[Tuple[Any, asyncio.Future, float]]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, item: Any, key: Hashable = None) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            if self._worker is not None and self._worker.get_loop() is not loop:
+                # The worker and queued futures belong to another (closed) loop, e.g. a previous test client
+                self._queues = {}
+            self._wakeup = asyncio.Event()
+            self._worker = loop.create_task(self._run(), name=f"batcher-{self.name}")
+
+        future = loop.create_future()
+        self._queues.setdefault(key, deque()).append((item, future, time.monotonic()))
+        self._wakeup.set()
+        return await future
+
+    def _next_key(self) -> Any:
+        """Key whose oldest request has waited the longest (``_IDLE`` if nothing is queued)."""
+        pending = [(queue[0][2], key) for key, queue in self._queues.items() if queue]
+        if not pending:
+            return _IDLE
+        return min(pending, key=lambda entry: entry[0])[1]
+
+    async def _run(self) -> None:
+        while True:
+            key = self._next_key()
+            if key is _IDLE:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            queue = self._queues[key]
+            # Wait for a full batch, but never longer than max_wait after the oldest request
+            deadline = queue[0][2] + self._max_wait
+            while len(queue) < self._max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = [queue.popleft() for _ in range(min(len(queue), self._max_batch_size))]
+            if not queue:
+                del self._queues[key]
+            # Requests cancelled while queued (client went away) are not computed
+            batch = [entry for entry in batch if not entry[1].done()]
+            if batch:
+                await self._execute(key, batch)
+
+    async def _execute(self, key: Hashable, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        items = [item for item, _, _ in batch]
+        started = time.perf_counter()
+        try:
+            results = await asyncio.to_thread(self._run_batch, key, items)
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name}: got {len(results)} results for {len(items)} inputs")
+        except Exception as exc:
+            if len(batch) > 1:
+                # One bad input must not fail the unrelated requests it happened to share a batch with
+                self._logger.warning(
+                    "%s batch of %s failed (%s), running the items one by one", self.name, len(items), exc
+                )
+                for entry in batch:
+                    if not entry[1].done():
+                        await self._execute(key, [entry])
+                return
+            future = batch[0][1]
+            if not future.done():
+                future.set_exception(exc)
+            return
+
+        self._logger.debug(
+            "%s batch of %s done in %.1f ms", self.name, len(items), (time.perf_counter() - started) * 1000
+        )
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Disk rows are trimmed to the limit once per this many writes, not on every insert
+_DISK_PRUNE_EVERY = 256
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for hashing: NFC, collapsed whitespace, no surrounding blanks."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class _DiskStore:
+    """SQLite key/value table holding JSON-encoded results; calls are serialised with a lock."""
+
+    def __init__(self, path: str, max_entries: int) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", (key, value))
+            self._writes += 1
+            if self._writes % _DISK_PRUNE_EVERY == 0:
+                # rowid grows with every insert, so the smallest ones are the oldest entries
+                self._conn.execute(
+                    "DELETE FROM results WHERE rowid <= (SELECT MAX(rowid) FROM results) - ?",
+                    (self._max_entries,),
+                )
+
+
+class ResultCache:
+    """
+    Inference result cache keyed by model id, revision, parameters and a hash of the normalized text.
+
+    Results live in a bounded in-memory LRU and, when ``disk_path`` is set, in an SQLite file that
+    survives restarts. Concurrent lookups of the same key share one computation, so duplicate texts
+    inside a batch are only run through the model once. ``max_entries=0`` disables caching.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        disk_path: Optional[str] = None,
+        disk_max_entries: int = 100_000,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self._max_entries = max(0, max_entries)
+        self._logger = logger or logging.getLogger(__name__)
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._counters: Dict[str, Counter] = {}
+
+        self._disk: Optional[_DiskStore] = None
+        if disk_path and self._max_entries:
+            self._disk = _DiskStore(disk_path, disk_max_entries)
+            self._logger.info("Inference result cache on disk: %s", disk_path)
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0
+
+    @staticmethod
+    def key(namespace: str, text: str, **params: Any) -> str:
+        text_hash = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        params_json = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(f"{namespace}\0{params_json}\0{text_hash}".encode("utf-8")).hexdigest()
+
+    async def get_or_compute(
+        self,
+        namespace: str,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        *,
+        encode: Callable[[Any], Any] = lambda value: value,
+        decode: Callable[[Any], Any] = lambda value: value,
+    ) -> Any:
+        """
+        Return the cached result for ``key`` or run ``compute`` and store what it returns.
+        ``encode``/``decode`` convert results to and from JSON for the disk tier.
+        ``None`` results are passed through but never cached.
+        """
+        if not self.enabled:
+            return await compute()
+
+        counters = self._counters.setdefault(namespace, Counter())
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            counters["memory_hits"] += 1
+            return self._memory[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            counters["coalesced"] += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The request that owned the computation went away; compute it for this one instead
+                return await self.get_or_compute(namespace, key, compute, encode=encode, decode=decode)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load_or_compute(counters, key, compute, encode, decode)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Retrieve it here so a failure nobody else waited for is not reported as unhandled
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    async def _load_or_compute(
+        self,
+        counters: Counter,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        encode: Callable[[Any], Any],
+        decode: Callable[[Any], Any],
+    ) -> Any:
+        if self._disk is not None:
+            stored = await self._disk_call(self._disk.get, key)
+            if stored is not None:
+                counters["disk_hits"] += 1
+                value = decode(json.loads(stored))
+                self._remember(key, value)
+                return value
+
+        counters["misses"] += 1
+        value = await compute()
+        if value is None:
+            return value
+        self._remember(key, value)
+        if self._disk is not None:
+            await self._disk_call(self._disk.set, key, json.dumps(encode(value), ensure_ascii=False))
+        return value
+
+    async def _disk_call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # The disk tier is an optimisation: I/O errors degrade to a cache miss instead of failing inference
+        try:
+            return await asyncio.to_thread(fn, *args)
+        except (sqlite3.Error, OSError) as exc:
+            self._logger.warning("Inference cache disk access failed: %s", exc)
+            return None
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per namespace plus the current in-memory size."""
+        return {
+            "enabled": self.enabled,
+            "disk": self._disk is not None,
+            "entries": len(self._memory),
+            "max_entries": self._max_entries,
+            "namespaces": {
+                namespace: {
+                    name: counters[name] for name in ("memory_hits", "disk_hits", "coalesced", "misses")
+                }
+                for namespace, counters in self._counters.items()
+            },
+        }
@@ -1,80 +1,110 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
 import newspaper
 import requests
 import feedparser
+from newspaper.source import Category
+from requests.adapters import HTTPAdapter
 
+logger = logging.getLogger(__name__)
 
-def is_rss(url: str):
-    try:
+# Parallel article downloads per parse_news call (and keep-alive pool size per host)
+MAX_WORKERS = 8
+REQUEST_TIMEOUT = 10
+USER_AGENT = "newsagent-bot/0.1 (+https://example.com/contact)"
 
-        response = requests.get(url)
+# One pooled session for the feed and all article pages (keep-alive across requests)
+_session = requests.Session()
+_session.headers["User-Agent"] = USER_AGENT
+_session.mount("http://", HTTPAdapter(pool_maxsize=MAX_WORKERS))
+_session.mount("https://", HTTPAdapter(pool_maxsize=MAX_WORKERS))
 
-        if "xml" in response.headers.get("Content-Type", "") or \
-                "<rss" in response.text.lower() or "<feed" in response.text.lower():
-            return True
-        else:
-            return False
-    except Exception as e:
-        print(str(e))
+_FEED_MARKERS = (b"<rss", b"<feed", b"<rdf:rdf")
 
 
-def parse_html(url: str, limit: int):
-    try:
-        source = newspaper.build(url, memoize_articles=False)
-    except Exception as e:
-        print(f"Error: can't access {url}. Details: {str(e)}")
-        return
+def fetch(url: str):
+    response = _session.get(url, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.content, response.headers
+
+
+def is_rss(content: bytes, content_type: str = ""):
+    """Detect a feed from the already downloaded bytes (only the document head is inspected)."""
+    head = content[:2048].lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if any(marker in head for marker in _FEED_MARKERS):
+        return True
+    if b"<html" in head:
+        return False
+    return "xml" in content_type and "html" not in content_type
+
 
-    articles_data = []
+def _download_article(url: str):
+    """Download and parse one article, reusing the pooled session."""
     try:
-        for article in source.articles[:limit]:
-            article.download()
-            article.parse()
-
-            articles_data.append({
-                "title": article.title,
-                "publish_date": article.publish_date,
-                "top_image": article.top_image,
-                "text": article.text
-            })
+        html, _ = fetch(url)
+        article = newspaper.Article(url, memoize_articles=False)
+        article.set_html(html)
+        article.parse()
     except Exception as e:
-        print(f"Error during parsing news from {url}. Details: {str(e)}")
-        return
+        logger.warning("Error during parsing article %s: %s", url, e)
+        return None
+
+    return {
+        "title": article.title,
+        "publish_date": article.publish_date,
+        "top_image": article.top_image,
+        "text": article.text
+    }
+
 
-    return articles_data
+def _download_articles(urls):
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        results = pool.map(_download_article, urls)
+    return [data for data in results if data]
 
 
-def parse_rss(url: str, limit: int):
+def parse_html(url: str, limit: int, content: bytes):
     try:
-        feed = feedparser.parse(url)
+        # Links are taken from the downloaded page itself instead of letting
+        # newspaper.build fetch the page (and every category page) again
+        source = newspaper.Source(url, memoize_articles=False)
+        source.html = source.config.get_parser().get_unicode_html(content)
+        source.parse()
+        category = Category(url=source.url)
+        category.html, category.doc = source.html, source.doc
+        source.categories = [category]
+        source.generate_articles(limit=limit)
     except Exception as e:
-        print(f"Error: can't parse {url}. Details: {str(e)}")
+        logger.error("Can't access %s: %s", url, e)
         return
 
-    articles_data = []
-    try:
+    return _download_articles([article.url for article in source.articles])
 
-        for entry in feed.entries[:limit]:
-            link = entry.get("link", "")
-            if link:
-                article = newspaper.Article(link)
-                article.download()
-                article.parse()
-                articles_data.append({
-                    "title": article.title,
-                    "publish_date": article.publish_date,
-                    "top_image": article.top_image,
-                    "text": article.text
-                })
 
+def parse_rss(url: str, limit: int, content: bytes, content_type: str = ""):
+    try:
+        feed = feedparser.parse(content, response_headers={
+            "content-location": url,
+            "content-type": content_type,
+        })
     except Exception as e:
-        print(f"Error during parsing news from {url}. Details: {str(e)}")
+        logger.error("Can't parse %s: %s", url, e)
         return
 
-    return articles_data
+    links = [entry.get("link", "") for entry in feed.entries[:limit]]
+    return _download_articles([link for link in links if link])
 
 
 def parse_news(url: str, limit: int = 30):
-    if is_rss(url):
-        return parse_rss(url, limit)
+    try:
+        content, headers = fetch(url)
+    except Exception as e:
+        logger.error("Can't access %s: %s", url, e)
+        return
+
+    content_type = headers.get("Content-Type", "")
+    if is_rss(content, content_type):
+        return parse_rss(url, limit, content, content_type)
     else:
-        return parse_html(url, limit)
+        return parse_html(url, limit, content)
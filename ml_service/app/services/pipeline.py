@@ -1,13 +1,24 @@
 import asyncio
 import logging
-from dataclasses import dataclass
-from functools import partial
-from typing import Any, Dict, List, Optional
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import httpx
-from transformers import pipeline
 
 from app.core.config import Settings
+from app.services.backends import build_pipeline
+from app.services.batching import MicroBatcher
+from app.services.cache import ResultCache
+
+# Two short news-like texts: enough to run every model through tokenization, padding and generation once
+_WARMUP_TEXTS = [
+    "The central bank kept its key interest rate unchanged on Friday, citing slowing inflation "
+    "and steady growth in consumer lending across the country's largest cities.",
+    "Центральный банк в пятницу сохранил ключевую ставку, сославшись на замедление инфляции "
+    "и устойчивый рост потребительского кредитования в крупнейших городах страны.",
+]
 
 
 @dataclass
@@ -34,12 +45,60 @@ class TextAnalyticsService:
         self._sentiment = None
         self._ner = None
 
+        # Seconds spent loading each pipeline, by model kind
+        self.load_times: Dict[str, float] = {}
+
         self._summarizer_lock = asyncio.Lock()
         self._sentiment_lock = asyncio.Lock()
         self._ner_lock = asyncio.Lock()
 
+        wait_ms = settings.BATCH_MAX_WAIT_MS
+        self._summarize_batcher = MicroBatcher(
+            "summarization", self._summarize_batch, settings.SUMMARIZATION_BATCH_SIZE, wait_ms, self.logger
+        )
+        self._sentiment_batcher = MicroBatcher(
+            "sentiment", self._sentiment_batch, settings.SENTIMENT_BATCH_SIZE, wait_ms, self.logger
+        )
+        self._ner_batcher = MicroBatcher("ner", self._ner_batch, settings.NER_BATCH_SIZE, wait_ms, self.logger)
+
+        self.cache = ResultCache(
+            settings.INFERENCE_CACHE_SIZE,
+            settings.INFERENCE_CACHE_PATH,
+            settings.INFERENCE_CACHE_DISK_MAX_ENTRIES,
+            self.logger,
+        )
+
     async def summarize(self, text: str, *, min_tokens: Optional[int] = None, max_tokens: Optional[int] = None) -> str:
         """Generate abstractive summary for the provided text."""
+        max_tokens = max_tokens or self.settings.MAX_SUMMARY_TOKENS
+        min_tokens = min_tokens or self.settings.MIN_SUMMARY_TOKENS
+        if self.settings.remote_llama_enabled():
+            key = self.cache.key(
+                "summarization",
+                text,
+                model=f"remote:{self.settings.LLAMA_MODEL}",
+                max_tokens=self.settings.LLAMA_MAX_TOKENS,
+                temperature=self.settings.LLAMA_TEMPERATURE,
+            )
+        else:
+            key = self.cache.key(
+                "summarization",
+                text,
+                model=self.settings.SUMMARIZATION_MODEL_NAME,
+                revision=self.settings.SUMMARIZATION_MODEL_REVISION,
+                backend=self.settings.SUMMARIZATION_BACKEND,
+                min_tokens=min_tokens,
+                max_tokens=max_tokens,
+                num_beams=self.settings.SUMMARIZATION_NUM_BEAMS,
+                length_penalty=self.settings.SUMMARY_LENGTH_PENALTY,
+            )
+        # Fallback summaries come back as None, so they are never cached
+        summary = await self.cache.get_or_compute(
+            "summarization", key, lambda: self._summarize_uncached(text, min_tokens, max_tokens)
+        )
+        return summary or self._fallback_summary(text)
+
+    async def _summarize_uncached(self, text: str, min_tokens: int, max_tokens: int) -> Optional[str]:
         # Prefer hosted LLaMA/OpenAI-compatible endpoint if configured.
         if self.settings.remote_llama_enabled():
             try:
@@ -48,53 +107,87 @@ class TextAnalyticsService:
                     return summary
             except Exception as exc:  # pragma: no cover - defensive logging
                 self.logger.warning("Remote LLaMA summarization failed, using lightweight fallback: %s", exc)
-                return self._fallback_summary(text)
+                return None
 
-        summarizer = await self._get_summarizer()
-        max_tokens = max_tokens or self.settings.MAX_SUMMARY_TOKENS
-        min_tokens = min_tokens or self.settings.MIN_SUMMARY_TOKENS
+        await self._get_summarizer()
         self.logger.debug("Running local summarization (min=%s, max=%s)", min_tokens, max_tokens)
 
-        result = await asyncio.to_thread(
-            partial(
-                summarizer,
-                text,
-                truncation=True,
-                max_length=max_tokens,
-                min_length=min_tokens,
-                num_beams=self.settings.SUMMARIZATION_NUM_BEAMS,
-                length_penalty=self.settings.SUMMARY_LENGTH_PENALTY,
-            )
-        )
-        summary = result[0]["summary_text"].strip()
+        # Only requests with the same length limits can share a generate() call
+        summary = await self._summarize_batcher.submit(text, key=(min_tokens, max_tokens))
         if not summary:
-            return self._fallback_summary(text)
+            return None
         self.logger.debug("Generated summary length=%s", len(summary))
         return summary
 
     async def sentiment(self, text: str) -> SentimentLabel:
         """Predict sentiment label and score."""
-        classifier = await self._get_sentiment()
+        key = self.cache.key(
+            "sentiment",
+            text,
+            model=self.settings.SENTIMENT_MODEL_NAME,
+            revision=self.settings.SENTIMENT_MODEL_REVISION,
+            backend=self.settings.SENTIMENT_BACKEND,
+        )
+        return await self.cache.get_or_compute(
+            "sentiment",
+            key,
+            lambda: self._sentiment_uncached(text),
+            encode=asdict,
+            decode=lambda value: SentimentLabel(**value),
+        )
+
+    async def _sentiment_uncached(self, text: str) -> SentimentLabel:
+        await self._get_sentiment()
         self.logger.debug("Running sentiment analysis")
-        outputs = await asyncio.to_thread(partial(classifier, text, truncation=True, top_k=1))
-        # Normalise possible shapes: [{"label": "...", "score": ...}] or [[{...}]]
-        if isinstance(outputs, list) and outputs:
-            first = outputs[0]
-            if isinstance(first, list) and first:
-                first = first[0]
-            if isinstance(first, dict) and "label" in first and "score" in first:
-                return SentimentLabel(label=first["label"], score=float(first["score"]))
-        raise RuntimeError(f"Unexpected sentiment output format: {outputs}")
+        return await self._sentiment_batcher.submit(text)
 
     async def ner(self, text: str) -> List[Entity]:
         """Extract named entities."""
-        recognizer = await self._get_ner()
+        key = self.cache.key(
+            "ner",
+            text,
+            model=self.settings.NER_MODEL_NAME,
+            revision=self.settings.NER_MODEL_REVISION,
+            backend=self.settings.NER_BACKEND,
+            aggregation_strategy="simple",
+        )
+        return await self.cache.get_or_compute(
+            "ner",
+            key,
+            lambda: self._ner_uncached(text),
+            encode=lambda entities: [asdict(entity) for entity in entities],
+            decode=lambda value: [Entity(**entity) for entity in value],
+        )
+
+    async def _ner_uncached(self, text: str) -> List[Entity]:
+        await self._get_ner()
         self.logger.debug("Running NER")
-        outputs = await asyncio.to_thread(partial(recognizer, text, aggregation_strategy="simple"))
-        return [
-            Entity(text=chunk["word"], type=chunk["entity_group"], score=float(chunk["score"]))
-            for chunk in outputs
-        ]
+        return await self._ner_batcher.submit(text)
+
+    async def warmup(self, models: Sequence[str], run_batch: bool = True) -> None:
+        """
+        Load the given pipelines ("summarization", "sentiment", "ner") and optionally run a warmup batch
+        through each of them, bypassing the result cache.
+        """
+        for kind in models:
+            if kind == "summarization" and self.settings.remote_llama_enabled():
+                self.logger.info("Skipping summarization preload: remote LLaMA summarization is enabled")
+                continue
+            loader, run = {
+                "summarization": (
+                    self._get_summarizer,
+                    lambda text: self._summarize_uncached(
+                        text, self.settings.MIN_SUMMARY_TOKENS, self.settings.MAX_SUMMARY_TOKENS
+                    ),
+                ),
+                "sentiment": (self._get_sentiment, self._sentiment_uncached),
+                "ner": (self._get_ner, self._ner_uncached),
+            }[kind]
+            await loader()
+            if run_batch:
+                started = time.perf_counter()
+                await asyncio.gather(*(run(text) for text in _WARMUP_TEXTS))
+                self.logger.info("Warmed up %s in %.1f s", kind, time.perf_counter() - started)
 
     async def full_analysis(self, text: str, *, min_tokens: Optional[int] = None, max_tokens: Optional[int] = None) -> Dict[str, Any]:
         """Convenience helper that runs all models sequentially."""
@@ -109,6 +202,43 @@ class TextAnalyticsService:
             "entities": entities,
         }
 
+    def _summarize_batch(self, key: Tuple[int, int], texts: List[str]) -> List[str]:
+        min_tokens, max_tokens = key
+        outputs = self._summarizer(
+            texts,
+            truncation=True,
+            max_length=max_tokens,
+            min_length=min_tokens,
+            num_beams=self.settings.SUMMARIZATION_NUM_BEAMS,
+            length_penalty=self.settings.SUMMARY_LENGTH_PENALTY,
+            batch_size=len(texts),
+        )
+        return [output["summary_text"].strip() for output in outputs]
+
+    def _sentiment_batch(self, _key: Any, texts: List[str]) -> List[SentimentLabel]:
+        outputs = self._sentiment(texts, truncation=True, top_k=1, batch_size=len(texts))
+        return [self._parse_sentiment(output) for output in outputs]
+
+    @staticmethod
+    def _parse_sentiment(output: Any) -> SentimentLabel:
+        # Normalise possible shapes per text: {"label": "...", "score": ...} or [{...}]
+        first = output
+        if isinstance(first, list) and first:
+            first = first[0]
+        if isinstance(first, dict) and "label" in first and "score" in first:
+            return SentimentLabel(label=first["label"], score=float(first["score"]))
+        raise RuntimeError(f"Unexpected sentiment output format: {output}")
+
+    def _ner_batch(self, _key: Any, texts: List[str]) -> List[List[Entity]]:
+        outputs = self._ner(texts, aggregation_strategy="simple", batch_size=len(texts))
+        return [
+            [
+                Entity(text=chunk["word"], type=chunk["entity_group"], score=float(chunk["score"]))
+                for chunk in chunks
+            ]
+            for chunks in outputs
+        ]
+
     async def _remote_llama_summarize(self, text: str) -> str:
         """Call Ollama Cloud /api/generate (non-stream) for summarization."""
         url = f"{self.settings.LLAMA_API_BASE.rstrip('/')}/generate"
@@ -150,17 +280,33 @@ class TextAnalyticsService:
             return text
         return text[:400].rstrip() + "..."
 
+    async def _load_pipeline(self, kind: str, task: str, model: str, **kwargs: Any):
+        backend = self.settings.backend_for(kind)
+        self.logger.info("Loading %s pipeline: %s (backend=%s)", kind, model, backend)
+        started = time.perf_counter()
+        onnx_dir = self.settings.ONNX_MODEL_DIR
+        loaded = await asyncio.to_thread(
+            build_pipeline,
+            task,
+            model,
+            backend=backend,
+            device=self.settings.pipeline_device(),
+            onnx_path=Path(onnx_dir) / kind if onnx_dir else None,
+            **kwargs,
+        )
+        self.load_times[kind] = time.perf_counter() - started
+        self.logger.info("Loaded %s pipeline in %.1f s", kind, self.load_times[kind])
+        return loaded
+
     async def _get_summarizer(self):
         if self._summarizer is None:
             async with self._summarizer_lock:
                 if self._summarizer is None:
-                    self.logger.info("Loading summarization pipeline: %s", self.settings.SUMMARIZATION_MODEL_NAME)
-                    self._summarizer = await asyncio.to_thread(
-                        pipeline,
+                    self._summarizer = await self._load_pipeline(
+                        "summarization",
                         "summarization",
-                        model=self.settings.SUMMARIZATION_MODEL_NAME,
+                        self.settings.SUMMARIZATION_MODEL_NAME,
                         revision=self.settings.SUMMARIZATION_MODEL_REVISION,
-                        device=self.settings.pipeline_device(),
                     )
         return self._summarizer
 
@@ -168,13 +314,11 @@ class TextAnalyticsService:
         if self._sentiment is None:
             async with self._sentiment_lock:
                 if self._sentiment is None:
-                    self.logger.info("Loading sentiment pipeline: %s", self.settings.SENTIMENT_MODEL_NAME)
-                    self._sentiment = await asyncio.to_thread(
-                        pipeline,
+                    self._sentiment = await self._load_pipeline(
+                        "sentiment",
                         "text-classification",
-                        model=self.settings.SENTIMENT_MODEL_NAME,
+                        self.settings.SENTIMENT_MODEL_NAME,
                         revision=self.settings.SENTIMENT_MODEL_REVISION,
-                        device=self.settings.pipeline_device(),
                         return_all_scores=True,
                     )
         return self._sentiment
@@ -183,13 +327,11 @@ class TextAnalyticsService:
         if self._ner is None:
             async with self._ner_lock:
                 if self._ner is None:
-                    self.logger.info("Loading NER pipeline: %s", self.settings.NER_MODEL_NAME)
-                    self._ner = await asyncio.to_thread(
-                        pipeline,
+                    self._ner = await self._load_pipeline(
+                        "ner",
                         "token-classification",
-                        model=self.settings.NER_MODEL_NAME,
+                        self.settings.NER_MODEL_NAME,
                         revision=self.settings.NER_MODEL_REVISION,
-                        device=self.settings.pipeline_device(),
                         aggregation_strategy="simple",
                     )
         return self._ner
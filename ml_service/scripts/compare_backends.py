@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Compare latency and output agreement of the inference backends against the transformers pipelines."""
+
+import argparse
+import asyncio
+import gc
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.config import get_settings  # noqa: E402
+from app.services.pipeline import TextAnalyticsService  # noqa: E402
+
+SAMPLE_TEXTS = [
+    "The central bank kept its key interest rate unchanged on Friday, citing slowing inflation and steady "
+    "growth in consumer lending. Analysts at Goldman Sachs expect the first cut in March, while the finance "
+    "ministry warned that the budget deficit could reach 3% of GDP if oil prices stay below $70 a barrel.",
+    "Apple unveiled a new line of laptops in Cupertino on Tuesday. Chief executive Tim Cook said the devices "
+    "would ship in November, and the company's shares rose 2% in New York trading after the announcement.",
+    "Heavy rain caused flooding across northern Italy over the weekend, forcing the evacuation of more than "
+    "3,000 people near Bologna. Rescue teams from the Red Cross were deployed as rivers burst their banks.",
+    "Центральный банк в пятницу сохранил ключевую ставку на уровне 16%, сославшись на замедление инфляции. "
+    "Министерство финансов ожидает, что дефицит бюджета по итогам года не превысит 2% ВВП.",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        choices=["summarization", "sentiment", "ner", "all"],
+        default=["all"],
+        help="Which models to compare (default: all).",
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=["onnx", "torch-int8"],
+        default=["onnx", "torch-int8"],
+        help="Backends compared against transformers (default: onnx torch-int8).",
+    )
+    parser.add_argument(
+        "--texts-file",
+        type=Path,
+        default=None,
+        help="File with one text per line (default: built-in news samples).",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over the texts (default: 3).")
+    return parser.parse_args()
+
+
+def _lcs(a: Sequence[str], b: Sequence[str]) -> int:
+    previous = [0] * (len(b) + 1)
+    for token in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if token == other else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+def rouge_l(candidate: str, reference: str) -> float:
+    """ROUGE-L F1 over whitespace tokens."""
+    cand, ref = candidate.lower().split(), reference.lower().split()
+    if not cand or not ref:
+        return float(cand == ref)
+    lcs = _lcs(cand, ref)
+    if not lcs:
+        return 0.0
+    precision, recall = lcs / len(cand), lcs / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+
+def entity_f1(candidate: List[Any], reference: List[Any]) -> float:
+    cand = {(entity.text, entity.type) for entity in candidate}
+    ref = {(entity.text, entity.type) for entity in reference}
+    if not cand and not ref:
+        return 1.0
+    return 2 * len(cand & ref) / (len(cand) + len(ref))
+
+
+def agreement(kind: str, outputs: List[Any], reference: List[Any]) -> str:
+    pairs = list(zip(outputs, reference))
+    if kind == "summarization":
+        exact = sum(out == ref for out, ref in pairs) / len(pairs)
+        rouge = statistics.mean(rouge_l(out, ref) for out, ref in pairs)
+        return f"exact {exact:.0%}, ROUGE-L {rouge:.3f}"
+    if kind == "sentiment":
+        labels = sum(out.label == ref.label for out, ref in pairs) / len(pairs)
+        score_diff = statistics.mean(abs(out.score - ref.score) for out, ref in pairs)
+        return f"label {labels:.0%}, |score diff| {score_diff:.3f}"
+    f1 = statistics.mean(entity_f1(out, ref) for out, ref in pairs)
+    return f"entity F1 {f1:.3f}"
+
+
+async def run_backend(
+    backend: str, kinds: Sequence[str], texts: List[str], repeat: int
+) -> Dict[str, Tuple[float, List[float], List[Any]]]:
+    """Per model kind: load time, per-text latencies and outputs of the last pass."""
+    settings = get_settings().model_copy(
+        update={
+            **{f"{kind.upper()}_BACKEND": backend for kind in kinds},
+            # Measure the models themselves: no result cache, no batching delay, no remote summarizer
+            "INFERENCE_CACHE_SIZE": 0,
+            "BATCH_MAX_WAIT_MS": 0.0,
+            "LLAMA_API_BASE": None,
+        }
+    )
+    service = TextAnalyticsService(settings)
+    calls: Dict[str, Callable[[str], Awaitable[Any]]] = {
+        "summarization": service.summarize,
+        "sentiment": service.sentiment,
+        "ner": service.ner,
+    }
+
+    results = {}
+    for kind in kinds:
+        await service.warmup([kind])
+        latencies: List[float] = []
+        outputs: List[Any] = []
+        for _ in range(repeat):
+            outputs = []
+            for text in texts:
+                started = time.perf_counter()
+                outputs.append(await calls[kind](text))
+                latencies.append(time.perf_counter() - started)
+        results[kind] = (service.load_times.get(kind, 0.0), latencies, outputs)
+    return results
+
+
+def main() -> None:
+    args = parse_args()
+    kinds = ["summarization", "sentiment", "ner"] if "all" in args.models else args.models
+    texts = SAMPLE_TEXTS
+    if args.texts_file is not None:
+        texts = [line.strip() for line in args.texts_file.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    all_results = {}
+    for backend in ["transformers", *args.backends]:
+        print(f"[+] Running {backend} backend on {len(texts)} texts x {args.repeat}")
+        all_results[backend] = asyncio.run(run_backend(backend, kinds, texts, args.repeat))
+        gc.collect()
+
+    baseline = all_results["transformers"]
+    for kind in kinds:
+        base_p50 = statistics.median(baseline[kind][1])
+        print(f"\n{kind}")
+        print(f"  {'backend':<14}{'load, s':>9}{'p50, ms':>10}{'p95, ms':>10}{'speedup':>9}  agreement")
+        for backend, results in all_results.items():
+            load_time, latencies, outputs = results[kind]
+            p50 = statistics.median(latencies)
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else p50
+            match = "baseline" if backend == "transformers" else agreement(kind, outputs, baseline[kind][2])
+            print(
+                f"  {backend:<14}{load_time:>9.1f}{p50 * 1000:>10.1f}{p95 * 1000:>10.1f}"
+                f"{base_p50 / p50:>8.2f}x  {match}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Export ML microservice models to ONNX (optionally int8-quantized) for the onnx inference backend."""
+
+import argparse
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from transformers import AutoTokenizer  # noqa: E402
+
+from app.core.config import get_settings  # noqa: E402
+from app.services.backends import onnx_model_class  # noqa: E402
+
+TASKS = {
+    "summarization": "summarization",
+    "sentiment": "text-classification",
+    "ner": "token-classification",
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export NewsAgent ML models to ONNX for ONNX Runtime on CPU.")
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        choices=["summarization", "sentiment", "ner", "all"],
+        default=["all"],
+        help="Which models to export (default: all).",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=None,
+        help="Target directory, one subdirectory per model (default: ONNX_MODEL_DIR from settings).",
+    )
+    parser.add_argument(
+        "--quantize",
+        action="store_true",
+        help="Apply dynamic int8 quantization to the exported ONNX graphs.",
+    )
+    parser.add_argument(
+        "--arch",
+        choices=["avx2", "avx512", "avx512_vnni", "arm64"],
+        default="avx2",
+        help="CPU instruction set the quantized graphs are tuned for (default: avx2).",
+    )
+    return parser.parse_args()
+
+
+def resolve_targets(selected: Sequence[str]) -> Iterable[str]:
+    if "all" in selected:
+        return ("summarization", "sentiment", "ner")
+    return selected
+
+
+def quantize_dir(source: Path, target: Path, arch: str) -> None:
+    """Quantize every ONNX graph in source into target under the same file name."""
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    config = getattr(AutoQuantizationConfig, arch)(is_static=False, per_channel=False)
+    # Seq2seq exports consist of several graphs (encoder, decoder, decoder with past)
+    for onnx_file in sorted(source.glob("*.onnx")):
+        print(f"    quantizing {onnx_file.name}")
+        quantizer = ORTQuantizer.from_pretrained(source, file_name=onnx_file.name)
+        quantizer.quantize(save_dir=target, quantization_config=config, file_suffix="")
+    # Configs and tokenizer files are copied as is
+    shutil.copytree(source, target, ignore=shutil.ignore_patterns("*.onnx", "*.onnx_data"), dirs_exist_ok=True)
+
+
+def export_model(
+    label: str,
+    model_id: str,
+    revision: Optional[str],
+    output_dir: Path,
+    quantize: bool,
+    arch: str,
+) -> None:
+    target = output_dir / label
+    print(f"[+] Exporting {label} model: {model_id} (revision={revision or 'latest'}) -> {target}")
+    ort_class = onnx_model_class(TASKS[label])
+    with tempfile.TemporaryDirectory() as tmp:
+        export_dir = Path(tmp) if quantize else target
+        model = ort_class.from_pretrained(model_id, revision=revision, export=True)
+        model.save_pretrained(export_dir)
+        AutoTokenizer.from_pretrained(model_id, revision=revision).save_pretrained(export_dir)
+        if quantize:
+            target.mkdir(parents=True, exist_ok=True)
+            quantize_dir(export_dir, target, arch)
+    print(f"[✓] {label} model exported{' (int8)' if quantize else ''}")
+
+
+def main() -> None:
+    args = parse_args()
+    settings = get_settings()
+
+    output_dir = args.output_dir or (Path(settings.ONNX_MODEL_DIR) if settings.ONNX_MODEL_DIR else None)
+    if output_dir is None:
+        sys.exit("Set --output-dir or ONNX_MODEL_DIR")
+
+    registry: Tuple[Tuple[str, str, Optional[str]], ...] = (
+        ("summarization", settings.SUMMARIZATION_MODEL_NAME, settings.SUMMARIZATION_MODEL_REVISION),
+        ("sentiment", settings.SENTIMENT_MODEL_NAME, settings.SENTIMENT_MODEL_REVISION),
+        ("ner", settings.NER_MODEL_NAME, settings.NER_MODEL_REVISION),
+    )
+
+    wanted = set(resolve_targets(args.models))
+    for label, model_id, revision in registry:
+        if label not in wanted:
+            continue
+        export_model(label, model_id, revision, output_dir, args.quantize, args.arch)
+
+    print("Done.")
+
+
+if __name__ == "__main__":
+    main()
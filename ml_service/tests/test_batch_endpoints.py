@@ -0,0 +1,96 @@
+# ml_service/tests/test_batch_endpoints.py
+from unittest.mock import patch
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.core.config import Settings
+from app.main import create_app
+from app.schemas import SentimentRequest, SummarizationRequest, text_min_length
+from app.services.pipeline import TextAnalyticsService
+
+LONG_TEXT = "The central bank kept its key interest rate unchanged on Friday."
+BROKEN_TEXT = "This text makes the summarization model fail: boom, boom, boom."
+
+
+def fake_summarizer(texts, **kwargs):
+    if any("boom" in text for text in texts):
+        raise RuntimeError("generation failed")
+    return [{"summary_text": f"summary of {text[:10]}"} for text in texts]
+
+
+def fake_sentiment(texts, **kwargs):
+    return [[{"label": "positive", "score": 0.9}] for _ in texts]
+
+
+def fake_ner(texts, **kwargs):
+    return [[{"word": "Friday", "entity_group": "MISC", "score": 0.8}] for _ in texts]
+
+
+class FakeModelsService(TextAnalyticsService):
+    """The real service (batchers, cache) with stub pipelines instead of loaded models."""
+
+    def __init__(self, settings: Settings) -> None:
+        super().__init__(settings)
+        self._summarizer = fake_summarizer
+        self._sentiment = fake_sentiment
+        self._ner = fake_ner
+
+
+@pytest_asyncio.fixture
+async def client():
+    settings = Settings(STARTUP_MODE="lazy", BATCH_MAX_WAIT_MS=5, INFERENCE_CACHE_SIZE=0)
+    with patch("app.main.TextAnalyticsService", FakeModelsService):
+        app = create_app(settings)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+class TestBatchEndpoints:
+    """Tests for the /v1/*/batch endpoints."""
+
+    async def test_summarize_batch_reports_errors_per_item(self, client):
+        """A too short text and a text the model fails on only fail their own slots."""
+        response = await client.post("/v1/summarize/batch", json={"texts": [LONG_TEXT, "short", BROKEN_TEXT]})
+
+        assert response.status_code == 200
+        ok, short, broken = response.json()["results"]
+        assert ok == {"summary": "summary of The centra", "error": None}
+        assert short["summary"] is None
+        assert f"at least {text_min_length(SummarizationRequest)}" in short["error"]
+        assert broken["summary"] is None and "generation failed" in broken["error"]
+
+    async def test_sentiment_batch_uses_schema_min_length(self, client):
+        """The per-item limit is the single-text request's min_length."""
+        limit = text_min_length(SentimentRequest)
+        response = await client.post("/v1/sentiment/batch", json={"texts": ["x" * limit, "x" * (limit - 1)]})
+
+        first, second = response.json()["results"]
+        assert first == {"label": "positive", "score": 0.9, "error": None}
+        assert f"at least {limit}" in second["error"]
+
+    async def test_ner_batch(self, client):
+        """Entities come back per text."""
+        response = await client.post("/v1/ner/batch", json={"texts": [LONG_TEXT]})
+
+        assert response.json()["results"] == [
+            {"entities": [{"text": "Friday", "type": "MISC", "score": 0.8}], "error": None}
+        ]
+
+    async def test_analyze_batch_reports_errors_per_item(self, client):
+        """Full analysis of a batch: the item whose summary fails gets an error, the rest are complete."""
+        response = await client.post("/v1/analyze/batch", json={"texts": [LONG_TEXT, BROKEN_TEXT]})
+
+        ok, broken = response.json()["results"]
+        assert ok["summary"] == "summary of The centra"
+        assert ok["sentiment"] == {"label": "positive", "score": 0.9}
+        assert ok["entities"] == [{"text": "Friday", "type": "MISC", "score": 0.8}]
+        assert "generation failed" in broken["error"]
+
+    async def test_empty_batch_is_rejected(self, client):
+        """An empty texts list is a validation error of the whole request."""
+        response = await client.post("/v1/sentiment/batch", json={"texts": []})
+
+        assert response.status_code == 422
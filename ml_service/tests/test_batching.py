@@ -0,0 +1,110 @@
+# ml_service/tests/test_batching.py
+import asyncio
+import time
+
+import pytest
+
+from app.services.batching import MicroBatcher
+
+
+class Recorder:
+    """Batch runner that records every call and upper-cases its items."""
+
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on
+
+    def __call__(self, key, items):
+        self.calls.append((key, list(items)))
+        if self.fail_on is not None and self.fail_on in items:
+            raise ValueError(f"cannot process {self.fail_on}")
+        return [item.upper() for item in items]
+
+
+@pytest.mark.asyncio
+class TestMicroBatcher:
+    """Tests for dynamic micro-batching."""
+
+    async def test_full_batch_is_flushed_without_waiting(self):
+        """A full batch runs at once instead of waiting for the time window."""
+        runner = Recorder()
+        batcher = MicroBatcher("test", runner, max_batch_size=3, max_wait_ms=1000)
+
+        started = time.monotonic()
+        results = await asyncio.gather(*(batcher.submit(text) for text in ("a", "b", "c")))
+
+        assert results == ["A", "B", "C"]
+        assert runner.calls == [(None, ["a", "b", "c"])]
+        assert time.monotonic() - started < 0.5
+
+    async def test_partial_batch_is_flushed_after_window(self):
+        """A partial batch runs once the oldest item has waited max_wait_ms."""
+        runner = Recorder()
+        batcher = MicroBatcher("test", runner, max_batch_size=10, max_wait_ms=50)
+
+        started = time.monotonic()
+        results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
+
+        assert results == ["A", "B"]
+        assert runner.calls == [(None, ["a", "b"])]
+        assert time.monotonic() - started >= 0.04
+
+    async def test_oversized_burst_is_split(self):
+        """More items than max_batch_size are split into several batches."""
+        runner = Recorder()
+        batcher = MicroBatcher("test", runner, max_batch_size=2, max_wait_ms=10)
+
+        results = await asyncio.gather(*(batcher.submit(text) for text in "abcde"))
+
+        assert results == list("ABCDE")
+        assert [len(items) for _, items in runner.calls] == [2, 2, 1]
+
+    async def test_items_are_batched_by_key(self):
+        """Items with different keys never share a batch."""
+        runner = Recorder()
+        batcher = MicroBatcher("test", runner, max_batch_size=10, max_wait_ms=10)
+
+        results = await asyncio.gather(
+            batcher.submit("a", key=(8, 32)),
+            batcher.submit("b", key=(16, 64)),
+            batcher.submit("c", key=(8, 32)),
+        )
+
+        assert results == ["A", "B", "C"]
+        assert sorted(runner.calls) == [((8, 32), ["a", "c"]), ((16, 64), ["b"])]
+
+    async def test_cancelled_items_are_skipped(self):
+        """An item whose caller went away while queued is not computed."""
+        runner = Recorder()
+        batcher = MicroBatcher("test", runner, max_batch_size=10, max_wait_ms=50)
+
+        cancelled = asyncio.create_task(batcher.submit("gone"))
+        await asyncio.sleep(0)
+        kept = asyncio.create_task(batcher.submit("kept"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        assert await kept == "KEPT"
+        assert runner.calls == [(None, ["kept"])]
+        assert cancelled.cancelled()
+
+    async def test_failure_is_isolated_to_the_bad_item(self):
+        """A failing batch is re-run item by item, so only the bad item gets the error."""
+        runner = Recorder(fail_on="bad")
+        batcher = MicroBatcher("test", runner, max_batch_size=3, max_wait_ms=50)
+
+        results = await asyncio.gather(
+            batcher.submit("a"), batcher.submit("bad"), batcher.submit("c"), return_exceptions=True
+        )
+
+        assert results[0] == "A" and results[2] == "C"
+        assert isinstance(results[1], ValueError)
+        assert runner.calls == [(None, ["a", "bad", "c"]), (None, ["a"]), (None, ["bad"]), (None, ["c"])]
+
+    async def test_wrong_result_count_fails_items(self):
+        """A runner returning the wrong number of results fails each item instead of misrouting results."""
+        batcher = MicroBatcher("test", lambda key, items: [], max_batch_size=2, max_wait_ms=10)
+
+        results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
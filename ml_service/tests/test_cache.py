@@ -0,0 +1,142 @@
+# ml_service/tests/test_cache.py
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.services import cache as cache_module
+from app.services.cache import ResultCache, normalize_text
+
+
+def counter(value="result"):
+    """compute() stub that counts its calls."""
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return value
+
+    compute.calls = calls
+    return compute
+
+
+class TestKey:
+    """Tests for cache keys."""
+
+    def test_whitespace_and_unicode_form_are_normalized(self):
+        """Texts that differ only in whitespace or Unicode normal form share a key."""
+        assert normalize_text("  Привет,\n  мир ") == "Привет, мир"
+        assert ResultCache.key("ner", "Café  news", model="m") == ResultCache.key("ner", "Café news", model="m")
+
+    def test_parameters_change_the_key(self):
+        """Model id and generation parameters are part of the key."""
+        base = ResultCache.key("summarization", "text", model="a", max_tokens=64)
+        assert base != ResultCache.key("summarization", "text", model="b", max_tokens=64)
+        assert base != ResultCache.key("summarization", "text", model="a", max_tokens=128)
+        assert base != ResultCache.key("sentiment", "text", model="a", max_tokens=64)
+
+
+@pytest.mark.asyncio
+class TestResultCache:
+    """Tests for the in-memory and disk tiers of the result cache."""
+
+    async def test_hit_skips_compute(self):
+        """A repeated key is served from memory."""
+        cache = ResultCache(max_entries=8)
+        compute = counter()
+
+        assert await cache.get_or_compute("ner", "k", compute) == "result"
+        assert await cache.get_or_compute("ner", "k", compute) == "result"
+
+        assert len(compute.calls) == 1
+        assert cache.stats()["namespaces"]["ner"] == {"memory_hits": 1, "disk_hits": 0, "coalesced": 0, "misses": 1}
+
+    async def test_lru_eviction(self):
+        """The least recently used entry is evicted once max_entries is exceeded."""
+        cache = ResultCache(max_entries=2)
+        await cache.get_or_compute("ner", "a", counter("A"))
+        await cache.get_or_compute("ner", "b", counter("B"))
+        # Touch "a" so that "b" becomes the least recently used entry
+        await cache.get_or_compute("ner", "a", counter("unused"))
+        await cache.get_or_compute("ner", "c", counter("C"))
+
+        recompute_a, recompute_b = counter("A"), counter("B")
+        assert await cache.get_or_compute("ner", "a", recompute_a) == "A"
+        assert await cache.get_or_compute("ner", "b", recompute_b) == "B"
+        assert (len(recompute_a.calls), len(recompute_b.calls)) == (0, 1)
+        assert cache.stats()["entries"] == 2
+
+    async def test_inflight_duplicates_are_coalesced(self):
+        """Concurrent lookups of one key share a single computation."""
+        cache = ResultCache(max_entries=8)
+        compute = counter()
+
+        results = await asyncio.gather(*(cache.get_or_compute("ner", "k", compute) for _ in range(5)))
+
+        assert results == ["result"] * 5
+        assert len(compute.calls) == 1
+        assert cache.stats()["namespaces"]["ner"]["coalesced"] == 4
+
+    async def test_failure_is_shared_but_not_cached(self):
+        """A failed computation fails its waiters and the next lookup computes again."""
+        cache = ResultCache(max_entries=8)
+
+        async def broken():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("model failed")
+
+        results = await asyncio.gather(
+            cache.get_or_compute("ner", "k", broken), cache.get_or_compute("ner", "k", broken),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert await cache.get_or_compute("ner", "k", counter()) == "result"
+
+    async def test_none_is_not_cached(self):
+        """None (e.g. a fallback summary) is returned but never stored."""
+        cache = ResultCache(max_entries=8)
+        compute = counter(None)
+
+        assert await cache.get_or_compute("summarization", "k", compute) is None
+        assert await cache.get_or_compute("summarization", "k", compute) is None
+        assert len(compute.calls) == 2
+
+    async def test_disabled_cache_always_computes(self):
+        """max_entries=0 disables caching."""
+        cache = ResultCache(max_entries=0)
+        compute = counter()
+
+        await cache.get_or_compute("ner", "k", compute)
+        await cache.get_or_compute("ner", "k", compute)
+
+        assert len(compute.calls) == 2
+        assert cache.stats()["enabled"] is False
+
+    async def test_disk_round_trip(self, tmp_path):
+        """Results survive a restart through the SQLite tier, encoded and decoded as JSON."""
+        path = str(tmp_path / "cache" / "results.sqlite3")
+        first = ResultCache(max_entries=8, disk_path=path)
+        await first.get_or_compute("sentiment", "k", counter(("positive", 0.9)), encode=list, decode=tuple)
+
+        second = ResultCache(max_entries=8, disk_path=path)
+        compute = counter()
+        value = await second.get_or_compute("sentiment", "k", compute, encode=list, decode=tuple)
+
+        assert value == ("positive", 0.9)
+        assert compute.calls == []
+        assert second.stats()["namespaces"]["sentiment"]["disk_hits"] == 1
+
+    async def test_disk_size_limit(self, tmp_path, monkeypatch):
+        """The disk tier is trimmed to disk_max_entries, oldest rows first."""
+        monkeypatch.setattr(cache_module, "_DISK_PRUNE_EVERY", 4)
+        path = str(tmp_path / "results.sqlite3")
+        cache = ResultCache(max_entries=100, disk_path=path, disk_max_entries=3)
+
+        for i in range(8):
+            await cache.get_or_compute("ner", f"k{i}", counter(i))
+
+        with sqlite3.connect(path) as conn:
+            keys = [row[0] for row in conn.execute("SELECT key FROM results ORDER BY rowid")]
+        assert keys == ["k5", "k6", "k7"]
@@ -0,0 +1,125 @@
+# ml_service/tests/test_news_parser.py
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+
+# The parser depends on the crawling stack, which is not part of the model image
+pytest.importorskip("feedparser")
+pytest.importorskip("newspaper")
+
+from app.services import news_parser  # noqa: E402
+from app.services.news_parser import is_rss, parse_news  # noqa: E402
+
+FEED_URL = "https://example.com/rss"
+PAGE_URL = "https://example.com/"
+
+RSS = b"""\xef\xbb\xbf<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Example</title>
+<item><title>First</title><link>https://example.com/news/first</link></item>
+<item><title>Second</title><link>https://example.com/news/second</link></item>
+<item><title>Third</title><link>https://example.com/news/third</link></item>
+</channel></rss>"""
+
+ARTICLE_PATHS = ("2025/12/20/markets-close-higher-after-rate-decision",
+                 "2025/12/20/city-council-approves-new-transit-budget")
+
+PAGE = ("<html><head><title>Example news</title></head><body>"
+        + "".join(f'<a href="{PAGE_URL}{path}.html">{path}</a>' for path in ARTICLE_PATHS)
+        + "</body></html>").encode()
+
+
+def article_html(title):
+    paragraph = f"<p>{title} is reported in detail in this long enough article body. </p>" * 10
+    return f"<html><head><title>{title}</title></head><body><h1>{title}</h1>{paragraph}</body></html>".encode()
+
+
+def fake_fetch(pages):
+    """fetch() stub that serves prepared responses and counts requests per URL."""
+    calls = Counter()
+
+    def fetch(url):
+        calls[url] += 1
+        content, content_type = pages.get(url, (article_html(url.rsplit("/", 1)[-1]), "text/html"))
+        return content, {"Content-Type": content_type}
+
+    fetch.calls = calls
+    return fetch
+
+
+class TestIsRss:
+    """Tests for feed detection on downloaded bytes."""
+
+    def test_rss_with_bom(self):
+        """An RSS document is detected even after a BOM and the XML declaration."""
+        assert is_rss(RSS, "text/html")
+
+    def test_atom_feed(self):
+        """Atom feeds are detected by their root element."""
+        assert is_rss(b'<?xml version="1.0"?>\n<feed xmlns="http://www.w3.org/2005/Atom"></feed>')
+
+    def test_html_page(self):
+        """HTML pages are not feeds, whatever the content type says."""
+        assert not is_rss(PAGE, "application/xhtml+xml")
+
+    def test_falls_back_to_content_type(self):
+        """Without markers in the head the content type decides."""
+        assert is_rss(b"<?xml version='1.0'?><channel/>", "application/xml")
+        assert not is_rss(b"plain text", "text/plain")
+
+    def test_only_document_head_is_inspected(self):
+        """A feed marker deep inside an HTML page does not turn it into a feed."""
+        assert not is_rss(b"<html>" + b" " * 4096 + b"<rss>", "text/html")
+
+
+class TestParseNews:
+    """Tests for parse_news: the source is downloaded once."""
+
+    def test_rss_source_fetched_once(self):
+        """The feed bytes are reused by feedparser, each article is fetched once."""
+        fetch = fake_fetch({FEED_URL: (RSS, "application/rss+xml")})
+
+        with patch.object(news_parser, "fetch", side_effect=fetch):
+            articles = parse_news(FEED_URL, limit=2)
+
+        assert fetch.calls[FEED_URL] == 1
+        assert set(fetch.calls) == {FEED_URL, "https://example.com/news/first", "https://example.com/news/second"}
+        assert all(count == 1 for count in fetch.calls.values())
+        assert sorted(article["title"] for article in articles) == ["first", "second"]
+
+    def test_html_source_fetched_once(self):
+        """Article links are taken from the downloaded page, not from a second request."""
+        fetch = fake_fetch({PAGE_URL: (PAGE, "text/html; charset=utf-8")})
+
+        with patch.object(news_parser, "fetch", side_effect=fetch):
+            articles = parse_news(PAGE_URL, limit=5)
+
+        assert fetch.calls == Counter([PAGE_URL] + [f"{PAGE_URL}{path}.html" for path in ARTICLE_PATHS])
+        assert len(articles) == len(ARTICLE_PATHS)
+
+    def test_failed_source_fetch(self):
+        """A source that can't be downloaded gives None and is not retried."""
+        calls = []
+
+        def fetch(url):
+            calls.append(url)
+            raise ConnectionError("down")
+
+        with patch.object(news_parser, "fetch", side_effect=fetch):
+            assert parse_news(FEED_URL) is None
+
+        assert calls == [FEED_URL]
+
+    def test_failed_article_is_skipped(self):
+        """One article that fails to download does not drop the others."""
+        fetch = fake_fetch({FEED_URL: (RSS, "application/rss+xml")})
+
+        def flaky(url):
+            if url.endswith("/second"):
+                raise ConnectionError("down")
+            return fetch(url)
+
+        with patch.object(news_parser, "fetch", side_effect=flaky):
+            articles = parse_news(FEED_URL, limit=3)
+
+        assert sorted(article["title"] for article in articles) == ["first", "third"]
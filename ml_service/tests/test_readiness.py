@@ -0,0 +1,100 @@
+# ml_service/tests/test_readiness.py
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import Settings
+from app.main import create_app
+from app.services.pipeline import TextAnalyticsService
+
+PIPELINES = {
+    "summarization": lambda texts, **kwargs: [{"summary_text": "summary"} for _ in texts],
+    "sentiment": lambda texts, **kwargs: [[{"label": "neutral", "score": 0.5}] for _ in texts],
+    "ner": lambda texts, **kwargs: [[] for _ in texts],
+}
+
+
+class StubLoader:
+    """_load_pipeline stub: waits for the test to release it, then returns a stub pipeline or fails."""
+
+    def __init__(self, error=None):
+        self.release = threading.Event()
+        self.error = error
+        self.loaded = []
+
+    def __call__(self):
+        loader = self
+
+        async def load_pipeline(service, kind, task, model, **kwargs):
+            # The app runs in the TestClient thread: wait without blocking its event loop
+            await asyncio.to_thread(loader.release.wait, 5)
+            if loader.error is not None:
+                raise loader.error
+            loader.loaded.append(kind)
+            service.load_times[kind] = 0.1
+            return PIPELINES[kind]
+
+        return patch.object(TextAnalyticsService, "_load_pipeline", load_pipeline)
+
+
+def wait_ready(client, timeout=5.0):
+    """Poll /ready until it stops reporting "starting"."""
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get("/ready")
+        if response.json()["status"] != "starting" or time.monotonic() > deadline:
+            return response
+        time.sleep(0.01)
+
+
+def make_app(mode, models=("sentiment", "ner")):
+    settings = Settings(STARTUP_MODE=mode, PRELOAD_MODELS=list(models), BATCH_MAX_WAIT_MS=1, INFERENCE_CACHE_SIZE=0)
+    return create_app(settings)
+
+
+class TestReady:
+    """Tests for the /ready endpoint during startup."""
+
+    @pytest.mark.parametrize("mode", ["preload", "warmup"])
+    def test_not_ready_until_models_loaded(self, mode):
+        """/ready answers 503 while the models load and 200 once they are in memory."""
+        loader = StubLoader()
+        with loader(), TestClient(make_app(mode)) as client:
+            starting = client.get("/ready")
+            assert starting.status_code == 503
+            assert starting.json()["status"] == "starting"
+            assert client.get("/health").status_code == 200
+
+            loader.release.set()
+            response = wait_ready(client)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "ready" and body["mode"] == mode
+        assert body["load_times"] == {"sentiment": 0.1, "ner": 0.1}
+        assert loader.loaded == ["sentiment", "ner"]
+
+    def test_failed_warmup(self):
+        """A model that fails to load keeps /ready red and reports the error."""
+        loader = StubLoader(error=RuntimeError("weights not found"))
+        loader.release.set()
+        with loader(), TestClient(make_app("warmup")) as client:
+            response = wait_ready(client)
+
+        assert response.status_code == 503
+        assert response.json()["status"] == "failed"
+        assert response.json()["error"] == "weights not found"
+
+    def test_lazy_mode_is_ready_immediately(self):
+        """In lazy mode nothing is loaded at startup and /ready is green right away."""
+        loader = StubLoader()
+        with loader(), TestClient(make_app("lazy")) as client:
+            response = client.get("/ready")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+        assert loader.loaded == []
@@ -0,0 +1,30 @@
+"""Add feed watermark to Source
+
+Revision ID: a4c7e1d93b20
+Revises: f2d8a4c61b95
+Create Date: 2026-02-03 14:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e1d93b20'
+down_revision: Union[str, Sequence[str], None] = 'f2d8a4c61b95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('Source', sa.Column('watermark_published_at', sa.DateTime(), nullable=True))
+    op.add_column('Source', sa.Column('watermark_guid', sa.String(length=512), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('Source', 'watermark_guid')
+    op.drop_column('Source', 'watermark_published_at')
@@ -0,0 +1,32 @@
+"""Add conditional GET feed cache to Source
+
+Revision ID: c1f4a8e2d7b3
+Revises: 72d5de59c8fd
+Create Date: 2026-01-12 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1f4a8e2d7b3'
+down_revision: Union[str, Sequence[str], None] = '72d5de59c8fd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('Source', sa.Column('feed_etag', sa.String(length=255), nullable=True))
+    op.add_column('Source', sa.Column('feed_last_modified', sa.String(length=64), nullable=True))
+    op.add_column('Source', sa.Column('feed_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('Source', 'feed_hash')
+    op.drop_column('Source', 'feed_last_modified')
+    op.drop_column('Source', 'feed_etag')
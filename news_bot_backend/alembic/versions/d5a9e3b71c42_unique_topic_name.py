@@ -0,0 +1,46 @@
+"""Make Topic.name unique
+
+Revision ID: d5a9e3b71c42
+Revises: c1f4a8e2d7b3
+Create Date: 2026-01-19 14:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a9e3b71c42'
+down_revision: Union[str, Sequence[str], None] = 'c1f4a8e2d7b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Для каждого имени оставляем топик с минимальным id
+DUPLICATES = """
+    SELECT id, MIN(id) OVER (PARTITION BY name) AS keep_id FROM "Topic"
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Переносим ссылки с дубликатов на оставшийся топик и удаляем дубликаты
+    for table in ("Articles", "Source"):
+        op.execute(f"""
+            UPDATE "{table}" t SET topic_id = d.keep_id
+            FROM ({DUPLICATES}) d
+            WHERE t.topic_id = d.id AND d.id <> d.keep_id
+        """)
+    op.execute(f"""
+        DELETE FROM "Topic" t
+        USING ({DUPLICATES}) d
+        WHERE t.id = d.id AND d.id <> d.keep_id
+    """)
+    op.create_index(op.f('ix_Topic_name'), 'Topic', ['name'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_Topic_name'), table_name='Topic')
@@ -0,0 +1,32 @@
+"""Add adaptive polling schedule to Source
+
+Revision ID: e8b2c6f04a17
+Revises: d5a9e3b71c42
+Create Date: 2026-01-26 11:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b2c6f04a17'
+down_revision: Union[str, Sequence[str], None] = 'd5a9e3b71c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('Source', sa.Column('next_fetch_at', sa.DateTime(), nullable=True))
+    op.add_column('Source', sa.Column('poll_interval_minutes', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_Source_next_fetch_at'), 'Source', ['next_fetch_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_Source_next_fetch_at'), table_name='Source')
+    op.drop_column('Source', 'poll_interval_minutes')
+    op.drop_column('Source', 'next_fetch_at')
@@ -0,0 +1,36 @@
+"""Add circuit breaker state to Source
+
+Revision ID: f2d8a4c61b95
+Revises: e8b2c6f04a17
+Create Date: 2026-01-28 10:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2d8a4c61b95'
+down_revision: Union[str, Sequence[str], None] = 'e8b2c6f04a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('Source', sa.Column('failure_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('Source', sa.Column('circuit_state', sa.String(length=16), server_default='closed', nullable=False))
+    op.add_column('Source', sa.Column('circuit_open_until', sa.DateTime(), nullable=True))
+    op.add_column('Source', sa.Column('last_failure_at', sa.DateTime(), nullable=True))
+    op.add_column('Source', sa.Column('last_error', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('Source', 'last_error')
+    op.drop_column('Source', 'last_failure_at')
+    op.drop_column('Source', 'circuit_open_until')
+    op.drop_column('Source', 'circuit_state')
+    op.drop_column('Source', 'failure_count')
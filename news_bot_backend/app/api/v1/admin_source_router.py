@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_db
+from app.models import User
+from app.models.source import Source
+from app.schemas.source import SourceHealthRead
+from app.services.circuit_breaker import CIRCUIT_CLOSED
+from app.services.dependencies import get_superuser
+
+router = APIRouter(prefix="/admin/sources", tags=["admin-sources"])
+
+@router.get("/tripped", response_model=list[SourceHealthRead])
+async def list_tripped_sources(
+    db: AsyncSession = Depends(get_db),
+    superuser: User = Depends(get_superuser),
+):
+    """Sources whose circuit breaker is open or half-open."""
+    res = await db.execute(
+        select(Source)
+        .where(Source.circuit_state != CIRCUIT_CLOSED)
+        .order_by(Source.circuit_open_until)
+    )
+    sources = res.scalars().all()
+    return [SourceHealthRead.model_validate(s) for s in sources]
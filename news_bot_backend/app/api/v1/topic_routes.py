@@ -9,6 +9,7 @@ from app.db.database import get_db
 from app.models import User, Topic
 from app.schemas.topic import TopicReturn, TopicCreate
 from app.services.dependencies import get_current_user, get_superuser
+from app.services.topic_cache import invalidate_topic_cache
 
 router=APIRouter(prefix="/topic", tags=["topic"])
 
@@ -71,6 +72,7 @@ async def delete_topic(
     try:
         await db.delete(topic)
         await db.commit()
+        await invalidate_topic_cache()
         return {"message": f"Topic with id {topic_id} has been deleted successfully"}
     except:
         raise HTTPException(
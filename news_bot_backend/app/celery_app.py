@@ -20,9 +20,10 @@ celery_app.conf.update(
     enable_utc=True,
 )
 
-# Расписание Beat
+# Расписание Beat: задача отправляет в работу только источники,
+# у которых наступило Source.next_fetch_at
 celery_app.conf.beat_schedule = {
-    "parse-news-every-30-minutes": {
+    "dispatch-due-sources": {
         "task": "app.tasks.news_tasks.run_news_pipeline",
         "schedule": crontab(*settings.INGEST_CRON.split())
     },
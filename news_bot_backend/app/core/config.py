@@ -56,18 +56,83 @@ class Settings(BaseSettings):
         default="http://ml-service:8100/v1/summarize",  # Fixed: added /v1
         description="Full URL of the summarization endpoint.",
     )
+    ML_ANALYZE_URL: str = Field(
+        default="http://ml-service:8100/v1/analyze",
+        description="Full URL of the analysis endpoint (summary, sentiment and entities in one call).",
+    )
+    ML_ANALYZE_BATCH_URL: str = Field(
+        default="http://ml-service:8100/v1/analyze/batch",
+        description="Full URL of the batch analysis endpoint.",
+    )
+    ML_BATCH_SIZE: int = Field(
+        default=32,
+        description="Max texts per batch request to the ML service.",
+    )
     ML_TIMEOUT: int = Field(
         default=60,
         description="Timeout in seconds for ML service response."
     )
+    ML_CONCURRENCY: int = Field(
+        default=4,
+        description="Concurrent ML service requests per ingestion pipeline."
+    )
 
     # --- CELERY & PARSER ---
     CELERY_BROKER_URL: str = Field(default="redis://redis:6379/0")
     CELERY_RESULT_BACKEND: str = Field(default="redis://redis:6379/1")
+    REDIS_URL: str = Field(
+        default="redis://redis:6379/2",
+        description="Redis for shared worker state (caches, locks).",
+    )
 
     INGEST_CRON: str = Field(
-        default="*/30 * * * *",
-        description="Crontab expression for automatic ingestion schedule.",
+        default="*/5 * * * *",
+        description="Crontab expression for dispatching sources that are due for polling.",
+    )
+
+    SOURCE_DEFAULT_POLL_MINUTES: int = Field(
+        default=30,
+        description="Poll interval for sources without publish history."
+    )
+    SOURCE_MIN_POLL_MINUTES: int = Field(
+        default=5,
+        description="Lower bound of the adaptive per-source poll interval."
+    )
+    SOURCE_MAX_POLL_MINUTES: int = Field(
+        default=24 * 60,
+        description="Upper bound of the adaptive per-source poll interval."
+    )
+    SOURCE_POLL_BACKOFF: float = Field(
+        default=1.5,
+        description="Interval multiplier after a poll that found no new articles."
+    )
+    SOURCE_FRESHNESS_MINUTES: int = Field(
+        default=10,
+        description="A user sync skips sources fetched less than this many minutes ago."
+    )
+    SOURCE_LOCK_TTL_SECONDS: int = Field(
+        default=600,
+        description="TTL of the per-source fetch lock in Redis (covers crashed workers)."
+    )
+    SOURCE_LOCK_WAIT_SECONDS: int = Field(
+        default=120,
+        description="How long a user sync waits for fetches already running in other workers."
+    )
+    SOURCE_FAILURE_THRESHOLD: int = Field(
+        default=3,
+        description="Consecutive failed polls after which the source circuit opens."
+    )
+    SOURCE_BACKOFF_BASE_MINUTES: int = Field(
+        default=15,
+        description="Retry delay after the first failed poll, doubled on each next failure."
+    )
+    SOURCE_BACKOFF_MAX_MINUTES: int = Field(
+        default=24 * 60,
+        description="Upper bound of the retry delay of a failing source."
+    )
+    SOURCE_DISPATCH_LEASE_MINUTES: int = Field(
+        default=30,
+        description="How long a dispatched source is not re-dispatched while its task runs."
     )
 
     MAX_ARTICLES_PER_SOURCE: int = Field(
@@ -77,7 +142,85 @@ class Settings(BaseSettings):
 
     PARSER_THREADS: int = Field(
         default=10,
-        description="Number of concurrent threads for the news parser."
+        description="Max concurrent HTTP requests of the news parser (shared per worker process)."
+    )
+
+    INGEST_QUEUE_SIZE: int = Field(
+        default=50,
+        description="Capacity of each queue between ingestion pipeline stages."
+    )
+
+    INGEST_BATCH_SIZE: int = Field(
+        default=50,
+        description="Max articles written by one INSERT of the ingestion pipeline."
+    )
+
+    # Пул создается в каждом процессе: у Celery prefork - в каждом дочернем (--concurrency, по умолчанию
+    # по числу CPU), поэтому всего процессов разбора = concurrency * EXTRACTION_PROCESSES
+    EXTRACTION_PROCESSES: int = Field(
+        default=1,
+        ge=0,
+        description="HTML extraction processes per worker process (0 parses in a thread)."
+    )
+
+    EXTRACTION_TASKS_PER_CHILD: int = Field(
+        default=500,
+        description="Restart an extraction process after this many articles to release memory."
+    )
+
+    HTML_STORE_DIR: Optional[str] = Field(
+        default=None,
+        description="Directory of the compressed raw HTML store (disabled when empty)."
+    )
+
+    HTML_STORE_MAX_MB: int = Field(
+        default=2048,
+        description="Size limit of the raw HTML store; least recently used pages are evicted."
+    )
+
+    CRAWL_MAX_PER_HOST: int = Field(
+        default=2,
+        description="Max concurrent requests to a single host."
+    )
+
+    CRAWL_DEFAULT_DELAY: float = Field(
+        default=0.5,
+        description="Seconds between requests to one host when robots.txt sets no Crawl-delay."
+    )
+
+    CRAWL_HOST_BURST: int = Field(
+        default=2,
+        description="Token bucket size per host (requests allowed back to back)."
+    )
+
+    ROBOTS_CACHE_TTL: int = Field(
+        default=3600,
+        description="Seconds to cache robots.txt rules per host."
+    )
+
+    FETCH_MAX_MB: int = Field(
+        default=5,
+        description="Max size of a downloaded page or feed after decompression; larger responses are dropped."
+    )
+
+    FETCH_MEMORY_BUDGET_MB: int = Field(
+        default=64,
+        description="Total memory for response bodies being downloaded at once by one worker process."
+    )
+
+    SITEMAP_MAX_MB: int = Field(
+        default=20,
+        description="Max size of a downloaded sitemap."
+    )
+
+    SITEMAP_MAX_FILES: int = Field(
+        default=4,
+        description="Max sitemap files fetched per source poll (index plus child sitemaps)."
+    )
+
+    SOURCE_BUILD_CACHE_MINUTES: int = Field(
+        default=360,
+        description="How long links found by newspaper.build are reused for a source."
     )
 
 
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
@@ -16,6 +17,17 @@ SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 async_engine = create_async_engine(_settings.get_async_db_url)
 AsyncSessionLocal = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
 
+
+def dialect_insert(session: AsyncSession, table):
+    """
+    INSERT с поддержкой on_conflict_do_nothing для диалекта сессии
+    (PostgreSQL в проде, SQLite в тестах).
+    """
+    if session.bind.dialect.name == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
+
 async def get_db():
     async with AsyncSessionLocal() as session:
         try:
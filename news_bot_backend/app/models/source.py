@@ -17,6 +17,24 @@ class Source(Base):
     updated_at = Column(DateTime, onupdate=datetime.utcnow)
     is_active = Column(Boolean, default=True)
     last_fetched_at = Column(DateTime)
+    # Время следующего опроса, вычисляется по частоте публикаций источника
+    next_fetch_at = Column(DateTime, index=True)
+    poll_interval_minutes = Column(Integer)
+
+    # Circuit breaker: ошибки опроса подряд и пауза до следующей попытки
+    failure_count = Column(Integer, default=0, nullable=False, server_default="0")
+    circuit_state = Column(String(16), default="closed", nullable=False, server_default="closed")
+    circuit_open_until = Column(DateTime)
+    last_failure_at = Column(DateTime)
+    last_error = Column(String(255))
+
+    # Кеш условного GET для фида
+    feed_etag = Column(String(255))
+    feed_last_modified = Column(String(64))
+    feed_hash = Column(String(64))
+    # Водяной знак: самая свежая обработанная запись фида
+    watermark_published_at = Column(DateTime)
+    watermark_guid = Column(String(512))
 
     topic_id=Column(Integer, ForeignKey("Topic.id", ondelete="CASCADE", onupdate="CASCADE"))
     topic=relationship("Topic", back_populates="sources")
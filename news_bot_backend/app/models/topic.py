@@ -8,7 +8,7 @@ class Topic(Base):
     __tablename__ = "Topic"
 
     id=Column(Integer, primary_key=True, autoincrement=True, index=True)
-    name=Column(String(50), nullable=False)
+    name=Column(String(50), nullable=False, unique=True, index=True)
 
     sources = relationship("Source", back_populates="topic")
     articles = relationship("Articles", back_populates="topic")  # Добавляем обратную связь
\ No newline at end of file
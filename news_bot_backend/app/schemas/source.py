@@ -29,5 +29,19 @@ class SourceRead(SourceBase):
     created_at: Optional[datetime]
     updated_at: Optional[datetime]
     last_fetched_at: Optional[datetime]
+    next_fetch_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
+class SourceHealthRead(BaseModel):
+    id: int
+    source_name: Optional[str]
+    source_url: str
+    circuit_state: str
+    failure_count: int
+    circuit_open_until: Optional[datetime]
+    last_failure_at: Optional[datetime]
+    last_error: Optional[str]
 
     model_config = {"from_attributes": True}
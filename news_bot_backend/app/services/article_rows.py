@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging_config import get_logger
+from app.db.database import dialect_insert
+from app.models import Articles, Source
+from app.services.topic_cache import topic_cache
+
+logger = get_logger(__name__)
+
+ARTICLE_URL_MAX_LENGTH = Articles.__table__.c.url.type.length
+ARTICLE_TITLE_MAX_LENGTH = Articles.__table__.c.title.type.length
+ARTICLE_IMAGE_URL_MAX_LENGTH = Articles.__table__.c.image_url.type.length
+
+
+def to_naive_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """
+    Конвертирует timezone-aware datetime в naive UTC.
+    Если datetime уже naive, возвращает как есть.
+    Если None, возвращает None.
+    """
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        return dt
+    # Конвертируем в UTC и убираем timezone info
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def topic_key(topic_name: Optional[str]) -> Optional[str]:
+    """Ключ топика так, как он хранится в Topic.name."""
+    if not topic_name or not topic_name.strip():
+        return None
+    return topic_name.strip()[:50]  # Ограничиваем длину
+
+
+async def resolve_topic_ids(topic_names: Iterable[Optional[str]]) -> Dict[str, int]:
+    """
+    Возвращает topic_id для всех имен топиков пачки статей.
+    Известные имена берутся из кеша процесса, новые создаются одним запросом.
+    """
+    names = {key for key in map(topic_key, topic_names) if key}
+    if not names:
+        return {}
+
+    try:
+        await topic_cache.sync()
+        return await topic_cache.resolve(names)
+    except Exception as e:
+        logger.error(f"Error resolving topics {sorted(names)}: {e}", exc_info=True)
+        return {}
+
+
+def article_row(source: Source, item: Dict, topic_ids: Dict[str, int]) -> Dict:
+    """Строка Articles из готовой статьи (после разбора и анализа в ML-сервисе)."""
+    # Топик из статьи, по умолчанию используем топик источника
+    topic_id = topic_ids.get(topic_key(item.get("topic"))) or source.topic_id
+
+    pub_dt = to_naive_utc(item.get("published_at")) or datetime.utcnow()
+    return {
+        "title": item["title"],
+        "summary": item["summary"],
+        "image_url": item.get("image_url"),
+        "url": item["url"],
+        "published_at": pub_dt,  # Без tzinfo
+        "source_id": source.id,
+        "topic_id": topic_id,
+        "sentiment_label": item.get("sentiment_label"),
+        "sentiment_score": item.get("sentiment_score"),
+        "entities": item.get("entities") or [],
+    }
+
+
+def fit_article_row(row: Dict) -> Optional[Dict]:
+    """
+    Подгоняет строку под размеры колонок Articles, чтобы одна длинная строка
+    не роняла весь multi-row INSERT. Слишком длинный url обрезать нельзя.
+    """
+    if not row.get("url") or len(row["url"]) > ARTICLE_URL_MAX_LENGTH:
+        logger.warning(f"Skipping article with invalid url: {row.get('url')}")
+        return None
+    if row.get("title") and len(row["title"]) > ARTICLE_TITLE_MAX_LENGTH:
+        row["title"] = row["title"][:ARTICLE_TITLE_MAX_LENGTH]
+    if row.get("image_url") and len(row["image_url"]) > ARTICLE_IMAGE_URL_MAX_LENGTH:
+        row["image_url"] = None
+    return row
+
+
+async def insert_articles(session: AsyncSession, rows: List[Dict]) -> List[int]:
+    """
+    Записывает статьи одним INSERT ... ON CONFLICT (url) DO NOTHING RETURNING id.
+    Дубликаты от параллельных прогонов молча пропускаются.
+    Возвращает id реально вставленных строк.
+    """
+    rows = [fitted for fitted in (fit_article_row(row) for row in rows) if fitted]
+    if not rows:
+        return []
+
+    stmt = (
+        dialect_insert(session, Articles)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[Articles.url])
+        .returning(Articles.id)
+    )
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+# Пробный опрос после истечения паузы: успех закрывает цепь, ошибка снова открывает
+CIRCUIT_HALF_OPEN = "half_open"
+
+SOURCE_ERROR_MAX_LENGTH = 255
+
+
+def compute_backoff(failures: int) -> timedelta:
+    """Пауза после failures ошибок подряд: base * 2^(failures-1), не больше максимума."""
+    minutes = settings.SOURCE_BACKOFF_BASE_MINUTES * 2 ** max(0, failures - 1)
+    return timedelta(minutes=min(minutes, settings.SOURCE_BACKOFF_MAX_MINUTES))
+
+
+def is_tripped(source, now: datetime) -> bool:
+    """Цепь открыта и пауза еще не истекла - источник опрашивать не нужно."""
+    return (
+        source.circuit_state == CIRCUIT_OPEN
+        and source.circuit_open_until is not None
+        and source.circuit_open_until > now
+    )
+
+
+def begin_attempt(source, now: datetime) -> bool:
+    """
+    Вызывается перед опросом источника. Возвращает False, если цепь открыта.
+    Истекшая открытая цепь переводится в half-open (пробный опрос).
+    """
+    if is_tripped(source, now):
+        return False
+    if source.circuit_state == CIRCUIT_OPEN:
+        source.circuit_state = CIRCUIT_HALF_OPEN
+    return True
+
+
+def record_success(source) -> None:
+    source.failure_count = 0
+    source.circuit_state = CIRCUIT_CLOSED
+    source.circuit_open_until = None
+    source.last_error = None
+
+
+def record_failure(source, error: str, now: datetime) -> None:
+    """
+    Учитывает ошибку опроса: следующий опрос откладывается с экспоненциальной
+    паузой, а после SOURCE_FAILURE_THRESHOLD ошибок подряд (или ошибки пробного
+    опроса) цепь открывается до конца паузы.
+    """
+    source.failure_count = (source.failure_count or 0) + 1
+    source.last_error = (error or "unknown error")[:SOURCE_ERROR_MAX_LENGTH]
+    source.last_failure_at = now
+
+    retry_at = now + compute_backoff(source.failure_count)
+    source.next_fetch_at = retry_at
+    if source.circuit_state == CIRCUIT_HALF_OPEN or source.failure_count >= settings.SOURCE_FAILURE_THRESHOLD:
+        source.circuit_state = CIRCUIT_OPEN
+        source.circuit_open_until = retry_at
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# (status_code, text) ответа на robots.txt
+RobotsLoader = Callable[[str], Awaitable[Tuple[int, str]]]
+
+
+class RobotsDisallowedError(Exception):
+    """URL запрещен правилами robots.txt."""
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Сколько секунд ждать до появления токена (0 - можно сейчас)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+
+class _HostState:
+    def __init__(self, bucket: _TokenBucket) -> None:
+        self.bucket = bucket
+        self.active = 0
+        self.last_served = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.robots: Optional[RobotFileParser] = None
+        self.robots_expires_at = 0.0
+        self.robots_lock = asyncio.Lock()
+
+
+class CrawlScheduler:
+    """
+    Планировщик вежливого обхода: token bucket и лимит одновременных
+    запросов на хост, правила robots.txt (с Crawl-delay) с кешем по TTL,
+    выдача слотов разным хостам по кругу (round-robin) в рамках общего лимита.
+    Экземпляр привязан к event loop, в котором создан.
+    """
+
+    def __init__(
+        self,
+        robots_loader: RobotsLoader,
+        user_agent: str,
+        max_concurrency: int,
+        per_host: int,
+        default_delay: float,
+        host_burst: int,
+        robots_ttl: float,
+    ) -> None:
+        self._robots_loader = robots_loader
+        self._user_agent = user_agent
+        self._max_concurrency = max_concurrency
+        self._per_host = per_host
+        self._default_delay = default_delay
+        self._host_burst = host_burst
+        self._robots_ttl = robots_ttl
+
+        self._hosts: Dict[str, _HostState] = {}
+        self._pending: Set[str] = set()
+        self._active = 0
+        self._served = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Ждет разрешения на запрос к url и держит слот на время запроса."""
+        host = urlsplit(url).netloc.lower()
+        state = self._get_host(host)
+
+        robots = await self._get_robots(url, host, state)
+        if robots is not None and not robots.can_fetch(self._user_agent, url):
+            raise RobotsDisallowedError(url)
+
+        await self._acquire(host, state)
+        try:
+            yield
+        finally:
+            self._release(state)
+
+    async def sitemaps(self, url: str) -> List[str]:
+        """Адреса sitemap-ов из robots.txt хоста url (из того же кеша правил)."""
+        host = urlsplit(url).netloc.lower()
+        robots = await self._get_robots(url, host, self._get_host(host))
+        if robots is None:
+            return []
+        return list(robots.site_maps() or [])
+
+    def _get_host(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(_TokenBucket(rate=1 / self._default_delay, capacity=self._host_burst))
+            self._hosts[host] = state
+        return state
+
+    async def _get_robots(self, url: str, host: str, state: _HostState) -> Optional[RobotFileParser]:
+        if time.monotonic() < state.robots_expires_at:
+            return state.robots
+
+        async with state.robots_lock:
+            if time.monotonic() < state.robots_expires_at:
+                return state.robots
+
+            parts = urlsplit(url)
+            robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+            robots = RobotFileParser(robots_url)
+            try:
+                status_code, text = await self._robots_loader(robots_url)
+                if status_code in (401, 403):
+                    robots.disallow_all = True
+                elif status_code >= 400:
+                    robots.allow_all = True
+                else:
+                    robots.parse(text.splitlines())
+            except Exception as e:
+                # robots.txt недоступен - не блокируем обход хоста
+                logger.warning("Failed to load %s: %s", robots_url, e)
+                robots.allow_all = True
+
+            crawl_delay = robots.crawl_delay(self._user_agent)
+            if crawl_delay:
+                # Crawl-delay задает строгий интервал без burst
+                state.bucket = _TokenBucket(rate=1 / float(crawl_delay), capacity=1)
+                logger.info("Using Crawl-delay %ss for %s", crawl_delay, host)
+
+            state.robots = robots
+            state.robots_expires_at = time.monotonic() + self._robots_ttl
+            return robots
+
+    async def _acquire(self, host: str, state: _HostState) -> None:
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        state.waiters.append(waiter)
+        self._pending.add(host)
+        self._dispatch()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Слот мог быть выдан одновременно с отменой - возвращаем его
+            if waiter.done() and not waiter.cancelled():
+                self._release(state)
+            raise
+
+    def _release(self, state: _HostState) -> None:
+        state.active -= 1
+        self._active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """
+        Выдает свободные слоты ожидающим запросам. Среди хостов, которым сейчас
+        можно отправить запрос, выбирается тот, что обслуживался давнее всех.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        next_wake: Optional[float] = None
+
+        while self._active < self._max_concurrency and self._pending:
+            candidate: Optional[_HostState] = None
+            for host in list(self._pending):
+                state = self._hosts[host]
+                while state.waiters and state.waiters[0].done():
+                    state.waiters.popleft()
+                if not state.waiters:
+                    self._pending.discard(host)
+                    continue
+                if state.active >= self._per_host:
+                    continue
+
+                wait = state.bucket.delay(now)
+                if wait > 0:
+                    next_wake = wait if next_wake is None else min(next_wake, wait)
+                    continue
+
+                if candidate is None or state.last_served < candidate.last_served:
+                    candidate = state
+
+            if candidate is None:
+                break
+
+            self._served += 1
+            candidate.last_served = self._served
+            candidate.bucket.consume()
+            candidate.active += 1
+            self._active += 1
+            candidate.waiters.popleft().set_result(None)
+
+        if next_wake is not None and self._pending:
+            self._timer = asyncio.get_running_loop().call_later(next_wake, self._dispatch)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from io import BytesIO
+from typing import Callable, List, Optional
+
+from lxml import etree
+
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+DC_NS = "{http://purl.org/dc/elements/1.1/}"
+
+RSS_ITEM = "item"
+ATOM_ENTRY = f"{ATOM_NS}entry"
+
+
+@dataclass
+class FeedEntry:
+    link: str
+    published: Optional[datetime] = None
+    category: Optional[str] = None
+    guid: Optional[str] = None
+
+
+def _text(elem, tag: str) -> Optional[str]:
+    child = elem.find(tag)
+    if child is None or not child.text:
+        return None
+    return child.text.strip() or None
+
+
+def _parse_rfc822(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def _parse_iso(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def _rss_entry(item) -> Optional[FeedEntry]:
+    link = _text(item, "link")
+    guid = _text(item, "guid")
+    if not link and guid and guid.startswith("http"):
+        link = guid
+    if not link:
+        return None
+    published = _parse_rfc822(_text(item, "pubDate")) or _parse_iso(_text(item, f"{DC_NS}date"))
+    category = _text(item, "category") or _text(item, f"{DC_NS}subject")
+    return FeedEntry(link=link, published=published, category=category, guid=guid)
+
+
+def _atom_entry(entry) -> Optional[FeedEntry]:
+    link = None
+    for candidate in entry.iterfind(f"{ATOM_NS}link"):
+        if candidate.get("rel", "alternate") == "alternate" and candidate.get("href"):
+            link = candidate.get("href").strip()
+            break
+    if not link:
+        return None
+    published = _parse_iso(_text(entry, f"{ATOM_NS}published")) or _parse_iso(_text(entry, f"{ATOM_NS}updated"))
+    category = None
+    category_elem = entry.find(f"{ATOM_NS}category")
+    if category_elem is not None:
+        category = (category_elem.get("term") or category_elem.get("label") or "").strip() or None
+    return FeedEntry(link=link, published=published, category=category, guid=_text(entry, f"{ATOM_NS}id"))
+
+
+def read_feed(
+    content: bytes,
+    limit: int,
+    stop: Optional[Callable[[FeedEntry], bool]] = None,
+) -> Optional[List[FeedEntry]]:
+    """
+    Потоковое чтение RSS 2.0 / Atom через lxml.iterparse: разбирается только
+    начало фида, пока не набрано limit записей или stop(entry) не вернул True
+    (запись, на которой сработал stop, в результат не входит).
+    Возвращает None, если это не RSS 2.0 / Atom, фид битый или записей нет -
+    тогда вызывающий код разбирает фид через feedparser. Пустой список
+    означает, что stop сработал на первой же записи.
+    """
+    entries: List[FeedEntry] = []
+    stopped = False
+    try:
+        context = etree.iterparse(
+            BytesIO(content),
+            events=("start", "end"),
+            resolve_entities=False,
+            no_network=True,
+            remove_comments=True,
+        )
+        root_checked = False
+        for event, elem in context:
+            if not root_checked:
+                if elem.tag not in ("rss", f"{ATOM_NS}feed"):
+                    return None
+                root_checked = True
+                continue
+            if event != "end" or elem.tag not in (RSS_ITEM, ATOM_ENTRY):
+                continue
+
+            entry = _rss_entry(elem) if elem.tag == RSS_ITEM else _atom_entry(elem)
+            # Освобождаем уже разобранные записи, чтобы память не росла с размером фида
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+            if entry is None:
+                continue
+            if stop is not None and stop(entry):
+                stopped = True
+                break
+            entries.append(entry)
+            if len(entries) >= limit:
+                break
+    except etree.XMLSyntaxError as e:
+        logger.info("Feed is not well-formed XML, falling back to feedparser: %s", e)
+        return None
+
+    if not entries and not stopped:
+        return None
+    return entries
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+from app.core.config import get_settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# После вытеснения заполняем хранилище не больше чем на эту долю лимита
+EVICT_TARGET_RATIO = 0.9
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class HtmlStore:
+    """
+    Content-addressed хранилище скачанного HTML на диске.
+
+    objects/<sha[:2]>/<sha>.gz - сжатое содержимое, одинаковые страницы хранятся один раз;
+    urls/<sha(url)[:2]>/<sha(url)>.json - последняя версия страницы по url.
+    При превышении max_bytes удаляются объекты, к которым дольше всего не обращались
+    (по mtime). Методы блокирующие - из async-кода вызываются через asyncio.to_thread.
+    """
+
+    def __init__(self, root: Union[str, Path], max_bytes: int) -> None:
+        self._root = Path(root)
+        self._objects = self._root / "objects"
+        self._urls = self._root / "urls"
+        self._max_bytes = max_bytes
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str) -> Path:
+        return self._objects / digest[:2] / f"{digest}.gz"
+
+    def _manifest_path(self, url: str) -> Path:
+        key = _sha256(url.encode("utf-8"))
+        return self._urls / key[:2] / f"{key}.json"
+
+    def put(self, url: str, html: Union[str, bytes]) -> str:
+        """Сохраняет страницу, возвращает sha256 ее содержимого."""
+        is_text = isinstance(html, str)
+        raw = html.encode("utf-8") if is_text else html
+        digest = _sha256(raw)
+
+        path = self._object_path(digest)
+        if path.exists():
+            path.touch()
+        else:
+            data = gzip.compress(raw)
+            _atomic_write(path, data)
+            self._add_size(len(data))
+
+        manifest = {
+            "url": url,
+            "digest": digest,
+            "text": is_text,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+        }
+        _atomic_write(self._manifest_path(url), json.dumps(manifest).encode("utf-8"))
+        return digest
+
+    def get(self, url: str) -> Optional[Union[str, bytes]]:
+        """Последняя сохраненная версия страницы по url."""
+        try:
+            manifest = json.loads(self._manifest_path(url).read_bytes())
+        except FileNotFoundError:
+            return None
+        return self.load(manifest)
+
+    def load(self, manifest: Dict) -> Optional[Union[str, bytes]]:
+        path = self._object_path(manifest["digest"])
+        try:
+            raw = gzip.decompress(path.read_bytes())
+        except FileNotFoundError:
+            # Объект вытеснен - ссылка на него больше не нужна
+            self._manifest_path(manifest["url"]).unlink(missing_ok=True)
+            return None
+        path.touch()
+        return raw.decode("utf-8") if manifest["text"] else raw
+
+    def entries(self) -> Iterator[Dict]:
+        """Манифесты всех сохраненных url."""
+        for path in self._urls.glob("*/*.json"):
+            try:
+                yield json.loads(path.read_bytes())
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping broken manifest %s: %s", path, e)
+
+    def _add_size(self, delta: int) -> None:
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += delta
+            if self._size > self._max_bytes:
+                self._evict()
+
+    def _scan_size(self) -> int:
+        return sum(p.stat().st_size for p in self._objects.glob("*/*.gz"))
+
+    def _evict(self) -> None:
+        # Хранилище могут заполнять несколько процессов - пересчитываем по диску
+        files = []
+        for path in self._objects.glob("*/*.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+
+        size = sum(file_size for _, file_size, _ in files)
+        target = self._max_bytes * EVICT_TARGET_RATIO
+        removed = 0
+        for _, file_size, path in files:
+            if size <= target:
+                break
+            path.unlink(missing_ok=True)
+            size -= file_size
+            removed += 1
+        self._size = size
+        logger.info("HTML store: evicted %s objects, %s bytes left", removed, size)
+
+
+_store: Optional[HtmlStore] = None
+
+
+def get_html_store() -> Optional[HtmlStore]:
+    """Общее хранилище процесса или None, если HTML_STORE_DIR не задан."""
+    global _store
+    if _store is None and settings.HTML_STORE_DIR:
+        _store = HtmlStore(settings.HTML_STORE_DIR, settings.HTML_STORE_MAX_MB * 1024 * 1024)
+    return _store
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+
+import httpx
+
+from app.core.config import get_settings
+from app.core.logging_config import get_logger
+from app.services.crawl_scheduler import CrawlScheduler
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+USER_AGENT = "newsagent-bot/0.1 (+https://example.com/contact)"
+
+# Допустимые Content-Type (подстроки media type); ответ без заголовка принимается
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml")
+# URL источника может оказаться как фидом, так и HTML-страницей
+FEED_CONTENT_TYPES = ("xml", "rss", "atom", "text/html", "text/plain")
+SITEMAP_CONTENT_TYPES = ("xml", "text/plain", "gzip", "octet-stream")
+# robots.txt иногда отдают как text/html - такие правила тоже учитываем
+ROBOTS_CONTENT_TYPES = ("text/plain", "text/html")
+# Больше не читаем: слишком большой robots.txt считается недоступным (обход разрешен)
+ROBOTS_MAX_BYTES = 512 * 1024
+
+
+class ResponseRejectedError(Exception):
+    """Ответ отброшен без чтения тела целиком."""
+
+
+class ResponseTooLargeError(ResponseRejectedError):
+    """Тело ответа больше допустимого размера."""
+
+
+class UnsupportedContentTypeError(ResponseRejectedError):
+    """Content-Type ответа не подходит для запроса."""
+
+
+class MemoryBudget:
+    """
+    Общий бюджет памяти на тела скачиваемых ответов. Место резервируется
+    до чтения тела и освобождается после него, поэтому суммарный объем
+    одновременно скачиваемых данных не превышает limit.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.used = 0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def reserve(self, size: int) -> AsyncIterator[None]:
+        # Ответ больше всего бюджета занимает его целиком, но не ждет вечно
+        size = min(size, self.limit)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.used + size <= self.limit)
+            self.used += size
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.used -= size
+                self._condition.notify_all()
+
+
+class HttpFetcher:
+    """
+    Общий пул соединений для парсера: один httpx.AsyncClient с keep-alive.
+    Все запросы проходят через CrawlScheduler, который ограничивает общее
+    число одновременных запросов и нагрузку на каждый хост.
+    """
+
+    def __init__(self, concurrency: int, timeout: float) -> None:
+        self._scheduler = CrawlScheduler(
+            robots_loader=self._load_robots,
+            user_agent=USER_AGENT,
+            max_concurrency=concurrency,
+            per_host=settings.CRAWL_MAX_PER_HOST,
+            default_delay=settings.CRAWL_DEFAULT_DELAY,
+            host_burst=settings.CRAWL_HOST_BURST,
+            robots_ttl=settings.ROBOTS_CACHE_TTL,
+        )
+        self._budget = MemoryBudget(settings.FETCH_MEMORY_BUDGET_MB * 1024 * 1024)
+        self._client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            timeout=timeout,
+            follow_redirects=True,
+            # Общее число запросов ограничивает планировщик
+            limits=httpx.Limits(
+                max_connections=None,
+                max_keepalive_connections=concurrency,
+            ),
+        )
+
+    async def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        max_bytes: Optional[int] = None,
+        content_types: Optional[Sequence[str]] = None,
+    ) -> httpx.Response:
+        """
+        GET через планировщик обхода с потоковым чтением тела: Content-Type
+        успешного ответа проверяется до чтения тела, тело читается не больше
+        max_bytes (после распаковки) в рамках общего бюджета памяти.
+        """
+        async with self._scheduler.slot(url):
+            return await self._stream_get(url, headers, max_bytes, content_types)
+
+    async def _stream_get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        max_bytes: Optional[int] = None,
+        content_types: Optional[Sequence[str]] = None,
+    ) -> httpx.Response:
+        """Потоковый GET без планировщика (см. get)."""
+        max_bytes = max_bytes or settings.FETCH_MAX_MB * 1024 * 1024
+        async with self._client.stream("GET", url, headers=headers) as response:
+            if response.is_success and content_types:
+                self._check_content_type(url, response, content_types)
+
+            declared = response.headers.get("Content-Length")
+            if declared and declared.isdigit() and int(declared) > max_bytes:
+                raise ResponseTooLargeError(f"{url}: Content-Length {declared} > {max_bytes}")
+
+            # Content-Length сжатого ответа ничего не говорит о размере после распаковки
+            if declared and declared.isdigit() and "Content-Encoding" not in response.headers:
+                reserve = int(declared)
+            else:
+                reserve = max_bytes
+            async with self._budget.reserve(reserve):
+                content = await self._read_body(url, response, max_bytes)
+
+        # Тело уже распаковано: отдаем ответ без Content-Encoding
+        response_headers = response.headers.copy()
+        response_headers.pop("Content-Encoding", None)
+        response_headers.pop("Content-Length", None)
+        return httpx.Response(
+            response.status_code,
+            headers=response_headers,
+            content=content,
+            request=response.request,
+        )
+
+    @staticmethod
+    def _check_content_type(url: str, response: httpx.Response, content_types: Sequence[str]) -> None:
+        content_type = response.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        if content_type and not any(allowed in content_type for allowed in content_types):
+            raise UnsupportedContentTypeError(f"{url}: {content_type}")
+
+    @staticmethod
+    async def _read_body(url: str, response: httpx.Response, max_bytes: int) -> bytes:
+        chunks: List[bytes] = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > max_bytes:
+                raise ResponseTooLargeError(f"{url}: body exceeds {max_bytes} bytes")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def sitemaps(self, url: str) -> List[str]:
+        """Sitemap-ы, объявленные в robots.txt хоста url."""
+        return await self._scheduler.sitemaps(url)
+
+    async def _load_robots(self, robots_url: str) -> Tuple[int, str]:
+        # robots.txt запрашивается в обход планировщика, один раз на TTL,
+        # но с теми же ограничениями размера и памяти, что и остальные ответы
+        response = await self._stream_get(
+            robots_url, max_bytes=ROBOTS_MAX_BYTES, content_types=ROBOTS_CONTENT_TYPES
+        )
+        return response.status_code, response.text
+
+    async def fetch_html(self, url: str) -> Optional[Union[str, bytes]]:
+        """
+        Скачивает страницу статьи. Если кодировка не указана в заголовках,
+        возвращает bytes - newspaper сам определит ее по meta-тегам.
+        """
+        response = await self.get(url, content_types=HTML_CONTENT_TYPES)
+        response.raise_for_status()
+        if response.charset_encoding:
+            return response.text
+        return response.content
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+# Клиент привязан к event loop, поэтому храним по одному на loop
+_fetchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, HttpFetcher]" = weakref.WeakKeyDictionary()
+
+
+def get_fetcher() -> HttpFetcher:
+    """Возвращает общий fetcher для текущего event loop."""
+    loop = asyncio.get_running_loop()
+    fetcher = _fetchers.get(loop)
+    if fetcher is None:
+        fetcher = HttpFetcher(concurrency=settings.PARSER_THREADS, timeout=10)
+        _fetchers[loop] = fetcher
+    return fetcher
+
+
+async def close_fetcher() -> None:
+    loop = asyncio.get_running_loop()
+    fetcher = _fetchers.pop(loop, None)
+    if fetcher is not None:
+        await fetcher.aclose()
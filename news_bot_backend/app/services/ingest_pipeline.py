@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+from app.core.config import get_settings
+from app.core.logging_config import get_logger
+from app.services.ml_client import analysis_fields, analyze_batch
+from app.services.news_parser import ArticleLink, _run_extraction, download_article
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Сигнал завершения стадии: воркер возвращает его в очередь для соседей и выходит
+_DONE = object()
+
+
+@dataclass
+class ArticleJob:
+    """Статья, которая движется по стадиям конвейера."""
+    source: Any
+    url: str
+    rss_date: Optional[datetime] = None
+    rss_category: Optional[str] = None
+    html: Optional[Union[str, bytes]] = None
+    data: Dict = field(default_factory=dict)
+
+
+# discover(source) -> новые ссылки источника
+DiscoverFn = Callable[[Any], Awaitable[List[ArticleLink]]]
+# persist(source, articles) -> сколько статей реально добавлено
+PersistFn = Callable[[Any, List[Dict]], Awaitable[int]]
+
+
+def _fallback_summary(text: str) -> str:
+    return text[:200] + "..." if len(text) > 200 else text
+
+
+class IngestPipeline:
+    """
+    Потоковая загрузка: discover -> fetch -> extract -> summarize -> persist.
+    summarize отправляет в ML-сервис пачки из накопившихся статей.
+    Стадии связаны ограниченными очередями и работают одновременно: статьи
+    одного источника уже суммаризируются, пока другие еще скачиваются.
+    Заполненная очередь притормаживает предыдущую стадию (backpressure).
+    persist вызывается из одной корутины, поэтому может пользоваться
+    общей сессией БД.
+    """
+
+    def __init__(
+        self,
+        discover: DiscoverFn,
+        persist: PersistFn,
+        fetch_workers: Optional[int] = None,
+        extract_workers: Optional[int] = None,
+        summarize_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> None:
+        self._discover = discover
+        self._persist = persist
+        self._fetch_workers = fetch_workers or settings.PARSER_THREADS
+        self._extract_workers = extract_workers or settings.EXTRACTION_PROCESSES or os.cpu_count() or 1
+        self._summarize_workers = summarize_workers or settings.ML_CONCURRENCY
+        self._queue_size = queue_size or settings.INGEST_QUEUE_SIZE
+        self._batch_size = batch_size or settings.INGEST_BATCH_SIZE
+
+    async def run(self, sources: Sequence[Any]) -> Dict[int, int]:
+        """Прогоняет источники через конвейер, возвращает {source_id: added}."""
+        added = {source.id: 0 for source in sources}
+        fetch_q: asyncio.Queue = asyncio.Queue(self._queue_size)
+        extract_q: asyncio.Queue = asyncio.Queue(self._queue_size)
+        summarize_q: asyncio.Queue = asyncio.Queue(self._queue_size)
+        persist_q: asyncio.Queue = asyncio.Queue(self._queue_size)
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._run_discover(sources, fetch_q))
+                tg.create_task(self._run_stage(fetch_q, extract_q, self._fetch, self._fetch_workers))
+                tg.create_task(self._run_stage(extract_q, summarize_q, self._extract, self._extract_workers))
+                tg.create_task(self._run_summarize(summarize_q, persist_q))
+                tg.create_task(self._run_persist(persist_q, added))
+        except BaseExceptionGroup as eg:
+            # Наружу отдаем исходную ошибку (например, сбой INSERT), а не группу
+            raise eg.exceptions[0]
+        return added
+
+    async def _run_discover(self, sources: Sequence[Any], outbox: asyncio.Queue) -> None:
+        async def discover_one(source: Any) -> None:
+            for link, rss_date, rss_category in await self._discover(source):
+                await outbox.put(ArticleJob(source, link, rss_date, rss_category))
+
+        await asyncio.gather(*(discover_one(source) for source in sources))
+        await outbox.put(_DONE)
+
+    async def _run_stage(
+        self,
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue,
+        handler: Callable[[ArticleJob], Awaitable[Optional[ArticleJob]]],
+        workers: int,
+    ) -> None:
+        async def worker() -> None:
+            while True:
+                job = await inbox.get()
+                if job is _DONE:
+                    await inbox.put(_DONE)
+                    return
+                job = await handler(job)
+                if job is not None:
+                    await outbox.put(job)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        await outbox.put(_DONE)
+
+    async def _fetch(self, job: ArticleJob) -> Optional[ArticleJob]:
+        try:
+            job.html = await download_article(job.url)
+        except Exception as exc:
+            logger.warning("Failed to fetch %s: %s", job.url, exc)
+            return None
+        return job if job.html else None
+
+    async def _extract(self, job: ArticleJob) -> Optional[ArticleJob]:
+        try:
+            data = await _run_extraction(job.url, job.html, job.rss_date, job.rss_category, job.source.language)
+        except Exception as exc:
+            logger.warning("Failed to parse %s: %s", job.url, exc)
+            return None
+        finally:
+            job.html = None  # HTML больше не нужен, не держим его в очередях
+        if not data:
+            return None
+        job.data = data
+        return job
+
+    async def _run_summarize(self, inbox: asyncio.Queue, outbox: asyncio.Queue) -> None:
+        """
+        ML-стадия работает пачками: воркер забирает все уже готовые статьи
+        (не больше ML_BATCH_SIZE) и отправляет их одним запросом /v1/analyze/batch.
+        """
+        async def worker() -> None:
+            done = False
+            while not done:
+                batch = [await inbox.get()]
+                while len(batch) < settings.ML_BATCH_SIZE and not inbox.empty():
+                    batch.append(inbox.get_nowait())
+                if batch[-1] is _DONE:
+                    batch.pop()
+                    await inbox.put(_DONE)
+                    done = True
+                if batch:
+                    for job in await self._summarize(batch):
+                        await outbox.put(job)
+
+        await asyncio.gather(*(worker() for _ in range(self._summarize_workers)))
+        await outbox.put(_DONE)
+
+    async def _summarize(self, jobs: List[ArticleJob]) -> List[ArticleJob]:
+        # Summary, тональность и сущности всей пачки - одним запросом
+        texts = [job.data["text"] for job in jobs]
+        try:
+            results = await analyze_batch(texts)
+        except Exception as e:
+            logger.error(f"Failed to analyze batch of {len(jobs)} articles, using fallback: {e}", exc_info=True)
+            for job in jobs:
+                job.data["summary"] = _fallback_summary(job.data["text"])
+            return jobs
+
+        for job, result in zip(jobs, results):
+            job.data.update(analysis_fields(result))
+        return jobs
+
+    async def _run_persist(self, inbox: asyncio.Queue, added: Dict[int, int]) -> None:
+        done = False
+        while not done:
+            batch = [await inbox.get()]
+            # Забираем все, что уже накопилось, но не больше batch_size
+            while len(batch) < self._batch_size and not inbox.empty():
+                batch.append(inbox.get_nowait())
+            if batch[-1] is _DONE:
+                batch.pop()
+                done = True
+
+            by_source: Dict[int, List[ArticleJob]] = {}
+            for job in batch:
+                by_source.setdefault(job.source.id, []).append(job)
+            for jobs in by_source.values():
+                source = jobs[0].source
+                added[source.id] += await self._persist(source, [job.data for job in jobs])
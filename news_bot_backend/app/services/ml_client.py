@@ -1,4 +1,7 @@
 # app/services/ml_client.py
+from dataclasses import dataclass, field
+from typing import List, Optional
+
 import httpx
 from app.core.logging_config import get_logger
 from app.core.config import get_settings
@@ -7,6 +10,40 @@ logger = get_logger(__name__)
 settings = get_settings()
 
 
+@dataclass
+class SentimentResult:
+    label: str
+    score: float
+
+
+@dataclass
+class EntityResult:
+    text: str
+    type: str
+    score: float
+
+
+@dataclass
+class AnalysisResult:
+    """Ответ /v1/analyze. sentiment = None, если анализ не удался."""
+    summary: str
+    sentiment: Optional[SentimentResult] = None
+    entities: List[EntityResult] = field(default_factory=list)
+
+
+def analysis_fields(result: AnalysisResult) -> dict:
+    """Поля Articles из результата анализа: summary, тональность и сущности."""
+    return {
+        "summary": result.summary,
+        "sentiment_label": result.sentiment.label if result.sentiment else None,
+        "sentiment_score": result.sentiment.score if result.sentiment else None,
+        "entities": [
+            {"text": entity.text, "type": entity.type, "score": entity.score}
+            for entity in result.entities
+        ],
+    }
+
+
 def _get_fallback_summary(text: str) -> str:
     if len(text) <= 400:
         return text
@@ -49,4 +86,99 @@ async def get_summary_from_ml(text: str) -> str:
 
     except Exception as e:
         logger.error(f"ML Service unexpected error: {e}, using fallback", exc_info=True)
-        return _get_fallback_summary(text)
\ No newline at end of file
+        return _get_fallback_summary(text)
+
+
+def _parse_analysis(data: dict, text: str) -> AnalysisResult:
+    summary = data.get("summary", "")
+    if not summary or not summary.strip():
+        logger.warning("ML Service returned empty summary, using fallback")
+        summary = _get_fallback_summary(text)
+
+    sentiment = None
+    if data.get("sentiment"):
+        sentiment = SentimentResult(label=data["sentiment"]["label"], score=float(data["sentiment"]["score"]))
+    entities = [
+        EntityResult(text=item["text"], type=item["type"], score=float(item["score"]))
+        for item in data.get("entities") or []
+    ]
+    return AnalysisResult(summary=summary, sentiment=sentiment, entities=entities)
+
+
+async def analyze(text: str, min_tokens: Optional[int] = None, max_tokens: Optional[int] = None) -> AnalysisResult:
+    """
+    Summary, тональность и сущности статьи за один запрос к /v1/analyze.
+    При ошибке ML-сервиса возвращает fallback summary без тональности и сущностей.
+    """
+    payload = {"text": text}
+    if min_tokens is not None:
+        payload["min_tokens"] = min_tokens
+    if max_tokens is not None:
+        payload["max_tokens"] = max_tokens
+
+    try:
+        async with httpx.AsyncClient(timeout=settings.ML_TIMEOUT) as client:
+            response = await client.post(settings.ML_ANALYZE_URL, json=payload, timeout=settings.ML_TIMEOUT)
+            response.raise_for_status()
+            return _parse_analysis(response.json(), text)
+
+    except httpx.TimeoutException as e:
+        logger.warning(f"ML Service timeout after {settings.ML_TIMEOUT}s, using fallback: {e}")
+
+    except httpx.ConnectError as e:
+        logger.warning(f"ML Service connection error (service may be down), using fallback: {e}")
+
+    except httpx.HTTPStatusError as e:
+        logger.error(
+            f"ML Service HTTP error {e.response.status_code}: {e.response.text}, using fallback"
+        )
+
+    except Exception as e:
+        logger.error(f"ML Service unexpected error: {e}, using fallback", exc_info=True)
+
+    return AnalysisResult(summary=_get_fallback_summary(text))
+
+
+async def analyze_batch(texts: List[str], min_tokens: Optional[int] = None,
+                        max_tokens: Optional[int] = None) -> List[AnalysisResult]:
+    """
+    Анализ списка текстов через /v1/analyze/batch: один HTTP-запрос
+    на ML_BATCH_SIZE текстов. Результаты в том же порядке; для текстов, которые
+    сервис не смог обработать (или при ошибке всего запроса), - fallback summary.
+    """
+    results: List[AnalysisResult] = []
+    if not texts:
+        return results
+
+    async with httpx.AsyncClient(timeout=settings.ML_TIMEOUT) as client:
+        for start in range(0, len(texts), settings.ML_BATCH_SIZE):
+            chunk = texts[start:start + settings.ML_BATCH_SIZE]
+            payload = {"texts": chunk}
+            if min_tokens is not None:
+                payload["min_tokens"] = min_tokens
+            if max_tokens is not None:
+                payload["max_tokens"] = max_tokens
+
+            try:
+                response = await client.post(settings.ML_ANALYZE_BATCH_URL, json=payload)
+                response.raise_for_status()
+                items = response.json()["results"]
+                if len(items) != len(chunk):
+                    raise ValueError(f"expected {len(chunk)} results, got {len(items)}")
+            except httpx.HTTPStatusError as e:
+                logger.error(
+                    f"ML Service HTTP error {e.response.status_code} for batch of {len(chunk)}, using fallback"
+                )
+                items = [None] * len(chunk)
+            except Exception as e:
+                logger.warning(f"ML Service batch of {len(chunk)} failed, using fallback: {e}")
+                items = [None] * len(chunk)
+
+            for text, item in zip(chunk, items):
+                if item is None or item.get("error"):
+                    if item is not None:
+                        logger.warning(f"ML Service could not analyze text: {item['error']}, using fallback")
+                    results.append(AnalysisResult(summary=_get_fallback_summary(text)))
+                else:
+                    results.append(_parse_analysis(item, text))
+    return results
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import inspect
+from typing import Dict, List, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging_config import get_logger
+from app.models import Articles, Source
+from app.services.article_rows import article_row, fit_article_row, insert_articles, resolve_topic_ids
+from app.services import ml_client
+from app.services.ml_client import analysis_fields
+from app.services.news_parser import parse_news
+
+logger = get_logger(__name__)
+
+
+async def _parse_source(source: Source, limit: int) -> List[Dict]:
+    articles = parse_news(source.source_url, limit=limit, lang=source.language or "ru")
+    if inspect.isawaitable(articles):
+        articles = await articles
+    return articles or []
+
+
+async def ingest_sources(session: AsyncSession, source_ids: Sequence[int], limit: int) -> List[Articles]:
+    """
+    Загружает статьи указанных источников вне расписания: парсинг,
+    отсев уже сохраненных ссылок (и дублей внутри пачки), анализ в ML-сервисе
+    и запись в Articles одним INSERT ... ON CONFLICT (url) DO NOTHING.
+    Делает commit и возвращает созданные статьи.
+    """
+    sources = (await session.execute(select(Source).where(Source.id.in_(source_ids)))).scalars().all()
+
+    candidates: Dict[str, tuple[Source, Dict]] = {}
+    for source in sources:
+        try:
+            articles = await _parse_source(source, limit)
+        except Exception as e:
+            logger.error(f"Failed to parse source {source.id} ({source.source_url}): {e}", exc_info=True)
+            continue
+        for item in articles:
+            # Статьи, которые не влезут в Articles, не отправляем в ML-сервис
+            if item.get("text") and fit_article_row(item):
+                candidates.setdefault(item["url"], (source, item))
+
+    if candidates:
+        known = await session.execute(select(Articles.url).where(Articles.url.in_(list(candidates))))
+        for url in known.scalars().all():
+            candidates.pop(url, None)
+    if not candidates:
+        return []
+
+    pending = list(candidates.values())
+    # Одним запросом /v1/analyze/batch на ML_BATCH_SIZE статей; ошибка одной статьи дает ей fallback summary
+    analyses = await ml_client.analyze_batch([item["text"] for _, item in pending])
+    # Топики из категорий RSS - так же, как в плановой загрузке
+    topic_ids = await resolve_topic_ids(item.get("topic") for _, item in pending)
+    rows = [
+        article_row(source, {**item, **analysis_fields(result)}, topic_ids)
+        for (source, item), result in zip(pending, analyses)
+    ]
+
+    # ON CONFLICT DO NOTHING: статьи, которые параллельно записал конвейер, не роняют пачку
+    ids = await insert_articles(session, rows)
+    await session.commit()
+    if not ids:
+        return []
+    created = (await session.execute(select(Articles).where(Articles.id.in_(ids)))).scalars().all()
+    logger.info(f"Ingested {len(created)} articles from {len(sources)} sources")
+    return list(created)
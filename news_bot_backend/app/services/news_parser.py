@@ -1,17 +1,73 @@
 from __future__ import annotations
 
-import concurrent.futures
+import asyncio
+import hashlib
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Awaitable, Callable, Collection, Dict, List, Optional, Set, Tuple, Union
+from urllib.parse import urlsplit
 
 import feedparser
 import newspaper
 from newspaper import Article, Config
+from app.core.config import get_settings
 from app.core.logging_config import get_logger
+from app.services.feed_reader import FeedEntry, read_feed
+from app.services.html_store import get_html_store
+from app.services.http_fetcher import (
+    FEED_CONTENT_TYPES,
+    SITEMAP_CONTENT_TYPES,
+    USER_AGENT,
+    HttpFetcher,
+    get_fetcher,
+)
+from app.services.redis_client import get_redis
+from app.services.sitemap_reader import Sitemap, read_sitemap
 
 logger = get_logger(__name__)
+settings = get_settings()
 
-USER_AGENT = "newsagent-bot/0.1 (+https://example.com/contact)"
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+
+# (ссылка на статью, дата из RSS, категория из RSS)
+ArticleLink = Tuple[str, Optional[datetime], Optional[str]]
+
+# Ссылки, найденные newspaper.build, переиспользуются между опросами источника
+BUILD_CACHE_KEY = "source:build:{digest}"
+
+_OLDEST = datetime.min.replace(tzinfo=timezone.utc)
+
+# Размеры колонок Source, в которых хранится состояние фида
+FEED_ETAG_MAX_LENGTH = 255
+FEED_LAST_MODIFIED_MAX_LENGTH = 64
+WATERMARK_GUID_MAX_LENGTH = 512
+
+
+@dataclass
+class FeedState:
+    """
+    Состояние кеша фида источника для условного GET.
+    not_modified выставляется в True, если фид не изменился с прошлого опроса,
+    error - текст ошибки, если источник не удалось опросить.
+    watermark_* - самая свежая уже обработанная запись фида: чтение фида
+    останавливается на ней. Двигает его advance_watermark после записи статей.
+    entries - прочитанные записи новее водяного знака (от новых к старым),
+    known - их ссылки, которые уже были сохранены до опроса.
+    """
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    watermark_published_at: Optional[datetime] = None
+    watermark_guid: Optional[str] = None
+    not_modified: bool = False
+    error: Optional[str] = None
+    entries: List[FeedEntry] = field(default_factory=list)
+    known: Set[str] = field(default_factory=set)
 
 
 def get_newspaper_config(lang: str = 'ru') -> Config:
@@ -24,6 +80,12 @@ def get_newspaper_config(lang: str = 'ru') -> Config:
     return config
 
 
+@lru_cache
+def _get_cached_config(lang: str) -> Config:
+    """Общий Config на язык вместо нового объекта на каждую статью."""
+    return get_newspaper_config(lang)
+
+
 def _make_utc_aware(dt: Optional[datetime]) -> Optional[datetime]:
     if dt is not None and dt.tzinfo is None:
         return dt.replace(tzinfo=timezone.utc)
@@ -83,92 +145,422 @@ def _normalize_topic_name(topic_name: str) -> str:
     return normalized
 
 
-def _process_article(url: str, rss_date: Optional[datetime] = None, rss_category: Optional[str] = None,
-                     lang: str = 'ru') -> Optional[Dict]:
-    config = get_newspaper_config(lang)
-    article = Article(url, config=config)
+async def _fetch_feed(url: str, feed_state: Optional[FeedState] = None) -> Tuple[Optional[bytes], Dict[str, str]]:
+    """
+    Скачивает фид с If-None-Match / If-Modified-Since из feed_state.
+    Возвращает (None, headers) при ответе 304.
+    """
+    headers = {}
+    if feed_state is not None:
+        if feed_state.etag:
+            headers["If-None-Match"] = feed_state.etag
+        if feed_state.last_modified:
+            headers["If-Modified-Since"] = feed_state.last_modified
+
+    response = await get_fetcher().get(url, headers=headers, content_types=FEED_CONTENT_TYPES)
+    if response.status_code == 304:
+        return None, dict(response.headers)
+    response.raise_for_status()
+    return response.content, dict(response.headers)
+
+
+def _extract_article(url: str, html: Union[str, bytes], rss_date: Optional[datetime] = None,
+                     rss_category: Optional[str] = None, lang: str = 'ru') -> Optional[Dict]:
+    """Разбирает уже скачанный HTML статьи через newspaper (без сетевых запросов)."""
+    article = Article(url, config=_get_cached_config(lang))
+    article.set_html(html)
+    article.parse()
+
+    # Если текста слишком мало, скорее всего, это ошибка или страница-заглушка
+    if not article.text or len(article.text) < 100:
+        return None
 
-    try:
-        article.download()
-        article.parse()
+    pub_date = _make_utc_aware(rss_date) or _make_utc_aware(article.publish_date)
 
-        # Если текста слишком мало, скорее всего, это ошибка или страница-заглушка
-        if not article.text or len(article.text) < 100:
-            return None
+    # Извлекаем топик только из RSS (если передан)
+    topic_name = None
+    if rss_category:
+        topic_name = _normalize_topic_name(rss_category)
 
-        pub_date = _make_utc_aware(rss_date) or _make_utc_aware(article.publish_date)
+    result = {
+        "title": article.title,
+        "text": article.text,
+        "image_url": getattr(article, "top_image", None),
+        "published_at": pub_date,
+        "url": url,
+    }
 
-        # Извлекаем топик только из RSS (если передан)
-        topic_name = None
-        if rss_category:
-            topic_name = _normalize_topic_name(rss_category)
+    # Добавляем топик, если он найден в RSS
+    if topic_name:
+        result["topic"] = topic_name
 
-        result = {
-            "title": article.title,
-            "text": article.text,
-            "image_url": getattr(article, "top_image", None),
-            "published_at": pub_date,
-            "url": url,
-        }
+    return result
 
-        # Добавляем топик, если он найден в RSS
-        if topic_name:
-            result["topic"] = topic_name
 
-        return result
+def _get_extraction_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Пул процессов для разбора HTML (lxml + newspaper упираются в GIL).
+    Пул свой у каждого процесса Celery, поэтому EXTRACTION_PROCESSES
+    по умолчанию 1, а не число CPU. EXTRACTION_PROCESSES=0 отключает
+    пул - разбор идет в потоке.
+    """
+    global _extraction_pool
+    if _extraction_pool is None:
+        workers = settings.EXTRACTION_PROCESSES
+        if workers <= 0:
+            return None
+        # spawn: не форкаем процесс с работающим event loop и потоками httpx
+        _extraction_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=settings.EXTRACTION_TASKS_PER_CHILD,
+        )
+    return _extraction_pool
+
+
+def _reset_extraction_pool() -> None:
+    global _extraction_pool
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown(wait=False, cancel_futures=True)
+        _extraction_pool = None
+
+
+async def _run_extraction(url: str, html: Union[str, bytes], rss_date: Optional[datetime],
+                          rss_category: Optional[str], lang: str) -> Optional[Dict]:
+    """Отдает разбор HTML в пул процессов, при его недоступности - в поток."""
+    pool = _get_extraction_pool()
+    if pool is not None:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(pool, _extract_article, url, html, rss_date, rss_category, lang)
+        except BrokenProcessPool:
+            # Процесс пула упал (например, OOM) - пересоздадим пул при следующем вызове
+            logger.warning("Extraction pool is broken, recreating; parsing %s in thread", url)
+            _reset_extraction_pool()
+    return await asyncio.to_thread(_extract_article, url, html, rss_date, rss_category, lang)
+
+
+async def download_article(url: str) -> Optional[Union[str, bytes]]:
+    """
+    Скачивает страницу статьи через общий fetcher и сохраняет копию
+    в хранилище HTML (если оно включено), чтобы разбор можно было повторить без сети.
+    """
+    html = await get_fetcher().fetch_html(url)
+    store = get_html_store()
+    if html and store is not None:
+        try:
+            await asyncio.to_thread(store.put, url, html)
+        except Exception as exc:
+            logger.warning("Failed to store HTML of %s: %s", url, exc)
+    return html
+
+
+async def _process_article(url: str, rss_date: Optional[datetime] = None, rss_category: Optional[str] = None,
+                           lang: str = 'ru') -> Optional[Dict]:
+    try:
+        html = await download_article(url)
+        if not html:
+            return None
+        # Разбор HTML - CPU-работа, выносим из event loop в пул процессов
+        return await _run_extraction(url, html, rss_date, rss_category, lang)
     except Exception as exc:
         logger.warning("Failed to parse %s: %s", url, exc)
         return None
 
 
-def parse_news(url: str, limit: int = 20, lang: str = 'ru') -> List[Dict]:
-    urls_to_process: List[tuple[str, Optional[datetime], Optional[str]]] = []
+def _entry_id(entry: FeedEntry) -> str:
+    """GUID записи (или ссылка); слишком длинный для колонки заменяется своим хешем."""
+    entry_id = entry.guid or entry.link
+    if len(entry_id) > WATERMARK_GUID_MAX_LENGTH:
+        return "sha256:" + hashlib.sha256(entry_id.encode("utf-8")).hexdigest()
+    return entry_id
+
+
+def _fit_validator(value: Optional[str], max_length: int) -> Optional[str]:
+    """Валидатор условного GET, который не влезает в колонку, не сохраняем - фид просто скачается целиком."""
+    if value is None or len(value) > max_length:
+        return None
+    return value
+
+
+def _watermark_stop(feed_state: Optional[FeedState]) -> Optional[Callable[[FeedEntry], bool]]:
+    """
+    Условие остановки чтения фида на уже виденных записях: фиды упорядочены
+    от новых к старым, поэтому все после записи с GUID водяного знака
+    (или с датой не новее его) уже обработаны.
+    """
+    if feed_state is None or not (feed_state.watermark_guid or feed_state.watermark_published_at):
+        return None
+    mark_guid = feed_state.watermark_guid
+    mark_at = _make_utc_aware(feed_state.watermark_published_at)
+
+    def stop(entry: FeedEntry) -> bool:
+        if mark_guid and _entry_id(entry) == mark_guid:
+            return True
+        return mark_at is not None and entry.published is not None and entry.published <= mark_at
+
+    return stop
+
+
+def advance_watermark(feed_state: FeedState, stored: Collection[str]) -> None:
+    """
+    Сдвигает водяной знак по прочитанным записям фида, которые сохранены
+    (stored - ссылки записанных статей, плюс известные еще до опроса).
+    Знак проходит только непрерывный хвост сохраненных записей от самой
+    старой и останавливается перед самой старой несохраненной: запись, которую
+    не удалось скачать или разобрать, остается новее знака и будет прочитана
+    при следующем опросе. Пока такие записи есть, валидаторы и хеш фида
+    сбрасываются: иначе неизменный фид отсекался бы 304 или совпадением хеша
+    и записи больше не перечитывались бы.
+    """
+    entries = feed_state.entries
+    done = feed_state.known.union(stored)
+    start = len(entries)
+    while start > 0 and entries[start - 1].link in done:
+        start -= 1
+    if start > 0:
+        feed_state.etag = None
+        feed_state.last_modified = None
+        feed_state.content_hash = None
+    if start == len(entries):
+        return
+
+    pending, settled = entries[:start], entries[start:]
+    feed_state.watermark_guid = _entry_id(settled[0])
+    dates = [entry.published for entry in settled if entry.published is not None]
+    if dates:
+        mark_at = max(dates)
+        # Дата знака не должна накрыть несохраненную запись (фиды не всегда строго упорядочены)
+        pending_dates = [entry.published for entry in pending if entry.published is not None]
+        if not pending_dates or mark_at < min(pending_dates):
+            feed_state.watermark_published_at = mark_at
+
+
+def _read_feed_entries(url: str, content: bytes, headers: Dict[str, str], limit: int,
+                       stop: Optional[Callable[[FeedEntry], bool]] = None) -> Optional[List[FeedEntry]]:
+    """
+    Записи фида до limit или до stop: быстрый потоковый разбор RSS 2.0 / Atom
+    через lxml, для остальных и битых фидов - feedparser.
+    Возвращает None, если документ не является фидом.
+    """
+    fast = read_feed(content, limit, stop)
+    if fast is not None:
+        return fast
+
+    feed = feedparser.parse(content, response_headers={
+        "content-location": url,
+        "content-type": headers.get("Content-Type", ""),
+    })
+    if not feed.entries:
+        return None
+
+    entries: List[FeedEntry] = []
+    for entry in feed.entries[:limit]:
+        # Извлекаем дату из RSS, если она есть
+        dt = None
+        if hasattr(entry, 'published_parsed') and entry.published_parsed:
+            dt = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
+
+        guid = entry.get('id')
+        item = FeedEntry(
+            link=entry.link,
+            published=dt,
+            # Извлекаем категорию из RSS
+            category=_extract_topic_from_rss_entry(entry),
+            guid=guid if isinstance(guid, str) else None,
+        )
+        if stop is not None and stop(item):
+            break
+        entries.append(item)
+    return entries
+
+
+async def _fetch_sitemap(fetcher: HttpFetcher, url: str) -> Optional[Sitemap]:
+    max_bytes = settings.SITEMAP_MAX_MB * 1024 * 1024
+    try:
+        response = await fetcher.get(url, max_bytes=max_bytes, content_types=SITEMAP_CONTENT_TYPES)
+        response.raise_for_status()
+    except Exception as e:
+        logger.info("Sitemap %s unavailable: %s", url, e)
+        return None
+    return await asyncio.to_thread(read_sitemap, response.content, max_bytes)
+
+
+async def _discover_from_sitemaps(url: str, limit: int,
+                                  stop: Optional[Callable[[FeedEntry], bool]] = None) -> Optional[List[FeedEntry]]:
+    """
+    Ищет свежие статьи по sitemap-ам из robots.txt (или /sitemap.xml):
+    сначала news-sitemap-ы, в индексах - самые свежие по lastmod вложенные
+    sitemap-ы, не более SITEMAP_MAX_FILES файлов за опрос. Записи, на которых
+    срабатывает stop (водяной знак), отбрасываются.
+    Возвращает None, если sitemap у сайта нет.
+    """
+    fetcher = get_fetcher()
+    parts = urlsplit(url)
+    candidates = await fetcher.sitemaps(url) or [f"{parts.scheme}://{parts.netloc}/sitemap.xml"]
+    # В news-sitemap-ах только статьи за последние дни - их читаем первыми
+    queue = sorted(candidates, key=lambda link: "news" not in link.lower())
+
+    found = False
+    fresh: Dict[str, FeedEntry] = {}
+    fetched = 0
+    while queue and fetched < settings.SITEMAP_MAX_FILES and len(fresh) < limit:
+        sitemap = await _fetch_sitemap(fetcher, queue.pop(0))
+        fetched += 1
+        if sitemap is None:
+            continue
+
+        for entry in sitemap.urls:
+            found = True
+            if stop is None or not stop(entry):
+                fresh.setdefault(entry.link, entry)
+
+        children = []
+        for child in sitemap.children:
+            found = True
+            # Вложенный sitemap не менялся с прошлого опроса - новых статей в нем нет
+            if stop is not None and child.published is not None and stop(child):
+                continue
+            children.append(child)
+        children.sort(key=lambda child: child.published or _OLDEST, reverse=True)
+        children.sort(key=lambda child: "news" not in child.link.lower())
+        queue[:0] = [child.link for child in children]
+
+    if not found:
+        return None
+    entries = sorted(fresh.values(), key=lambda entry: entry.published or _OLDEST, reverse=True)
+    return entries[:limit]
+
+
+async def _build_links(url: str, limit: int, lang: str) -> List[ArticleLink]:
+    """
+    Ссылки со страницы через newspaper.build - самый медленный способ,
+    поэтому результат кешируется в Redis на SOURCE_BUILD_CACHE_MINUTES.
+    """
+    key = BUILD_CACHE_KEY.format(digest=hashlib.sha1(url.encode("utf-8")).hexdigest())
+    cached = None
+    try:
+        cached = await get_redis().get(key)
+    except Exception as e:
+        logger.warning("Build cache unavailable for %s: %s", url, e)
+
+    if cached is not None:
+        links = json.loads(cached)
+    else:
+        logger.info("Source %s has no feed or sitemap, building...", url)
+        source = await asyncio.to_thread(newspaper.build, url, config=get_newspaper_config(lang))
+        links = [art.url for art in source.articles]
+        try:
+            await get_redis().set(key, json.dumps(links), ex=settings.SOURCE_BUILD_CACHE_MINUTES * 60)
+        except Exception as e:
+            logger.warning("Failed to cache build result for %s: %s", url, e)
+
+    # Для HTML страниц топики не извлекаем
+    return [(link, None, None) for link in links[:limit]]
+
+
+async def discover_articles(url: str, limit: int = 20, lang: str = 'ru',
+                            known_urls: Optional[Callable[[List[str]], Awaitable[Collection[str]]]] = None,
+                            feed_state: Optional[FeedState] = None) -> List[ArticleLink]:
+    """
+    Собирает ссылки источника без скачивания самих статей: из RSS/Atom,
+    иначе из sitemap-ов сайта, и только в крайнем случае через newspaper.build.
+    known_urls - необязательный async-фильтр: получает список найденных ссылок
+    и возвращает те из них, которые уже сохранены. Такие ссылки отбрасываются.
+    feed_state - кеш ETag/Last-Modified/хеша фида; при 304 или совпадении хеша
+    источник пропускается целиком, а после успешного опроса кеш обновляется.
+    """
+    urls_to_process: List[ArticleLink] = []
+    entries: Optional[List[FeedEntry]] = None
 
     # Пробуем собрать ссылки через RSS
     try:
-        feed = feedparser.parse(url)
-        if feed.entries:
-            # logger.info("Source %s detected as RSS", url)
-            for entry in feed.entries[:limit]:
-                # Извлекаем дату из RSS, если она есть
-                dt = None
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    dt = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-
-                # Извлекаем категорию из RSS
-                category = _extract_topic_from_rss_entry(entry)
-
-                urls_to_process.append((entry.link, dt, category))
+        content, headers = await _fetch_feed(url, feed_state)
+        if content is None:
+            logger.info("Source %s not modified (304), skipping", url)
+            if feed_state is not None:
+                feed_state.not_modified = True
+            return []
+
+        content_hash = hashlib.sha256(content).hexdigest()
+        if feed_state is not None and feed_state.content_hash == content_hash:
+            logger.info("Source %s content unchanged, skipping", url)
+            feed_state.not_modified = True
+            return []
+
+        stop = _watermark_stop(feed_state)
+        entries = _read_feed_entries(url, content, headers, limit, stop)
+        if entries is None:
+            # Не фид: ищем статьи по sitemap-ам сайта
+            logger.info("Source %s detected as HTML, reading sitemaps...", url)
+            entries = await _discover_from_sitemaps(url, limit, stop)
+
+        if entries is not None:
+            urls_to_process = [(entry.link, entry.published, entry.category) for entry in entries]
+            if not entries:
+                logger.info("Source %s has no entries newer than the watermark", url)
         else:
-            # Если RSS пуст, пробуем собрать ссылки как с обычной HTML страницы
-            # Для HTML страниц топики не извлекаем
-            logger.info("Source %s detected as HTML, building...", url)
-            source = newspaper.build(url, config=get_newspaper_config(lang))
-            for art in source.articles[:limit]:
-                urls_to_process.append((art.url, None, None))  # Нет категории для HTML
+            # Ни фида, ни sitemap - собираем ссылки с HTML страницы
+            urls_to_process = await _build_links(url, limit, lang)
     except Exception as e:
         logger.error("Error gathering URLs from %s: %s", url, e)
+        if feed_state is not None:
+            feed_state.error = f"{type(e).__name__}: {e}"
         return []
 
-    # Параллельная обработка собранных ссылок
-    articles_data: List[Dict] = []
+    # Отбрасываем уже известные ссылки до скачивания (и дубликаты внутри фида)
+    seen = set()
+    if known_urls is not None and urls_to_process:
+        try:
+            seen.update(await known_urls([link for link, _, _ in urls_to_process]))
+        except Exception as e:
+            logger.error("Known URL lookup failed for %s: %s", url, e)
+            return []
+
+    # Сохраняем валидаторы только после успешного сбора ссылок; водяной знак
+    # сдвигается (а валидаторы при несохраненных записях сбрасываются) позже,
+    # когда статьи уже записаны (advance_watermark)
+    if feed_state is not None:
+        feed_state.etag = _fit_validator(headers.get("ETag"), FEED_ETAG_MAX_LENGTH)
+        feed_state.last_modified = _fit_validator(headers.get("Last-Modified"), FEED_LAST_MODIFIED_MAX_LENGTH)
+        feed_state.content_hash = content_hash
+        feed_state.entries = entries or []
+        feed_state.known = set(seen)
+
+    new_urls: List[ArticleLink] = []
+    for link, dt, category in urls_to_process:
+        if link in seen:
+            continue
+        seen.add(link)
+        new_urls.append((link, dt, category))
+    return new_urls
+
+
+async def parse_news(url: str, limit: int = 20, lang: str = 'ru',
+                     known_urls: Optional[Callable[[List[str]], Awaitable[Collection[str]]]] = None,
+                     feed_state: Optional[FeedState] = None) -> List[Dict]:
+    """
+    Собирает ссылки источника (см. discover_articles) и скачивает статьи.
+    Водяной знак feed_state не сдвигается: это делает вызывающий код
+    через advance_watermark, когда статьи записаны.
+    """
+    urls_to_process = await discover_articles(url, limit, lang, known_urls, feed_state)
+    if not urls_to_process:
+        return []
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        # Создаем задачи
-        future_to_url = {
-            executor.submit(_process_article, link, dt, category, lang): link
-            for link, dt, category in urls_to_process
-        }
-
-        # Собираем результаты по мере завершения
-        for future in concurrent.futures.as_completed(future_to_url):
-            try:
-                data = future.result()
-                if data:
-                    articles_data.append(data)
-            except Exception as exc:
-                pass
-                logger.error("Thread generated an exception: %s", exc)
+    # Параллельная загрузка через общий пул соединений;
+    # общее число запросов ограничено семафором fetcher-а
+    results = await asyncio.gather(
+        *(_process_article(link, dt, category, lang) for link, dt, category in urls_to_process),
+        return_exceptions=True,
+    )
+
+    articles_data: List[Dict] = []
+    for data in results:
+        if isinstance(data, BaseException):
+            logger.error("Article task generated an exception: %s", data)
+        elif data:
+            articles_data.append(data)
 
     # Сортируем результат по дате (свежие сверху), если даты есть
     articles_data.sort(
@@ -176,4 +568,4 @@ def parse_news(url: str, limit: int = 20, lang: str = 'ru') -> List[Dict]:
         reverse=True
     )
 
-    return articles_data
\ No newline at end of file
+    return articles_data
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Iterable, Optional
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+def _clamp(interval: timedelta) -> timedelta:
+    low = timedelta(minutes=settings.SOURCE_MIN_POLL_MINUTES)
+    high = timedelta(minutes=settings.SOURCE_MAX_POLL_MINUTES)
+    return max(low, min(high, interval))
+
+
+def compute_poll_interval(
+    publish_times: Iterable[Optional[datetime]],
+    new_articles: int,
+    limit: int,
+    previous: Optional[timedelta] = None,
+) -> timedelta:
+    """
+    Интервал до следующего опроса источника.
+
+    Базой служит половина медианного интервала между последними публикациями
+    (источник опрашивается примерно дважды за типичный промежуток). Затем
+    учитывается выход опроса: без новых статей интервал растет, а если
+    пришел полный лимит статей (часть могла не поместиться) - сокращается.
+    """
+    times = sorted((t for t in publish_times if t is not None), reverse=True)
+    gaps = [
+        (newer - older).total_seconds()
+        for newer, older in zip(times, times[1:])
+        if newer > older
+    ]
+
+    if gaps:
+        interval = timedelta(seconds=median(gaps) / 2)
+    else:
+        interval = previous or timedelta(minutes=settings.SOURCE_DEFAULT_POLL_MINUTES)
+
+    if new_articles == 0 and previous is not None:
+        interval = max(interval, previous * settings.SOURCE_POLL_BACKOFF)
+    elif limit and new_articles >= limit:
+        interval = interval / 2
+
+    return _clamp(interval)
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import asyncio
+import weakref
+
+import redis.asyncio as redis
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Пул соединений redis.asyncio привязан к event loop, поэтому храним клиента на loop
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, redis.Redis]" = weakref.WeakKeyDictionary()
+
+
+def get_redis() -> redis.Redis:
+    """Возвращает общий клиент Redis для текущего event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        _clients[loop] = client
+    return client
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import List, Optional
+
+from lxml import etree
+
+from app.core.logging_config import get_logger
+from app.services.feed_reader import FeedEntry, _parse_iso
+
+logger = get_logger(__name__)
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+NEWS_NS = "{http://www.google.com/schemas/sitemap-news/0.9}"
+
+# Лимит протокола sitemaps на размер распакованного файла
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+
+@dataclass
+class Sitemap:
+    """
+    Разобранный sitemap: urls - страницы (urlset), children - вложенные
+    sitemap-ы (sitemapindex). Дата записи - news:publication_date или lastmod.
+    """
+    urls: List[FeedEntry] = field(default_factory=list)
+    children: List[FeedEntry] = field(default_factory=list)
+
+
+def _text(elem, tag: str) -> Optional[str]:
+    child = elem.find(tag)
+    if child is None or not child.text:
+        return None
+    return child.text.strip() or None
+
+
+def _decompress(content: bytes, max_bytes: int) -> Optional[bytes]:
+    """Распаковывает sitemap.xml.gz, не более max_bytes."""
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    try:
+        data = decompressor.decompress(content, max_bytes)
+    except zlib.error as e:
+        logger.info("Broken gzip sitemap: %s", e)
+        return None
+    if decompressor.unconsumed_tail:
+        logger.info("Sitemap exceeds %s bytes, truncated", max_bytes)
+    return data
+
+
+def read_sitemap(content: bytes, max_bytes: int = MAX_SITEMAP_BYTES) -> Optional[Sitemap]:
+    """
+    Потоковое чтение sitemap / Google News sitemap (в том числе .gz, не более
+    max_bytes после распаковки) через lxml.iterparse.
+    Возвращает None, если документ не является sitemap.
+    """
+    if content[:2] == b"\x1f\x8b":
+        content = _decompress(content, max_bytes)
+        if content is None:
+            return None
+
+    sitemap = Sitemap()
+    try:
+        context = etree.iterparse(
+            BytesIO(content),
+            events=("start", "end"),
+            resolve_entities=False,
+            no_network=True,
+            remove_comments=True,
+            recover=True,
+        )
+        root_checked = False
+        for event, elem in context:
+            if not root_checked:
+                if elem.tag not in (f"{SITEMAP_NS}urlset", f"{SITEMAP_NS}sitemapindex"):
+                    return None
+                root_checked = True
+                continue
+            if event != "end" or elem.tag not in (f"{SITEMAP_NS}url", f"{SITEMAP_NS}sitemap"):
+                continue
+
+            loc = _text(elem, f"{SITEMAP_NS}loc")
+            if loc:
+                published = None
+                news = elem.find(f"{NEWS_NS}news")
+                if news is not None:
+                    published = _parse_iso(_text(news, f"{NEWS_NS}publication_date"))
+                published = published or _parse_iso(_text(elem, f"{SITEMAP_NS}lastmod"))
+                target = sitemap.urls if elem.tag == f"{SITEMAP_NS}url" else sitemap.children
+                target.append(FeedEntry(link=loc, published=published))
+
+            # Освобождаем уже разобранные записи, чтобы память не росла с размером sitemap
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    except etree.XMLSyntaxError as e:
+        logger.info("Sitemap is not well-formed XML: %s", e)
+        return None
+
+    if not root_checked:
+        return None
+    return sitemap
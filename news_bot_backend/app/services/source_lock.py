@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from typing import Iterable, Optional
+
+from app.core.config import get_settings
+from app.core.logging_config import get_logger
+from app.services.redis_client import get_redis
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+SOURCE_LOCK_KEY = "source:fetch:{source_id}"
+
+# Удаляем ключ, только если он все еще наш (истекший лок мог взять другой воркер)
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Токен для случая, когда Redis недоступен: опрашиваем источник без лока
+NO_LOCK = ""
+
+LOCK_POLL_INTERVAL = 0.5
+
+
+def _key(source_id: int) -> str:
+    return SOURCE_LOCK_KEY.format(source_id=source_id)
+
+
+async def acquire_source_lock(source_id: int) -> Optional[str]:
+    """
+    Single-flight лок на опрос источника: SET NX с TTL.
+    Возвращает токен владельца или None, если источник уже опрашивает
+    другой воркер. При недоступном Redis возвращает NO_LOCK.
+    """
+    token = uuid.uuid4().hex
+    try:
+        acquired = await get_redis().set(_key(source_id), token, nx=True, ex=settings.SOURCE_LOCK_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Source lock unavailable for {source_id}, fetching without it: {e}")
+        return NO_LOCK
+    return token if acquired else None
+
+
+async def release_source_lock(source_id: int, token: str) -> None:
+    if token == NO_LOCK:
+        return
+    try:
+        await get_redis().eval(_RELEASE_SCRIPT, 1, _key(source_id), token)
+    except Exception as e:
+        # Лок сам истечет по TTL
+        logger.warning(f"Failed to release source lock {source_id}: {e}")
+
+
+async def wait_source_locks(source_ids: Iterable[int], timeout: float) -> bool:
+    """
+    Ждет, пока чужие опросы источников завершатся (локи будут сняты).
+    Возвращает False, если дождаться не удалось за timeout.
+    """
+    keys = [_key(source_id) for source_id in source_ids]
+    if not keys:
+        return True
+
+    deadline = time.monotonic() + timeout
+    try:
+        while await get_redis().exists(*keys):
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+    except Exception as e:
+        logger.warning(f"Failed to wait for source locks: {e}")
+        return False
+    return True
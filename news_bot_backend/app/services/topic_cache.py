@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging_config import get_logger
+from app.db.database import AsyncSessionLocal, dialect_insert
+from app.models import Topic
+from app.services.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+# Счетчик в Redis: увеличивается при удалении топиков, чтобы воркеры сбросили кеш
+TOPIC_CACHE_GENERATION_KEY = "topics:generation"
+
+
+class TopicCache:
+    """
+    Кеш name -> id топиков на процесс воркера.
+    Промахи разрешаются пакетно: INSERT ... ON CONFLICT (name) DO NOTHING
+    и один SELECT по всем недостающим именам. Новые топики коммитятся в
+    отдельной сессии, чтобы в кеш не попали id из откатившейся транзакции.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal) -> None:
+        self._session_factory = session_factory
+        self._ids: Dict[str, int] = {}
+        self._generation: Optional[str] = None
+
+    def clear(self) -> None:
+        self._ids.clear()
+
+    async def sync(self) -> None:
+        """
+        Сверяет поколение кеша с Redis и сбрасывает кеш, если топики удалялись.
+        Если Redis недоступен, кеш сбрасывается - лишние запросы лучше битых id.
+        """
+        try:
+            generation = await get_redis().get(TOPIC_CACHE_GENERATION_KEY)
+        except Exception as e:
+            logger.warning(f"Topic cache generation check failed, clearing cache: {e}")
+            self.clear()
+            self._generation = None
+            return
+
+        if generation != self._generation:
+            self.clear()
+            self._generation = generation
+
+    async def resolve(self, names: Iterable[str]) -> Dict[str, int]:
+        """Возвращает id для каждого имени, создавая недостающие топики."""
+        wanted = {name for name in names if name}
+        missing = wanted - self._ids.keys()
+
+        if missing:
+            async with self._session_factory() as session:
+                await session.execute(
+                    dialect_insert(session, Topic)
+                    .values([{"name": name} for name in missing])
+                    .on_conflict_do_nothing(index_elements=[Topic.name])
+                )
+                await session.commit()
+                result = await session.execute(
+                    select(Topic.name, Topic.id).where(Topic.name.in_(missing))
+                )
+                for name, topic_id in result.all():
+                    self._ids[name] = topic_id
+            logger.debug(f"Resolved {len(missing)} topics from database")
+
+        return {name: self._ids[name] for name in wanted if name in self._ids}
+
+
+topic_cache = TopicCache()
+
+
+async def invalidate_topic_cache() -> None:
+    """Сбрасывает кеш топиков в этом процессе и во всех воркерах."""
+    topic_cache.clear()
+    try:
+        await get_redis().incr(TOPIC_CACHE_GENERATION_KEY)
+    except Exception as e:
+        logger.error(f"Failed to publish topic cache invalidation: {e}")
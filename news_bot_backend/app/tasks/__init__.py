@@ -1 +1,2 @@
-from app.tasks import news_tasks
\ No newline at end of file
+from app.tasks import news_tasks
+from app.tasks import ingest
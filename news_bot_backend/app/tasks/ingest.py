@@ -0,0 +1,24 @@
+# app/tasks/ingest.py
+from app.celery_app import celery_app
+from app.core.config import get_settings
+from app.core.logging_config import get_logger
+from app.db.database import AsyncSessionLocal
+from app.services.news_ingestion import ingest_sources
+from app.tasks.news_tasks import run_async
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+async def _run_ingest(source_ids: list[int], limit: int) -> int:
+    async with AsyncSessionLocal() as session:
+        created = await ingest_sources(session, source_ids=source_ids, limit=limit)
+        return len(created)
+
+
+@celery_app.task(name="app.tasks.ingest.run_auto_ingest")
+def run_auto_ingest(source_ids: list[int], limit: int | None = None) -> int:
+    """Внеплановая загрузка статей указанных источников с анализом в ML-сервисе."""
+    created = run_async(_run_ingest(source_ids, limit or settings.MAX_ARTICLES_PER_SOURCE))
+    logger.info(f"Auto ingest for sources {source_ids} created {created} articles")
+    return created
@@ -1,67 +1,34 @@
 # app/tasks/news_tasks.py
 import asyncio
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+from celery import chord
 
 from app.celery_app import celery_app
 from app.db.database import AsyncSessionLocal
-from app.models import Source, Articles, UserSources, Topic
-from app.services.news_parser import parse_news
-from app.services.ml_client import get_summary_from_ml
-from sqlalchemy import select
+from app.models import Source, Articles, UserSources
+from app.services.article_rows import article_row, insert_articles, resolve_topic_ids, to_naive_utc
+from app.services.circuit_breaker import begin_attempt, record_failure, record_success
+from app.services.ingest_pipeline import IngestPipeline
+from app.services.news_parser import ArticleLink, FeedState, advance_watermark, discover_articles
+from app.services.poll_schedule import compute_poll_interval
+from app.services.source_lock import acquire_source_lock, release_source_lock, wait_source_locks
+from app.services.topic_cache import topic_cache
+from sqlalchemy import or_, select, update
 from app.core.config import get_settings
 from app.core.logging_config import get_logger
 
 logger = get_logger(__name__)
 settings = get_settings()
 
+# Сколько последних статей источника учитывать при оценке частоты публикаций
+RECENT_ARTICLES_FOR_CADENCE = 20
 
-def _to_naive_utc(dt: datetime | None) -> datetime | None:
-    """
-    Конвертирует timezone-aware datetime в naive UTC.
-    Если datetime уже naive, возвращает как есть.
-    Если None, возвращает None.
-    """
-    if dt is None:
-        return None
-    if dt.tzinfo is None:
-        return dt
-    # Конвертируем в UTC и убираем timezone info
-    return dt.astimezone(timezone.utc).replace(tzinfo=None)
-
-
-async def _get_or_create_topic(session: AsyncSessionLocal, topic_name: str) -> int | None:
-    """
-    Получает существующий топик или создает новый.
-    Возвращает topic_id или None, если topic_name пустой.
-    """
-    if not topic_name or not topic_name.strip():
-        return None
 
-    normalized_name = topic_name.strip()[:50]  # Ограничиваем длину
-
-    # Ищем существующий топик
-    stmt = select(Topic).where(Topic.name == normalized_name)
-    result = await session.execute(stmt)
-    existing_topic = result.scalar_one_or_none()
-
-    if existing_topic:
-        return existing_topic.id
-
-    # Создаем новый топик
-    try:
-        new_topic = Topic(name=normalized_name)
-        session.add(new_topic)
-        await session.flush()  # Flush чтобы получить ID без commit
-        logger.info(f"Created new topic: {normalized_name} (ID: {new_topic.id})")
-        return new_topic.id
-    except Exception as e:
-        logger.error(f"Error creating topic '{normalized_name}': {e}", exc_info=True)
-        # В случае ошибки (например, дубликат из-за race condition), пробуем найти снова
-        result = await session.execute(stmt)
-        existing_topic = result.scalar_one_or_none()
-        if existing_topic:
-            return existing_topic.id
-        return None
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
 def run_async(coro):
@@ -77,70 +44,268 @@ def run_async(coro):
     return loop.run_until_complete(coro)
 
 
+async def _get_known_urls(session: AsyncSessionLocal, urls: list[str]) -> set[str]:
+    """
+    Одним запросом url IN (...) возвращает ссылки, которые уже есть в Articles.
+    """
+    if not urls:
+        return set()
+    stmt = select(Articles.url).where(Articles.url.in_(set(urls)))
+    result = await session.execute(stmt)
+    return set(result.scalars().all())
+
+
+async def _discover_new_articles(session: AsyncSessionLocal, source: Source, limit: int,
+                                 db_lock: asyncio.Lock, feed_states: dict[int, FeedState]) -> list[ArticleLink]:
+    """
+    Собирает только новые ссылки источника: известные отсекаются
+    одним запросом к БД еще до загрузки страниц. Состояние фида остается
+    в feed_states: водяной знак сдвигается после записи статей.
+    """
+    feed_state = FeedState(
+        etag=source.feed_etag,
+        last_modified=source.feed_last_modified,
+        content_hash=source.feed_hash,
+        watermark_published_at=source.watermark_published_at,
+        watermark_guid=source.watermark_guid,
+    )
+
+    async def known_urls(urls: list[str]) -> set[str]:
+        # Сессию параллельно использует стадия persist
+        async with db_lock:
+            return await _get_known_urls(session, urls)
+
+    links = await discover_articles(
+        source.source_url,
+        limit=limit,
+        lang=source.language,
+        known_urls=known_urls,
+        feed_state=feed_state,
+    )
+    feed_states[source.id] = feed_state
+
+    # Состояние circuit breaker сохраняется в том же commit, что и статьи
+    if feed_state.error:
+        record_failure(source, feed_state.error, _utcnow())
+    else:
+        record_success(source)
+    return links
+
+
+async def _persist_articles(session: AsyncSessionLocal, source: Source, articles_data: list[dict],
+                            db_lock: asyncio.Lock) -> tuple[int, list[str]]:
+    """
+    Записывает пачку готовых статей источника одним INSERT.
+    Возвращает число добавленных статей и ссылки всех статей пачки: они либо
+    есть в Articles (в том числе записанные параллельным прогоном), либо
+    не влезут в колонку url никогда - повторять их при следующем опросе незачем.
+    """
+    topic_ids = await resolve_topic_ids(item.get('topic') for item in articles_data)
+    rows = [article_row(source, item, topic_ids) for item in articles_data]
+
+    async with db_lock:
+        inserted = await insert_articles(session, rows)
+    return len(inserted), [row["url"] for row in rows]
+
+
+async def _ingest_sources(session: AsyncSessionLocal, sources: list[Source], limit: int) -> dict[int, int]:
+    """
+    Загружает новые статьи источников через потоковый конвейер
+    (discover -> fetch -> extract -> summarize -> persist).
+    Возвращает {source_id: added} (commit делает вызывающий код).
+    """
+    db_lock = asyncio.Lock()
+    feed_states: dict[int, FeedState] = {}
+    stored: dict[int, set[str]] = {source.id: set() for source in sources}
+
+    async def persist(source: Source, articles_data: list[dict]) -> int:
+        added, urls = await _persist_articles(session, source, articles_data, db_lock)
+        stored[source.id].update(urls)
+        return added
+
+    pipeline = IngestPipeline(
+        discover=partial(_discover_new_articles, session, limit=limit, db_lock=db_lock, feed_states=feed_states),
+        persist=persist,
+    )
+    added = await pipeline.run(sources)
+
+    # Водяной знак проходит только записанные статьи: несохраненные будут прочитаны снова.
+    # Кеш фида сохраняется в том же commit, что и статьи
+    for source in sources:
+        feed_state = feed_states.get(source.id)
+        if feed_state is None:
+            continue
+        advance_watermark(feed_state, stored[source.id])
+        source.feed_etag = feed_state.etag
+        source.feed_last_modified = feed_state.last_modified
+        source.feed_hash = feed_state.content_hash
+        source.watermark_published_at = to_naive_utc(feed_state.watermark_published_at)
+        source.watermark_guid = feed_state.watermark_guid
+    return added
+
+
+async def _ingest_source(session: AsyncSessionLocal, source: Source, limit: int) -> int:
+    """Загружает один источник, возвращает количество добавленных статей."""
+    return (await _ingest_sources(session, [source], limit))[source.id]
+
+
 @celery_app.task(name="app.tasks.news_tasks.run_news_pipeline")
 def run_news_pipeline():
-    return run_async(process_all_sources())
+    """
+    Beat-задача: раскладывает источники, у которых наступил next_fetch_at,
+    на отдельные задачи ingest_source_task и собирает итоги прогона
+    в summarize_ingest_run (chord).
+    """
+    source_ids = run_async(_claim_due_source_ids())
+    if not source_ids:
+        logger.info("No sources due for ingestion")
+        return {"sources": 0}
+
+    header = [ingest_source_task.s(source_id) for source_id in source_ids]
+    chord(header)(summarize_ingest_run.s(time.time()))
+    logger.info(f"Dispatched ingestion for {len(source_ids)} sources")
+    return {"sources": len(source_ids)}
+
+
+@celery_app.task(name="app.tasks.news_tasks.ingest_source")
+def ingest_source_task(source_id: int, limit: int | None = None):
+    """Загрузка новостей одного источника с отдельным commit."""
+    return run_async(process_source(source_id, limit or settings.MAX_ARTICLES_PER_SOURCE))
+
+
+@celery_app.task(name="app.tasks.news_tasks.summarize_ingest_run")
+def summarize_ingest_run(results: list[dict], started_at: float):
+    """Callback chord: подсчитывает итоги прогона по всем источникам."""
+    totals = _summarize_results(results, started_at)
+    logger.info(
+        f"Ingestion run finished: sources={totals['sources']}, failed={totals['failed']}, "
+        f"articles={totals['articles']}, duration={totals['duration_sec']}s"
+    )
+    return totals
+
+
+def _summarize_results(results: list[dict], started_at: float) -> dict:
+    results = [r for r in results if r]
+    failed = [r["source_id"] for r in results if r.get("status") == "error"]
+    return {
+        "sources": len(results),
+        "failed": len(failed),
+        "failed_source_ids": failed,
+        "articles": sum(r.get("added", 0) for r in results),
+        "duration_sec": round(time.time() - started_at, 2),
+    }
+
+
+async def _get_active_source_ids() -> list[int]:
+    async with AsyncSessionLocal() as session:
+        stmt = select(Source.id).where(Source.is_active == True).order_by(Source.id)
+        return list((await session.execute(stmt)).scalars().all())
 
 
-async def process_all_sources():
+async def _claim_due_source_ids() -> list[int]:
+    """
+    Отбирает активные источники с наступившим next_fetch_at и сразу сдвигает
+    им next_fetch_at на время аренды, чтобы следующий тик beat не отправил
+    их повторно, пока задача еще выполняется.
+    """
+    now = _utcnow()
+    lease_until = now + timedelta(minutes=settings.SOURCE_DISPATCH_LEASE_MINUTES)
     async with AsyncSessionLocal() as session:
-        stmt = select(Source).where(Source.is_active == True)
-        sources = (await session.execute(stmt)).scalars().all()
-
-        for source in sources:
-            try:
-                articles_data = parse_news(source.source_url, limit=10, lang=source.language)
-
-                for item in articles_data:
-                    try:
-                        exist_stmt = select(Articles).where(Articles.url == item['url'])
-                        if (await session.execute(exist_stmt)).scalar():
-                            continue
-
-                        # Получаем summary (с fallback на первые 200 символов если ML недоступен)
-                        try:
-                            summary_text = await get_summary_from_ml(item['text'])
-                        except Exception as e:
-                            logger.error(
-                                f"Failed to get summary for article {item.get('url', 'unknown')}, "
-                                f"using fallback: {e}",
-                                exc_info=True
-                            )
-                            # Fallback: первые 200 символов текста
-                            summary_text = item['text'][:200] + "..." if len(item['text']) > 200 else item['text']
-
-                        # Получаем или создаем топик, если он есть в статье
-                        topic_id = source.topic_id  # По умолчанию используем топик источника
-                        if 'topic' in item and item['topic']:
-                            extracted_topic_id = await _get_or_create_topic(session, item['topic'])
-                            if extracted_topic_id:
-                                topic_id = extracted_topic_id
-                                logger.debug(
-                                    f"Assigned topic '{item['topic']}' to article {item.get('url', 'unknown')}")
-
-                        pub_dt = _to_naive_utc(item.get('published_at')) or datetime.utcnow()
-                        new_article = Articles(
-                            title=item['title'],
-                            summary=summary_text,
-                            image_url=item['image_url'],
-                            url=item['url'],
-                            published_at=pub_dt,  # Без tzinfo
-                            source_id=source.id,
-                            topic_id=topic_id
-                        )
-                        session.add(new_article)
-                    except Exception as e:
-                        logger.error(f"Error processing article {item.get('url', 'unknown')}: {e}", exc_info=True)
-                        continue
-
-                # Update last_fetched_at
-                source.last_fetched_at = datetime.now(timezone.utc).replace(tzinfo=None)
-
-            except Exception as e:
-                logger.error(f"Error processing source {source.id} ({source.source_url}): {e}", exc_info=True)
-                continue
+        stmt = (
+            update(Source)
+            .where(Source.is_active == True)
+            .where(or_(Source.next_fetch_at.is_(None), Source.next_fetch_at <= now))
+            .values(next_fetch_at=lease_until)
+            .returning(Source.id)
+        )
+        source_ids = sorted((await session.execute(stmt)).scalars().all())
+        await session.commit()
+        return source_ids
+
+
+async def _schedule_next_fetch(session: AsyncSessionLocal, source: Source, added: int, limit: int) -> None:
+    """Вычисляет next_fetch_at по частоте публикаций и числу новых статей."""
+    stmt = (
+        select(Articles.published_at)
+        .where(Articles.source_id == source.id)
+        .order_by(Articles.published_at.desc())
+        .limit(RECENT_ARTICLES_FOR_CADENCE)
+    )
+    publish_times = (await session.execute(stmt)).scalars().all()
+
+    previous = timedelta(minutes=source.poll_interval_minutes) if source.poll_interval_minutes else None
+    interval = compute_poll_interval(publish_times, new_articles=added, limit=limit, previous=previous)
 
+    source.poll_interval_minutes = max(1, round(interval.total_seconds() / 60))
+    source.next_fetch_at = source.last_fetched_at + interval
+
+
+async def process_source(source_id: int, limit: int) -> dict:
+    """
+    Обрабатывает один источник в собственной сессии и сразу делает commit.
+    Ошибки не пробрасываются, чтобы один источник не ронял chord целиком:
+    они учитываются circuit breaker-ом, и опрос откладывается с backoff.
+    """
+    async with AsyncSessionLocal() as session:
+        source = await session.get(Source, source_id)
+        if source is None or not source.is_active:
+            return {"source_id": source_id, "status": "skipped", "added": 0}
+        if not begin_attempt(source, _utcnow()):
+            return {"source_id": source_id, "status": "tripped", "added": 0}
+
+        # Источник уже опрашивает другой воркер (например, синхронизация пользователя)
+        lock_token = await acquire_source_lock(source_id)
+        if lock_token is None:
+            return {"source_id": source_id, "status": "in_flight", "added": 0}
+
+        source_url = source.source_url
+        try:
+            added = await _ingest_source(session, source, limit=limit)
+            ok = await _finish_poll(session, source, added, limit)
+            await session.commit()
+            return {"source_id": source_id, "status": "ok" if ok else "error", "added": added}
+        except Exception as e:
+            await session.rollback()
+            # id из кеша могли устареть (например, топик удален) - перечитаем их
+            topic_cache.clear()
+            logger.error(f"Error processing source {source_id} ({source_url}): {e}", exc_info=True)
+            await _record_source_failure(session, source, f"{type(e).__name__}: {e}")
+            return {"source_id": source_id, "status": "error", "added": 0}
+        finally:
+            await release_source_lock(source_id, lock_token)
+
+
+async def _finish_poll(session: AsyncSessionLocal, source: Source, added: int, limit: int) -> bool:
+    """
+    Отмечает успешный опрос и планирует следующий. Если фид не получен,
+    next_fetch_at уже сдвинут circuit breaker-ом на время backoff.
+    """
+    if source.failure_count:
+        return False
+    source.last_fetched_at = _utcnow()
+    await _schedule_next_fetch(session, source, added, limit)
+    return True
+
+
+async def _record_source_failure(session: AsyncSessionLocal, source: Source, error: str) -> None:
+    """Сохраняет ошибку опроса после rollback основной транзакции."""
+    try:
+        await session.refresh(source)
+        record_failure(source, error, _utcnow())
         await session.commit()
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"Failed to record failure of source {source.id}: {e}", exc_info=True)
+
+
+async def process_all_sources() -> dict:
+    """Последовательная обработка всех активных источников в текущем процессе."""
+    started_at = time.time()
+    results = [
+        await process_source(source_id, settings.MAX_ARTICLES_PER_SOURCE)
+        for source_id in await _get_active_source_ids()
+    ]
+    return _summarize_results(results, started_at)
 
 
 @celery_app.task(name="app.tasks.news_tasks.sync_user_sources")
@@ -150,6 +315,11 @@ def sync_user_sources_task(user_id: int):
 
 
 async def process_user_news(user_id: int):
+    """
+    Синхронизирует источники пользователя. Опрашиваются только устаревшие
+    источники (last_fetched_at старше SOURCE_FRESHNESS_MINUTES), которые
+    сейчас никто не опрашивает; опросы других воркеров дожидаемся, а не повторяем.
+    """
     async with AsyncSessionLocal() as session:
         stmt = (
             select(Source)
@@ -160,62 +330,44 @@ async def process_user_news(user_id: int):
         result = await session.execute(stmt)
         sources = result.scalars().all()
 
+        # Свежие источники и источники с открытым circuit breaker не опрашиваем
+        now = _utcnow()
+        fresh_after = now - timedelta(minutes=settings.SOURCE_FRESHNESS_MINUTES)
+        stale = [
+            source for source in sources
+            if (source.last_fetched_at is None or source.last_fetched_at < fresh_after)
+            and begin_attempt(source, now)
+        ]
         if not sources:
             return f"No active sources for user {user_id}"
 
-        for source in sources:
-            try:
-                news_items = parse_news(
-                    source.source_url,
-                    limit=settings.MAX_ARTICLES_PER_SOURCE,
-                    lang=source.language
-                )
-
-                for item in news_items:
-                    try:
-                        exists_stmt = select(Articles).where(Articles.url == item['url'])
-                        exists_res = await session.execute(exists_stmt)
-                        if exists_res.scalar():
-                            continue
-
-                        # Получаем summary (с fallback на первые 200 символов если ML недоступен)
-                        try:
-                            summary = await get_summary_from_ml(item['text'])
-                        except Exception as e:
-                            logger.error(
-                                f"Failed to get summary for article {item.get('url', 'unknown')}, "
-                                f"using fallback: {e}",
-                                exc_info=True
-                            )
-                            # Fallback: первые 200 символов текста
-                            summary = item['text'][:200] + "..." if len(item['text']) > 200 else item['text']
-
-                        # Получаем или создаем топик, если он есть в статье
-                        topic_id = source.topic_id  # По умолчанию используем топик источника
-                        if 'topic' in item and item['topic']:
-                            extracted_topic_id = await _get_or_create_topic(session, item['topic'])
-                            if extracted_topic_id:
-                                topic_id = extracted_topic_id
-                                logger.debug(
-                                    f"Assigned topic '{item['topic']}' to article {item.get('url', 'unknown')}")
-
-                        pub_dt = _to_naive_utc(item.get('published_at')) or datetime.utcnow()
-                        new_article = Articles(
-                            title=item['title'],
-                            summary=summary,
-                            image_url=item['image_url'],
-                            url=item['url'],
-                            published_at=pub_dt,  # Без tzinfo
-                            source_id=source.id,
-                            topic_id=topic_id
-                        )
-                        session.add(new_article)
-                    except Exception as e:
-                        logger.error(f"Error processing article {item.get('url', 'unknown')}: {e}", exc_info=True)
-                        continue
-            except Exception as e:
-                logger.error(f"Error processing source {source.id} ({source.source_url}): {e}", exc_info=True)
-                continue
-
-        await session.commit()
-        return f"Sync completed for user {user_id}"
+        locks: dict[int, str] = {}
+        in_flight: list[int] = []
+        for source in stale:
+            token = await acquire_source_lock(source.id)
+            if token is None:
+                in_flight.append(source.id)
+            else:
+                locks[source.id] = token
+
+        try:
+            if locks:
+                # Все источники пользователя идут через один конвейер
+                to_fetch = [source for source in stale if source.id in locks]
+                limit = settings.MAX_ARTICLES_PER_SOURCE
+                added = await _ingest_sources(session, to_fetch, limit=limit)
+                for source in to_fetch:
+                    await _finish_poll(session, source, added[source.id], limit)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            topic_cache.clear()
+            logger.error(f"Error syncing sources of user {user_id}: {e}", exc_info=True)
+            return f"Sync failed for user {user_id}"
+        finally:
+            for source_id, token in locks.items():
+                await release_source_lock(source_id, token)
+
+    if in_flight and not await wait_source_locks(in_flight, timeout=settings.SOURCE_LOCK_WAIT_SECONDS):
+        logger.warning(f"User {user_id} sync: sources {in_flight} are still being fetched")
+    return f"Sync completed for user {user_id}"
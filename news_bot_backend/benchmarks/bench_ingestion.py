@@ -0,0 +1,228 @@
+"""
+Офлайн-бенчмарк загрузки новостей.
+
+Поднимает локальные HTTP-серверы с RSS-фидами и страницами статей (синтетическими
+или записанными в хранилище HTML), заглушку ML-сервиса и прогоняет через них
+parse_news или process_all_sources на SQLite / локальном Postgres.
+Печатает articles/sec, p95 времени обработки источника и пиковый RSS.
+
+    python -m benchmarks.bench_ingestion --sources 20 --articles 20 --latency-ms 80 --error-rate 0.02
+    python -m benchmarks.bench_ingestion --mode parse --html-store /data/html_store
+    python -m benchmarks.bench_ingestion --json run.json --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import get_settings
+from app.db.database import Base
+from app.models import Source
+from app.services import news_parser
+from app.services.html_store import HtmlStore
+from app.services.http_fetcher import close_fetcher
+from app.services.news_parser import parse_news
+from app.services.source_lock import NO_LOCK
+from app.services.topic_cache import topic_cache
+from app.tasks import news_tasks
+from benchmarks.fixture_server import FixtureServer, FixtureSite, synthetic_article
+
+settings = get_settings()
+
+
+def _p95(values: list[float]) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=20, method="inclusive")[18]
+
+
+def _peak_rss_mb() -> dict:
+    # ru_maxrss в Linux - килобайты; дочерние процессы учитываются после их завершения
+    return {
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_rss_children_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+
+def _load_pages(args) -> list:
+    if not args.html_store:
+        return []
+    store = HtmlStore(args.html_store, max_bytes=settings.HTML_STORE_MAX_MB * 1024 * 1024)
+    pages = []
+    for entry in store.entries():
+        html = store.load(entry)
+        if html:
+            pages.append(html)
+        if len(pages) >= args.articles * args.sources:
+            break
+    return pages
+
+
+def _build_sites(args) -> list[FixtureSite]:
+    recorded = _load_pages(args)
+    sites = []
+    for site_id in range(args.sources):
+        pages = recorded or [synthetic_article(site_id, i) for i in range(args.articles)]
+        sites.append(FixtureSite(
+            site_id=site_id,
+            articles=args.articles,
+            pages=pages,
+            latency_ms=args.latency_ms,
+            error_rate=args.error_rate,
+            seed=args.seed,
+        ))
+    return sites
+
+
+async def _bench_parse(feed_urls: list[str], args) -> dict:
+    durations: list[float] = []
+
+    async def timed(url: str) -> int:
+        started = time.perf_counter()
+        articles = await parse_news(url, limit=args.articles, lang="ru")
+        durations.append(time.perf_counter() - started)
+        return len(articles)
+
+    started = time.perf_counter()
+    counts = await asyncio.gather(*(timed(url) for url in feed_urls))
+    elapsed = time.perf_counter() - started
+    return {"articles": sum(counts), "elapsed_sec": elapsed, "source_durations": durations, "failed": 0}
+
+
+async def _bench_ingest(feed_urls: list[str], args) -> dict:
+    db_url = args.db_url
+    if db_url is None:
+        db_file = Path(tempfile.mkdtemp()) / "bench.sqlite3"
+        db_url = f"sqlite+aiosqlite:///{db_file}"
+
+    engine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add_all([Source(source_url=url, language="ru", is_active=True) for url in feed_urls])
+        await session.commit()
+
+    durations: list[float] = []
+    process_source = news_tasks.process_source
+
+    async def timed_process_source(source_id: int, limit: int) -> dict:
+        started = time.perf_counter()
+        try:
+            return await process_source(source_id, limit)
+        finally:
+            durations.append(time.perf_counter() - started)
+
+    with ExitStack() as stack:
+        stack.enter_context(patch.object(news_tasks, "AsyncSessionLocal", session_factory))
+        stack.enter_context(patch.object(news_tasks, "process_source", timed_process_source))
+        stack.enter_context(patch.object(topic_cache, "_session_factory", session_factory))
+        stack.enter_context(patch.object(settings, "MAX_ARTICLES_PER_SOURCE", args.articles))
+        if not args.redis:
+            # Без Redis: локи и синхронизация кеша топиков не нужны в одном процессе
+            stack.enter_context(patch.object(news_tasks, "acquire_source_lock", AsyncMock(return_value=NO_LOCK)))
+            stack.enter_context(patch.object(topic_cache, "sync", AsyncMock()))
+
+        started = time.perf_counter()
+        totals = await news_tasks.process_all_sources()
+        elapsed = time.perf_counter() - started
+
+    await engine.dispose()
+    return {"articles": totals["articles"], "elapsed_sec": elapsed,
+            "source_durations": durations, "failed": totals["failed"]}
+
+
+async def run(args) -> dict:
+    sites = _build_sites(args)
+    with FixtureServer(sites, ml_latency_ms=args.ml_latency_ms) as server, ExitStack() as stack:
+        stack.enter_context(patch.object(settings, "ML_SERVICE_URL", server.ml_url))
+        stack.enter_context(patch.object(settings, "ML_ANALYZE_URL", server.ml_analyze_url))
+        stack.enter_context(patch.object(settings, "ML_ANALYZE_BATCH_URL", server.ml_analyze_batch_url))
+        if args.crawl_delay is not None:
+            stack.enter_context(patch.object(settings, "CRAWL_DEFAULT_DELAY", args.crawl_delay))
+
+        bench = _bench_parse if args.mode == "parse" else _bench_ingest
+        result = await bench(server.feed_urls, args)
+        await close_fetcher()
+
+    # Дожидаемся завершения процессов разбора, чтобы учесть их память
+    if news_parser._extraction_pool is not None:
+        news_parser._extraction_pool.shutdown(wait=True)
+        news_parser._extraction_pool = None
+
+    durations = result.pop("source_durations")
+    report = {
+        "mode": args.mode,
+        "sources": args.sources,
+        "articles": result["articles"],
+        "failed_sources": result["failed"],
+        "elapsed_sec": round(result["elapsed_sec"], 3),
+        "articles_per_sec": round(result["articles"] / result["elapsed_sec"], 2) if result["elapsed_sec"] else 0.0,
+        "source_p50_sec": round(statistics.median(durations), 3) if durations else 0.0,
+        "source_p95_sec": round(_p95(durations), 3),
+    }
+    report.update(_peak_rss_mb())
+    return report
+
+
+def _check_regression(report: dict, baseline_path: str, tolerance: float) -> list[str]:
+    baseline = json.loads(Path(baseline_path).read_text())
+    problems = []
+    if report["articles_per_sec"] < baseline["articles_per_sec"] * (1 - tolerance):
+        problems.append(f"articles/sec {report['articles_per_sec']} < baseline {baseline['articles_per_sec']}")
+    if report["source_p95_sec"] > baseline["source_p95_sec"] * (1 + tolerance):
+        problems.append(f"p95 {report['source_p95_sec']}s > baseline {baseline['source_p95_sec']}s")
+    if report["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+        problems.append(f"peak RSS {report['peak_rss_mb']}MB > baseline {baseline['peak_rss_mb']}MB")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Офлайн-бенчмарк загрузки новостей")
+    parser.add_argument("--mode", choices=["ingest", "parse"], default="ingest",
+                        help="ingest - process_all_sources с БД, parse - только parse_news")
+    parser.add_argument("--sources", type=int, default=10, help="Количество источников")
+    parser.add_argument("--articles", type=int, default=20, help="Статей в фиде каждого источника")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Средняя задержка ответа сайта")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов 500")
+    parser.add_argument("--ml-latency-ms", type=float, default=100, help="Задержка заглушки ML-сервиса")
+    parser.add_argument("--crawl-delay", type=float, help="Переопределить CRAWL_DEFAULT_DELAY")
+    parser.add_argument("--html-store", type=str, help="Отдавать записанные страницы из хранилища HTML")
+    parser.add_argument("--db-url", type=str, help="Async URL БД (по умолчанию временная SQLite)")
+    parser.add_argument("--redis", action="store_true", help="Использовать Redis из REDIS_URL")
+    parser.add_argument("--seed", type=int, default=0, help="Seed для задержек и ошибок")
+    parser.add_argument("--json", type=str, help="Сохранить отчет в JSON")
+    parser.add_argument("--baseline", type=str, help="JSON-отчет прошлого прогона для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Допустимое ухудшение относительно baseline")
+
+    args = parser.parse_args()
+    report = asyncio.run(run(args))
+
+    for key, value in report.items():
+        print(f"{key:>22}: {value}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+
+    if args.baseline:
+        problems = _check_regression(report, args.baseline, args.tolerance)
+        for problem in problems:
+            print(f"❌ Регрессия: {problem}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Union
+from xml.sax.saxutils import escape
+
+PARAGRAPH = (
+    "Это содержательный текст новости для проверки производительности разбора. "
+    "Второе предложение добавляет подробности события и цитату источника. "
+)
+
+
+def synthetic_article(site: int, index: int, paragraphs: int = 12) -> str:
+    """HTML статьи примерно того же размера и структуры, что у новостных сайтов."""
+    title = f"Новость {index} с сайта {site}"
+    body = "".join(f"<p>{PARAGRAPH * 4} ({site}/{index}/{p})</p>" for p in range(paragraphs))
+    return (
+        f"<html><head><title>{title}</title>"
+        f'<meta property="og:image" content="/img/{index}.jpg"></head>'
+        f"<body><nav>Меню</nav><article><h1>{title}</h1>{body}</article>"
+        f"<footer>Подвал</footer></body></html>"
+    )
+
+
+@dataclass
+class FixtureSite:
+    """
+    Один источник: /robots.txt, /feed.xml и /article/<n>.
+    pages - HTML статей (синтетический или записанный), используется по кругу.
+    """
+    site_id: int
+    articles: int
+    pages: List[Union[str, bytes]]
+    latency_ms: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+    published: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.seed + self.site_id)
+        self._random_lock = threading.Lock()
+
+    def delay(self) -> float:
+        """Задержка ответа: latency_ms с разбросом +-50%."""
+        with self._random_lock:
+            return self.latency_ms / 1000 * self._random.uniform(0.5, 1.5)
+
+    def should_fail(self) -> bool:
+        with self._random_lock:
+            return self._random.random() < self.error_rate
+
+    def feed(self, base_url: str) -> bytes:
+        items = []
+        for i in range(self.articles):
+            pub = format_datetime(self.published - timedelta(minutes=15 * i))
+            items.append(
+                f"<item><title>Новость {i}</title><link>{base_url}/article/{i}</link>"
+                f"<pubDate>{pub}</pubDate><category>Бенчмарк</category></item>"
+            )
+        return (
+            f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>{escape(f'Site {self.site_id}')}</title><link>{base_url}/</link>"
+            f"{''.join(items)}</channel></rss>"
+        ).encode("utf-8")
+
+    def article(self, index: int) -> bytes:
+        page = self.pages[index % len(self.pages)]
+        return page.encode("utf-8") if isinstance(page, str) else page
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        site = self.server.site
+        if self.path == "/robots.txt":
+            self._send(200, b"User-agent: *\nAllow: /\n", "text/plain")
+            return
+
+        time.sleep(site.delay())
+        if site.should_fail():
+            self._send(500, b"fixture error", "text/plain")
+        elif self.path == "/feed.xml":
+            self._send(200, site.feed(f"http://{self.headers['Host']}"), "application/rss+xml; charset=utf-8")
+        elif self.path.startswith("/article/"):
+            self._send(200, site.article(int(self.path.rsplit("/", 1)[1])), "text/html; charset=utf-8")
+        else:
+            self._send(404, b"not found", "text/plain")
+
+
+class _SummaryHandler(BaseHTTPRequestHandler):
+    """
+    Заглушка ML-сервиса: POST /v1/summarize, /v1/analyze и /v1/analyze/batch
+    с задержкой (для пачки - одна задержка на запрос), summary - начало текста,
+    тональность и сущности фиксированные.
+    """
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    @staticmethod
+    def _analysis(text: str) -> dict:
+        return {
+            "summary": text[:300],
+            "sentiment": {"label": "neutral", "score": 0.5},
+            "entities": [{"text": "Бенчмарк", "type": "ORG", "score": 0.9}],
+        }
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        time.sleep(self.server.latency_ms / 1000)
+        if self.path == "/v1/analyze/batch":
+            result = {"results": [self._analysis(text) for text in payload.get("texts", [])]}
+        elif self.path == "/v1/analyze":
+            result = self._analysis(payload.get("text", ""))
+        else:
+            result = {"summary": payload.get("text", "")[:300]}
+        body = json.dumps(result).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FixtureServer:
+    """
+    Локальные HTTP-серверы для бенчмарка. Каждый сайт слушает свой порт на
+    127.0.0.1, поэтому для планировщика обхода это разные хосты - как в проде.
+    """
+
+    def __init__(self, sites: List[FixtureSite], ml_latency_ms: Optional[float] = None) -> None:
+        self._servers: List[ThreadingHTTPServer] = []
+        self.feed_urls: List[str] = []
+        self.ml_url: Optional[str] = None
+        self.ml_analyze_url: Optional[str] = None
+        self.ml_analyze_batch_url: Optional[str] = None
+
+        for site in sites:
+            server = self._start(_Handler)
+            server.site = site
+            self.feed_urls.append(f"http://127.0.0.1:{server.server_port}/feed.xml")
+        if ml_latency_ms is not None:
+            server = self._start(_SummaryHandler)
+            server.latency_ms = ml_latency_ms
+            self.ml_url = f"http://127.0.0.1:{server.server_port}/v1/summarize"
+            self.ml_analyze_url = f"http://127.0.0.1:{server.server_port}/v1/analyze"
+            self.ml_analyze_batch_url = f"http://127.0.0.1:{server.server_port}/v1/analyze/batch"
+
+    def _start(self, handler: Callable) -> ThreadingHTTPServer:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self._servers.append(server)
+        return server
+
+    def close(self) -> None:
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
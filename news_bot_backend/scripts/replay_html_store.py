@@ -0,0 +1,133 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+import argparse
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, update
+
+from app.core.config import get_settings
+from app.db.database import AsyncSessionLocal
+from app.models import Articles, Source
+from app.services.html_store import HtmlStore, get_html_store
+from app.services.ml_client import analysis_fields, analyze_batch
+from app.services.news_parser import _run_extraction
+
+settings = get_settings()
+
+
+async def _load_languages(urls: list[str]) -> dict[str, str]:
+    """Язык источника для уже сохраненных статей (url -> language)."""
+    async with AsyncSessionLocal() as session:
+        stmt = (
+            select(Articles.url, Source.language)
+            .join(Source, Articles.source_id == Source.id)
+            .where(Articles.url.in_(urls))
+        )
+        return {url: lang for url, lang in (await session.execute(stmt)).all() if lang}
+
+
+async def replay(store: HtmlStore, limit: int | None, lang: str, summarize: bool,
+                 write: bool, concurrency: int, use_db: bool):
+    entries = list(store.entries())
+    if limit:
+        entries = entries[:limit]
+    if not entries:
+        print("Хранилище HTML пустое.")
+        return
+
+    languages = await _load_languages([e["url"] for e in entries]) if use_db else {}
+    semaphore = asyncio.Semaphore(concurrency)
+    results: list[dict] = []
+    missing = 0
+
+    async def replay_one(entry: dict):
+        nonlocal missing
+        async with semaphore:
+            html = await asyncio.to_thread(store.load, entry)
+            if html is None:
+                missing += 1
+                return
+            data = await _run_extraction(entry["url"], html, None, None, languages.get(entry["url"], lang))
+            if data:
+                results.append(data)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(replay_one(entry) for entry in entries))
+    if summarize and results:
+        # Summary, тональность и сущности - пачками через /v1/analyze/batch, как в конвейере загрузки
+        analyses = await analyze_batch([data["text"] for data in results])
+        for data, result in zip(results, analyses):
+            data.update(analysis_fields(result))
+    elapsed = time.perf_counter() - started
+
+    updated = 0
+    if write and results:
+        async with AsyncSessionLocal() as session:
+            for data in results:
+                values = {"title": data["title"][:255], "image_url": data["image_url"]}
+                if summarize:
+                    values.update({field: data[field] for field in
+                                   ("summary", "sentiment_label", "sentiment_score", "entities")})
+                result = await session.execute(
+                    update(Articles).where(Articles.url == data["url"]).values(**values)
+                )
+                updated += result.rowcount
+            await session.commit()
+
+    print(f"Страниц: {len(entries)}, разобрано: {len(results)}, вытеснено: {missing}")
+    print(f"Время: {elapsed:.2f}s, {len(entries) / elapsed:.1f} страниц/с")
+    if write:
+        print(f"Обновлено статей: {updated}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Повторный разбор (и суммаризация) сохраненного HTML без обращения к сети"
+    )
+    parser.add_argument("--dir", type=str, help="Каталог хранилища (по умолчанию HTML_STORE_DIR)")
+    parser.add_argument("--limit", type=int, help="Сколько страниц обработать")
+    parser.add_argument("--lang", type=str, default="ru", help="Язык, если статьи нет в БД")
+    parser.add_argument("--summarize", action="store_true", help="Заново получить summary, тональность и сущности от ML-сервиса")
+    parser.add_argument("--write", action="store_true", help="Записать результат в Articles (по url)")
+    parser.add_argument("--no-db", action="store_true", help="Не обращаться к БД (для бенчмарков)")
+    parser.add_argument("--concurrency", type=int, default=settings.ML_CONCURRENCY * 4,
+                        help="Сколько страниц обрабатывается одновременно")
+
+    args = parser.parse_args()
+
+    if args.dir:
+        store = HtmlStore(args.dir, settings.HTML_STORE_MAX_MB * 1024 * 1024)
+    else:
+        store = get_html_store()
+    if store is None:
+        print("❌ Хранилище HTML не настроено: задайте HTML_STORE_DIR или --dir")
+        return
+    if args.write and args.no_db:
+        print("❌ --write требует доступа к БД")
+        return
+
+    await replay(
+        store,
+        limit=args.limit,
+        lang=args.lang,
+        summarize=args.summarize,
+        write=args.write,
+        concurrency=args.concurrency,
+        use_db=not args.no_db,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+
+'''
+Replay runs extraction in the same process pool as ingestion, so it measures
+the current parser at local-disk speed. Example:
+
+docker-compose exec worker python scripts/replay_html_store.py --summarize --write
+
+'''
@@ -56,6 +56,23 @@ async def test_db_session() -> AsyncGenerator[AsyncSession, None]:
     await engine.dispose()
 
 
+@pytest_asyncio.fixture
+async def sqlite_session_factory():
+    """Фабрика сессий к пустой in-memory SQLite со всеми таблицами."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def sqlite_session(sqlite_session_factory):
+    """Сессия к in-memory SQLite (см. sqlite_session_factory)."""
+    async with sqlite_session_factory() as session:
+        yield session
+
+
 # ... остальные фикстуры без изменений ...
 
 
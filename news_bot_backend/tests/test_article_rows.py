@@ -0,0 +1,110 @@
+# news_bot_backend/tests/test_article_rows.py
+import pytest
+from unittest.mock import AsyncMock, patch, MagicMock
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
+
+from app.models import Articles
+from app.services.article_rows import insert_articles, resolve_topic_ids, to_naive_utc
+
+
+class TestToNaiveUtc:
+    """Тесты для функции to_naive_utc."""
+
+    def test_to_naive_utc_with_aware_datetime(self):
+        """Тест конвертации aware datetime в naive UTC."""
+        aware_dt = datetime(2025, 12, 20, 12, 0, 0, tzinfo=timezone.utc)
+        result = to_naive_utc(aware_dt)
+
+        assert result.tzinfo is None
+        assert result.year == 2025
+        assert result.month == 12
+        assert result.day == 20
+
+    def test_to_naive_utc_with_naive_datetime(self):
+        """Тест что naive datetime остается без изменений."""
+        naive_dt = datetime(2025, 12, 20, 12, 0, 0)
+        result = to_naive_utc(naive_dt)
+
+        assert result == naive_dt
+        assert result.tzinfo is None
+
+    def test_to_naive_utc_with_none(self):
+        """Тест что None возвращается как есть."""
+        assert to_naive_utc(None) is None
+
+
+@pytest.mark.asyncio
+class TestResolveTopicIds:
+    """Тесты для функции resolve_topic_ids."""
+
+    @patch('app.services.article_rows.topic_cache')
+    async def test_empty_names(self, mock_cache):
+        """Тест что без топиков кеш не используется."""
+        result = await resolve_topic_ids(["", None, "   "])
+
+        assert result == {}
+        mock_cache.resolve.assert_not_called()
+
+    @patch('app.services.article_rows.topic_cache')
+    async def test_names_resolved_in_one_call(self, mock_cache):
+        """Тест что все имена пачки разрешаются одним вызовом."""
+        mock_cache.sync = AsyncMock()
+        mock_cache.resolve = AsyncMock(return_value={"Technology": 1, "Science": 2})
+
+        result = await resolve_topic_ids(["Technology", " Science ", "Technology", "a" * 60])
+
+        assert result == {"Technology": 1, "Science": 2}
+        mock_cache.resolve.assert_awaited_once_with({"Technology", "Science", "a" * 50})
+
+    @patch('app.services.article_rows.topic_cache')
+    async def test_cache_error_falls_back(self, mock_cache):
+        """Тест что ошибка кеша не роняет загрузку источника."""
+        mock_cache.sync = AsyncMock(side_effect=RuntimeError("db down"))
+
+        assert await resolve_topic_ids(["Technology"]) == {}
+
+
+@pytest.mark.asyncio
+class TestInsertArticles:
+    """Тесты для пакетной вставки статей."""
+
+    @staticmethod
+    def _row(url, **kwargs):
+        row = {"title": "Title", "summary": "Summary", "image_url": None, "url": url,
+               "published_at": datetime(2025, 12, 20), "source_id": None, "topic_id": None}
+        row.update(kwargs)
+        return row
+
+    async def test_duplicates_are_skipped(self, sqlite_session):
+        """Тест что конфликт по url не роняет вставку остальных строк."""
+        first = await insert_articles(sqlite_session, [self._row("https://example.com/a")])
+        assert len(first) == 1
+
+        inserted = await insert_articles(sqlite_session, [
+            self._row("https://example.com/a"),
+            self._row("https://example.com/b"),
+        ])
+
+        assert len(inserted) == 1
+        total = await sqlite_session.execute(select(func.count()).select_from(Articles))
+        assert total.scalar() == 2
+
+    async def test_oversized_values(self, sqlite_session):
+        """Тест что слишком длинные значения не ломают пакет."""
+        inserted = await insert_articles(sqlite_session, [
+            self._row("https://example.com/" + "x" * 300),
+            self._row("https://example.com/c", title="t" * 300, image_url="https://img/" + "x" * 300),
+        ])
+
+        assert len(inserted) == 1
+        article = await sqlite_session.get(Articles, inserted[0])
+        assert len(article.title) == 255
+        assert article.image_url is None
+
+    async def test_empty_rows(self):
+        """Тест что пустой пакет не обращается к БД."""
+        mock_session = MagicMock()
+        assert await insert_articles(mock_session, []) == []
+        mock_session.execute.assert_not_called()
@@ -0,0 +1,75 @@
+# news_bot_backend/tests/test_circuit_breaker.py
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.services.circuit_breaker import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    begin_attempt,
+    compute_backoff,
+    record_failure,
+    record_success,
+)
+
+NOW = datetime(2025, 12, 20, 12, 0, 0)
+
+
+def make_source(**kwargs):
+    fields = dict(failure_count=0, circuit_state=CIRCUIT_CLOSED, circuit_open_until=None,
+                  last_failure_at=None, last_error=None, next_fetch_at=None)
+    fields.update(kwargs)
+    return SimpleNamespace(**fields)
+
+
+class TestCircuitBreaker:
+    """Тесты для circuit breaker источников."""
+
+    def test_backoff_doubles_and_is_capped(self):
+        """Тест экспоненциальной паузы с ограничением сверху."""
+        assert compute_backoff(1) == timedelta(minutes=15)
+        assert compute_backoff(3) == timedelta(minutes=60)
+        assert compute_backoff(20) == timedelta(days=1)
+
+    def test_failures_below_threshold_keep_circuit_closed(self):
+        """Тест что первые ошибки только откладывают опрос."""
+        source = make_source()
+        record_failure(source, "ConnectError: down", NOW)
+
+        assert source.failure_count == 1
+        assert source.circuit_state == CIRCUIT_CLOSED
+        assert source.next_fetch_at == NOW + timedelta(minutes=15)
+        assert source.last_error == "ConnectError: down"
+
+    def test_threshold_opens_circuit(self):
+        """Тест что после порога ошибок цепь открывается."""
+        source = make_source(failure_count=2)
+        record_failure(source, "timeout", NOW)
+
+        assert source.circuit_state == CIRCUIT_OPEN
+        assert source.circuit_open_until == NOW + timedelta(minutes=60)
+        assert not begin_attempt(source, NOW + timedelta(minutes=30))
+
+    def test_expired_circuit_goes_half_open(self):
+        """Тест что после паузы делается пробный опрос."""
+        source = make_source(failure_count=3, circuit_state=CIRCUIT_OPEN, circuit_open_until=NOW)
+
+        assert begin_attempt(source, NOW + timedelta(seconds=1))
+        assert source.circuit_state == CIRCUIT_HALF_OPEN
+
+    def test_half_open_failure_reopens(self):
+        """Тест что ошибка пробного опроса снова открывает цепь с большей паузой."""
+        source = make_source(failure_count=3, circuit_state=CIRCUIT_HALF_OPEN)
+        record_failure(source, "timeout", NOW)
+
+        assert source.circuit_state == CIRCUIT_OPEN
+        assert source.circuit_open_until == NOW + timedelta(minutes=120)
+
+    def test_success_closes_circuit(self):
+        """Тест что успешный опрос сбрасывает счетчик."""
+        source = make_source(failure_count=4, circuit_state=CIRCUIT_HALF_OPEN, last_error="timeout")
+        record_success(source)
+
+        assert source.failure_count == 0
+        assert source.circuit_state == CIRCUIT_CLOSED
+        assert source.last_error is None
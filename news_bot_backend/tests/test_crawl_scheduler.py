@@ -0,0 +1,119 @@
+# news_bot_backend/tests/test_crawl_scheduler.py
+import asyncio
+import time
+
+import pytest
+
+from app.services.crawl_scheduler import CrawlScheduler, RobotsDisallowedError
+
+
+def make_scheduler(robots=None, **kwargs):
+    robots = robots or {}
+
+    async def loader(robots_url):
+        if robots_url in robots:
+            return 200, robots[robots_url]
+        return 404, ""
+
+    params = dict(
+        robots_loader=loader,
+        user_agent="newsagent-bot/0.1",
+        max_concurrency=10,
+        per_host=2,
+        default_delay=0.001,
+        host_burst=10,
+        robots_ttl=60,
+    )
+    params.update(kwargs)
+    return CrawlScheduler(**params)
+
+
+@pytest.mark.asyncio
+class TestCrawlScheduler:
+    """Тесты для планировщика обхода."""
+
+    async def test_per_host_limit(self):
+        """Тест что к одному хосту идет не больше per_host запросов сразу."""
+        scheduler = make_scheduler(per_host=2)
+        active = 0
+        peak = 0
+
+        async def request(i):
+            nonlocal active, peak
+            async with scheduler.slot(f"https://a.example.com/{i}"):
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(request(i) for i in range(6)))
+
+        assert peak == 2
+
+    async def test_round_robin_between_hosts(self):
+        """Тест что слоты выдаются хостам по очереди."""
+        scheduler = make_scheduler(max_concurrency=1, per_host=1)
+        order = []
+
+        async def request(host, i):
+            async with scheduler.slot(f"https://{host}/{i}"):
+                order.append(host)
+                await asyncio.sleep(0)
+
+        # Сначала вся очередь хоста a, затем b - выдача все равно чередуется
+        await asyncio.gather(
+            *(request("a.example.com", i) for i in range(3)),
+            *(request("b.example.com", i) for i in range(3)),
+        )
+
+        assert order[1:5] == ["b.example.com", "a.example.com", "b.example.com", "a.example.com"]
+
+    async def test_robots_disallow(self):
+        """Тест что запрещенные robots.txt URL не запрашиваются."""
+        scheduler = make_scheduler(robots={
+            "https://a.example.com/robots.txt": "User-agent: *\nDisallow: /private/\n",
+        })
+
+        with pytest.raises(RobotsDisallowedError):
+            async with scheduler.slot("https://a.example.com/private/1"):
+                pass
+
+        async with scheduler.slot("https://a.example.com/public/1"):
+            pass
+
+    async def test_robots_cached(self):
+        """Тест что robots.txt загружается один раз на TTL."""
+        calls = []
+
+        async def loader(robots_url):
+            calls.append(robots_url)
+            return 404, ""
+
+        scheduler = make_scheduler(robots_loader=loader)
+        for i in range(3):
+            async with scheduler.slot(f"https://a.example.com/{i}"):
+                pass
+
+        assert calls == ["https://a.example.com/robots.txt"]
+
+    async def test_crawl_delay(self):
+        """Тест что Crawl-delay задает интервал между запросами к хосту."""
+        scheduler = make_scheduler(robots={
+            "https://a.example.com/robots.txt": "User-agent: *\nCrawl-delay: 1\n",
+        })
+
+        started = time.monotonic()
+        for i in range(2):
+            async with scheduler.slot(f"https://a.example.com/{i}"):
+                pass
+
+        assert time.monotonic() - started >= 0.9
+
+    async def test_sitemaps_from_robots(self):
+        """Тест что sitemap-ы берутся из уже загруженного robots.txt."""
+        scheduler = make_scheduler({
+            "https://a.example.com/robots.txt": "User-agent: *\nAllow: /\nSitemap: https://a.example.com/news.xml\n",
+        })
+
+        assert await scheduler.sitemaps("https://a.example.com/") == ["https://a.example.com/news.xml"]
+        assert await scheduler.sitemaps("https://b.example.com/") == []
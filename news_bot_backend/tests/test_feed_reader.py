@@ -0,0 +1,73 @@
+# news_bot_backend/tests/test_feed_reader.py
+from datetime import datetime, timezone
+
+from app.services.feed_reader import read_feed
+
+
+def rss(items: int) -> bytes:
+    body = "".join(
+        f"<item><title>T{i}</title><link>https://example.com/{i}</link>"
+        f"<guid>id-{i}</guid><pubDate>Sat, 20 Dec 2025 {12 - i % 12:02d}:00:00 +0300</pubDate>"
+        f"<category> Технологии </category></item>"
+        for i in range(items)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>Feed</title><link>https://example.com/</link>{body}</channel></rss>"
+    ).encode("utf-8")
+
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Atom feed</title>
+  <link href="https://example.com/"/>
+  <entry>
+    <id>urn:1</id>
+    <link rel="enclosure" href="https://example.com/1.mp3"/>
+    <link rel="alternate" href="https://example.com/atom/1"/>
+    <published>2025-12-20T09:00:00Z</published>
+    <category term="Science"/>
+  </entry>
+</feed>"""
+
+
+class TestReadFeed:
+    """Тесты для потокового чтения фидов."""
+
+    def test_rss_entries(self):
+        """Тест что из RSS извлекаются ссылка, дата, категория и guid."""
+        entries = read_feed(rss(1), limit=10)
+
+        assert len(entries) == 1
+        entry = entries[0]
+        assert entry.link == "https://example.com/0"
+        assert entry.guid == "id-0"
+        assert entry.category == "Технологии"
+        assert entry.published == datetime(2025, 12, 20, 9, 0, tzinfo=timezone.utc)
+
+    def test_stops_at_limit(self):
+        """Тест что чтение останавливается на limit записей."""
+        entries = read_feed(rss(5000), limit=3)
+        assert [e.link for e in entries] == [f"https://example.com/{i}" for i in range(3)]
+
+    def test_stop_callback(self):
+        """Тест что запись, на которой сработал stop, не попадает в результат."""
+        entries = read_feed(rss(10), limit=10, stop=lambda e: e.guid == "id-2")
+        assert [e.guid for e in entries] == ["id-0", "id-1"]
+
+        assert read_feed(rss(10), limit=10, stop=lambda e: True) == []
+
+    def test_atom_entries(self):
+        """Тест что в Atom берется alternate-ссылка."""
+        entries = read_feed(ATOM, limit=10)
+
+        assert entries[0].link == "https://example.com/atom/1"
+        assert entries[0].guid == "urn:1"
+        assert entries[0].category == "Science"
+        assert entries[0].published == datetime(2025, 12, 20, 9, 0, tzinfo=timezone.utc)
+
+    def test_fallback_cases(self):
+        """Тест что битые, пустые и не-RSS документы отдаются feedparser-у."""
+        assert read_feed(b"<rss><channel><item><link>https://x</link>", limit=10) is None
+        assert read_feed(b"<html><body>Not a feed</body></html>", limit=10) is None
+        assert read_feed(b"<rss/>", limit=10) is None
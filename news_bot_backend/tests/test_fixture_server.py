@@ -0,0 +1,29 @@
+# news_bot_backend/tests/test_fixture_server.py
+import pytest
+from unittest.mock import patch
+
+from app.services import news_parser
+from app.services.http_fetcher import close_fetcher
+from app.services.news_parser import parse_news
+from benchmarks.fixture_server import FixtureServer, FixtureSite, synthetic_article
+
+
+@pytest.mark.asyncio
+class TestFixtureServer:
+    """Сквозной тест парсера на локальном сервере бенчмарка (без внешней сети)."""
+
+    async def test_parse_news_against_fixture_site(self):
+        """Тест что фид и статьи фикстурного сайта разбираются парсером."""
+        site = FixtureSite(site_id=1, articles=3, pages=[synthetic_article(1, i) for i in range(3)])
+
+        with FixtureServer([site]) as server, \
+                patch.object(news_parser.settings, "EXTRACTION_PROCESSES", 0), \
+                patch.object(news_parser.settings, "CRAWL_DEFAULT_DELAY", 0.01):
+            try:
+                articles = await parse_news(server.feed_urls[0], limit=3)
+            finally:
+                await close_fetcher()
+
+        assert len(articles) == 3
+        assert {a["topic"] for a in articles} == {"Бенчмарк"}
+        assert all(len(a["text"]) > 100 for a in articles)
@@ -0,0 +1,46 @@
+# news_bot_backend/tests/test_html_store.py
+import os
+
+from app.services.html_store import HtmlStore
+
+
+class TestHtmlStore:
+    """Тесты для хранилища скачанного HTML."""
+
+    def test_roundtrip_text_and_bytes(self, tmp_path):
+        """Тест что str и bytes возвращаются в исходном виде."""
+        store = HtmlStore(tmp_path, max_bytes=10 ** 6)
+        store.put("https://example.com/a", "<html>Привет</html>")
+        store.put("https://example.com/b", b"<html>\xd0\x9f</html>")
+
+        assert store.get("https://example.com/a") == "<html>Привет</html>"
+        assert store.get("https://example.com/b") == b"<html>\xd0\x9f</html>"
+        assert store.get("https://example.com/missing") is None
+
+    def test_same_content_stored_once(self, tmp_path):
+        """Тест что одинаковые страницы хранятся одним объектом."""
+        store = HtmlStore(tmp_path, max_bytes=10 ** 6)
+        first = store.put("https://example.com/a", "<html>same</html>")
+        second = store.put("https://example.com/b", "<html>same</html>")
+
+        assert first == second
+        assert len(list((tmp_path / "objects").glob("*/*.gz"))) == 1
+        assert sorted(e["url"] for e in store.entries()) == ["https://example.com/a", "https://example.com/b"]
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Тест что при превышении лимита удаляются самые старые объекты."""
+        store = HtmlStore(tmp_path, max_bytes=10 ** 6)
+        for i in range(3):
+            digest = store.put(f"https://example.com/{i}", os.urandom(2000))
+            # Разносим mtime, чтобы порядок вытеснения был определен
+            os.utime(store._object_path(digest), (1000 + i, 1000 + i))
+
+        store._max_bytes = 5000
+        store.put("https://example.com/new", os.urandom(2000))
+
+        assert store.get("https://example.com/0") is None
+        assert store.get("https://example.com/1") is None
+        assert store.get("https://example.com/2") is not None
+        assert store.get("https://example.com/new") is not None
+        # Ссылка на вытесненный объект удаляется при обращении
+        assert "https://example.com/0" not in {e["url"] for e in store.entries()}
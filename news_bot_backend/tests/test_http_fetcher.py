@@ -0,0 +1,192 @@
+# news_bot_backend/tests/test_http_fetcher.py
+import asyncio
+import gzip
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.core.config import get_settings
+from app.services.crawl_scheduler import RobotsDisallowedError
+from app.services.http_fetcher import (
+    HTML_CONTENT_TYPES,
+    HttpFetcher,
+    ROBOTS_MAX_BYTES,
+    MemoryBudget,
+    ResponseTooLargeError,
+    UnsupportedContentTypeError,
+)
+
+settings = get_settings()
+
+
+def make_fetcher(handler) -> HttpFetcher:
+    # Без вежливых задержек: все запросы идут на один хост
+    with patch.object(settings, "CRAWL_MAX_PER_HOST", 10), \
+            patch.object(settings, "CRAWL_HOST_BURST", 10), \
+            patch.object(settings, "CRAWL_DEFAULT_DELAY", 0.001):
+        fetcher = HttpFetcher(concurrency=10, timeout=5)
+    fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return fetcher
+
+
+def route(pages):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        return pages[request.url.path]()
+    return handler
+
+
+@pytest.mark.asyncio
+class TestHttpFetcherGuards:
+    """Тесты ограничений размера и типа ответа."""
+
+    async def test_html_is_returned(self):
+        """Тест обычной загрузки страницы."""
+        fetcher = make_fetcher(route({
+            "/a": lambda: httpx.Response(200, headers={"Content-Type": "text/html; charset=utf-8"},
+                                         content="<html>Привет</html>".encode("utf-8")),
+        }))
+
+        assert await fetcher.fetch_html("https://example.com/a") == "<html>Привет</html>"
+
+    async def test_content_type_checked_before_body(self):
+        """Тест что не-HTML ответ отбрасывается без чтения тела."""
+        read = False
+
+        async def body():
+            nonlocal read
+            read = True
+            yield b"\x00" * 1024
+
+        fetcher = make_fetcher(route({
+            "/video": lambda: httpx.Response(200, headers={"Content-Type": "video/mp4"}, content=body()),
+        }))
+
+        with pytest.raises(UnsupportedContentTypeError):
+            await fetcher.fetch_html("https://example.com/video")
+        assert read is False
+
+    async def test_declared_length_over_limit(self):
+        """Тест что слишком большой Content-Length отбрасывается сразу."""
+        fetcher = make_fetcher(route({
+            "/big": lambda: httpx.Response(200, headers={"Content-Type": "text/html"}, content=b"x" * 2048),
+        }))
+
+        with pytest.raises(ResponseTooLargeError):
+            await fetcher.get("https://example.com/big", max_bytes=1024, content_types=HTML_CONTENT_TYPES)
+
+    async def test_endless_stream_is_cut(self):
+        """Тест что бесконечный ответ без Content-Length обрывается на лимите."""
+        sent = 0
+
+        async def endless():
+            nonlocal sent
+            while True:
+                sent += 1
+                yield b"x" * 1024
+
+        fetcher = make_fetcher(route({
+            "/stream": lambda: httpx.Response(200, headers={"Content-Type": "text/html"}, content=endless()),
+        }))
+
+        with pytest.raises(ResponseTooLargeError):
+            await fetcher.get("https://example.com/stream", max_bytes=10 * 1024)
+        assert sent <= 12
+
+    async def test_gzip_bomb_is_cut(self):
+        """Тест что лимит считается по распакованному телу."""
+        bomb = gzip.compress(b"<html>" + b" " * (1024 * 1024))
+        fetcher = make_fetcher(route({
+            "/bomb": lambda: httpx.Response(200, content=bomb, headers={
+                "Content-Type": "text/html", "Content-Encoding": "gzip",
+            }),
+        }))
+
+        with pytest.raises(ResponseTooLargeError):
+            await fetcher.get("https://example.com/bomb", max_bytes=64 * 1024)
+
+    async def test_decoded_response_has_no_encoding_header(self):
+        """Тест что возвращаемый ответ уже распакован."""
+        fetcher = make_fetcher(route({
+            "/gz": lambda: httpx.Response(200, content=gzip.compress(b"<rss/>"), headers={
+                "Content-Type": "application/rss+xml", "Content-Encoding": "gzip",
+            }),
+        }))
+
+        response = await fetcher.get("https://example.com/gz")
+
+        assert response.content == b"<rss/>"
+        assert "Content-Encoding" not in response.headers
+
+    async def test_memory_budget_bounds_in_flight_bodies(self):
+        """Тест что одновременно читаются тела не больше бюджета."""
+        active = 0
+        peak = 0
+
+        async def body():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            yield b"x" * 100
+            active -= 1
+
+        fetcher = make_fetcher(route({
+            "/page": lambda: httpx.Response(200, headers={"Content-Type": "text/html"}, content=body()),
+        }))
+        fetcher._budget = MemoryBudget(limit=250)
+
+        await asyncio.gather(*(fetcher.get("https://example.com/page", max_bytes=100) for _ in range(6)))
+
+        assert peak == 2
+
+
+    async def test_robots_txt_is_capped(self):
+        """Тест что бесконечный robots.txt обрывается на лимите и обход хоста разрешается."""
+        sent = 0
+
+        async def endless():
+            nonlocal sent
+            while True:
+                sent += 1
+                yield b"User-agent: *\nDisallow: /private\n" * 32
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/robots.txt":
+                return httpx.Response(200, headers={"Content-Type": "text/plain"}, content=endless())
+            return httpx.Response(200, headers={"Content-Type": "text/html"}, content=b"<html></html>")
+
+        fetcher = make_fetcher(handler)
+
+        response = await fetcher.get("https://example.com/private/page")
+
+        assert response.content == b"<html></html>"
+        assert sent * 32 * len(b"User-agent: *\nDisallow: /private\n") <= ROBOTS_MAX_BYTES + 2048
+        assert fetcher._budget.used == 0
+
+    async def test_small_robots_txt_is_applied(self):
+        """Тест что обычный robots.txt по-прежнему применяется."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/robots.txt":
+                return httpx.Response(200, headers={"Content-Type": "text/plain"},
+                                      content=b"User-agent: *\nDisallow: /private\n")
+            return httpx.Response(200, headers={"Content-Type": "text/html"}, content=b"<html></html>")
+
+        fetcher = make_fetcher(handler)
+
+        with pytest.raises(RobotsDisallowedError):
+            await fetcher.get("https://example.com/private/page")
+
+@pytest.mark.asyncio
+class TestMemoryBudget:
+    """Тесты общего бюджета памяти."""
+
+    async def test_oversized_reservation_does_not_deadlock(self):
+        """Тест что резерв больше бюджета ограничивается бюджетом."""
+        budget = MemoryBudget(limit=100)
+
+        async with budget.reserve(1000):
+            assert budget.used == 100
+        assert budget.used == 0
@@ -0,0 +1,116 @@
+# news_bot_backend/tests/test_ingest_pipeline.py
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.ingest_pipeline import IngestPipeline
+from app.services.ml_client import AnalysisResult, EntityResult, SentimentResult
+
+
+def _source(source_id):
+    return SimpleNamespace(id=source_id, language="ru")
+
+
+def _article(url, html, *args):
+    return {"title": f"Title {url}", "text": html * 3, "image_url": None, "published_at": None, "url": url}
+
+
+def _analysis(texts):
+    return [
+        AnalysisResult(
+            summary="summary",
+            sentiment=SentimentResult(label="neutral", score=0.7),
+            entities=[EntityResult(text="ООН", type="ORG", score=0.9)],
+        )
+        for _ in texts
+    ]
+
+
+@pytest.fixture
+def stages():
+    """Подменяет сеть, разбор HTML и ML-сервис."""
+    fetcher = MagicMock()
+    fetcher.fetch_html = AsyncMock(side_effect=lambda url: f"<html>{url}</html>")
+    with patch("app.services.news_parser.get_fetcher", return_value=fetcher), \
+            patch("app.services.ingest_pipeline._run_extraction", new=AsyncMock(side_effect=_article)), \
+            patch("app.services.ingest_pipeline.analyze_batch", new=AsyncMock(side_effect=_analysis)) as summarize:
+        yield SimpleNamespace(fetcher=fetcher, summarize=summarize)
+
+
+@pytest.mark.asyncio
+class TestIngestPipeline:
+    """Тесты потокового конвейера загрузки."""
+
+    @staticmethod
+    def _pipeline(discover, persist, **kwargs):
+        kwargs.setdefault("fetch_workers", 2)
+        kwargs.setdefault("extract_workers", 2)
+        kwargs.setdefault("summarize_workers", 2)
+        kwargs.setdefault("queue_size", 2)
+        return IngestPipeline(discover=discover, persist=persist, **kwargs)
+
+    async def test_articles_reach_persist(self, stages):
+        """Тест что все статьи проходят стадии и учитываются по источникам."""
+        links = {1: [f"https://a.com/{i}" for i in range(5)], 2: ["https://b.com/1"]}
+        persisted = []
+
+        async def discover(source):
+            return [(url, None, None) for url in links[source.id]]
+
+        async def persist(source, articles):
+            persisted.extend(articles)
+            return len(articles)
+
+        added = await self._pipeline(discover, persist).run([_source(1), _source(2)])
+
+        assert added == {1: 5, 2: 1}
+        assert sorted(a["url"] for a in persisted) == sorted(links[1] + links[2])
+        assert all(a["summary"] == "summary" for a in persisted)
+        assert all(a["sentiment_label"] == "neutral" and a["sentiment_score"] == 0.7 for a in persisted)
+        assert persisted[0]["entities"] == [{"text": "ООН", "type": "ORG", "score": 0.9}]
+
+    async def test_failed_fetch_is_dropped(self, stages):
+        """Тест что ошибка скачивания одной статьи не останавливает остальные."""
+        async def fetch_html(url):
+            if url.endswith("bad"):
+                raise RuntimeError("boom")
+            return f"<html>{url}</html>"
+
+        stages.fetcher.fetch_html.side_effect = fetch_html
+
+        async def discover(source):
+            return [("https://a.com/ok", None, None), ("https://a.com/bad", None, None)]
+
+        persist = AsyncMock(side_effect=lambda source, articles: len(articles))
+
+        added = await self._pipeline(discover, persist).run([_source(1)])
+
+        assert added == {1: 1}
+
+    async def test_stages_overlap(self, stages):
+        """Тест что статьи одного источника суммаризируются, пока другой еще собирается."""
+        summarized = asyncio.Event()
+        stages.summarize.side_effect = lambda texts: summarized.set() or _analysis(texts)
+
+        async def discover(source):
+            if source.id == 2:
+                # Второй источник ждет, пока первый дойдет до суммаризации
+                await asyncio.wait_for(summarized.wait(), timeout=5)
+            return [(f"https://{source.id}.com/1", None, None)]
+
+        persist = AsyncMock(side_effect=lambda source, articles: len(articles))
+
+        added = await self._pipeline(discover, persist).run([_source(1), _source(2)])
+
+        assert added == {1: 1, 2: 1}
+
+    async def test_persist_error_propagates(self, stages):
+        """Тест что ошибка записи в БД пробрасывается как есть."""
+        async def discover(source):
+            return [("https://a.com/1", None, None)]
+
+        persist = AsyncMock(side_effect=ValueError("db is down"))
+
+        with pytest.raises(ValueError, match="db is down"):
+            await self._pipeline(discover, persist).run([_source(1)])
@@ -0,0 +1,170 @@
+# news_bot_backend/tests/test_news_ingestion.py
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+from sqlalchemy import func, insert, select
+
+from app.models import Articles, Source, Topic
+from app.services import ml_client
+from app.services.ml_client import AnalysisResult, EntityResult, SentimentResult
+from app.services.news_ingestion import ingest_sources
+
+
+def _article(url):
+    return {"title": "Новость", "text": "Текст новости " * 10, "url": url,
+            "image_url": None, "published_at": None}
+
+
+ANALYSIS = AnalysisResult(
+    summary="Кратко",
+    sentiment=SentimentResult(label="positive", score=0.9),
+    entities=[EntityResult(text="Банк России", type="ORG", score=0.95)],
+)
+
+
+@pytest.mark.asyncio
+class TestIngestSources:
+    """Тесты внеплановой загрузки источников."""
+
+    async def test_articles_get_analysis_fields(self, sqlite_session):
+        """Тест что summary, тональность и сущности сохраняются, дубли отсеиваются."""
+        source = Source(source_name="Example", source_url="https://example.com/rss")
+        sqlite_session.add(source)
+        await sqlite_session.commit()
+
+        articles = [_article("https://example.com/a"), _article("https://example.com/a"),
+                    _article("https://example.com/b")]
+        analyze = AsyncMock(side_effect=lambda texts: [ANALYSIS] * len(texts))
+        with patch("app.services.news_ingestion.parse_news", new=AsyncMock(return_value=articles)), \
+                patch("app.services.news_ingestion.ml_client.analyze_batch", new=analyze):
+            created = await ingest_sources(sqlite_session, source_ids=[source.id], limit=5)
+            again = await ingest_sources(sqlite_session, source_ids=[source.id], limit=5)
+
+        assert sorted(a.url for a in created) == ["https://example.com/a", "https://example.com/b"]
+        assert created[0].summary == "Кратко"
+        assert created[0].sentiment_label == "positive"
+        assert created[0].sentiment_score == pytest.approx(0.9)
+        assert created[0].entities == [{"text": "Банк России", "type": "ORG", "score": 0.95}]
+        # Обе новые статьи ушли в ML-сервис одним пакетом
+        analyze.assert_awaited_once()
+        assert len(analyze.call_args[0][0]) == 2
+        assert again == []
+
+
+    async def test_rss_category_becomes_topic(self, sqlite_session):
+        """Тест что категория из RSS сопоставляется топику, как в плановой загрузке."""
+        topic = Topic(name="Science")
+        source = Source(source_name="Example", source_url="https://example.com/rss")
+        sqlite_session.add_all([topic, source])
+        await sqlite_session.commit()
+
+        articles = [{**_article("https://example.com/a"), "topic": "Science"}, _article("https://example.com/b")]
+        cache = MagicMock(sync=AsyncMock(), resolve=AsyncMock(return_value={"Science": topic.id}))
+        with patch("app.services.news_ingestion.parse_news", new=AsyncMock(return_value=articles)), \
+                patch("app.services.news_ingestion.ml_client.analyze_batch",
+                      new=AsyncMock(side_effect=lambda texts: [ANALYSIS] * len(texts))), \
+                patch("app.services.article_rows.topic_cache", cache):
+            created = await ingest_sources(sqlite_session, source_ids=[source.id], limit=5)
+
+        topics = {a.url: a.topic_id for a in created}
+        assert topics == {"https://example.com/a": topic.id, "https://example.com/b": None}
+        cache.resolve.assert_awaited_once_with({"Science"})
+
+    async def test_concurrent_insert_does_not_lose_batch(self, sqlite_session):
+        """Тест что статья, записанная параллельным прогоном, не роняет остальные."""
+        source = Source(source_name="Example", source_url="https://example.com/rss")
+        sqlite_session.add(source)
+        await sqlite_session.commit()
+        articles = [_article("https://example.com/a"), _article("https://example.com/b")]
+
+        async def analyze(texts):
+            # Пока идет анализ, конвейер успевает записать ту же статью
+            await sqlite_session.execute(
+                insert(Articles).values(title="Раньше", url="https://example.com/a", source_id=source.id)
+            )
+            return [ANALYSIS] * len(texts)
+
+        with patch("app.services.news_ingestion.parse_news", new=AsyncMock(return_value=articles)), \
+                patch("app.services.news_ingestion.ml_client.analyze_batch", new=analyze):
+            created = await ingest_sources(sqlite_session, source_ids=[source.id], limit=5)
+
+        assert [a.url for a in created] == ["https://example.com/b"]
+        total = await sqlite_session.execute(select(func.count()).select_from(Articles))
+        assert total.scalar() == 2
+
+@pytest.mark.asyncio
+class TestAnalyze:
+    """Тесты клиента /v1/analyze."""
+
+    @staticmethod
+    def _client(handler):
+        transport = httpx.MockTransport(handler)
+        client_cls = httpx.AsyncClient
+        return patch("app.services.ml_client.httpx.AsyncClient",
+                     side_effect=lambda **kwargs: client_cls(transport=transport, **kwargs))
+
+    async def test_single_round_trip(self):
+        """Тест что все поля приходят одним запросом."""
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            return httpx.Response(200, json={
+                "summary": "Кратко",
+                "sentiment": {"label": "negative", "score": 0.8},
+                "entities": [{"text": "Москва", "type": "LOC", "score": 0.99}],
+            })
+
+        with self._client(handler):
+            result = await ml_client.analyze("Текст статьи " * 10)
+
+        assert calls == ["/v1/analyze"]
+        assert result.sentiment == SentimentResult(label="negative", score=0.8)
+        assert result.entities == [EntityResult(text="Москва", type="LOC", score=0.99)]
+
+    async def test_fallback_on_error(self):
+        """Тест что при ошибке сервиса остается fallback summary без тональности."""
+        with self._client(lambda request: httpx.Response(503, text="busy")):
+            result = await ml_client.analyze("Короткий текст")
+
+        assert result.summary == "Короткий текст"
+        assert result.sentiment is None
+        assert result.entities == []
+
+
+@pytest.mark.asyncio
+class TestAnalyzeBatch:
+    """Тесты клиента /v1/analyze/batch."""
+
+    async def test_chunks_and_item_errors(self):
+        """Тест что тексты уходят пачками по ML_BATCH_SIZE, а ошибка одного текста дает fallback только ему."""
+        sizes = []
+
+        def handler(request):
+            texts = json.loads(request.content)["texts"]
+            sizes.append(len(texts))
+            return httpx.Response(200, json={"results": [
+                {"error": "Text too short"} if text == "bad" else
+                {"summary": f"S:{text}", "sentiment": {"label": "positive", "score": 0.9}, "entities": []}
+                for text in texts
+            ]})
+
+        with TestAnalyze._client(handler), patch.object(ml_client.settings, "ML_BATCH_SIZE", 2):
+            results = await ml_client.analyze_batch(["a", "bad", "c"])
+
+        assert sizes == [2, 1]
+        assert [r.summary for r in results] == ["S:a", "bad", "S:c"]
+        assert results[1].sentiment is None
+        assert results[2].sentiment == SentimentResult(label="positive", score=0.9)
+
+    async def test_fallback_on_error(self):
+        """Тест что при ошибке запроса вся пачка получает fallback summary."""
+        with TestAnalyze._client(lambda request: httpx.Response(503, text="busy")):
+            results = await ml_client.analyze_batch(["Первый", "Второй"])
+
+        assert [r.summary for r in results] == ["Первый", "Второй"]
+        assert all(r.sentiment is None for r in results)
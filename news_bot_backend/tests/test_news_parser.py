@@ -1,12 +1,21 @@
 # news_bot_backend/tests/test_news_parser.py
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timezone
 
+from app.services import news_parser
 from app.services.news_parser import (
     _make_utc_aware,
     _extract_topic_from_rss_entry,
     _normalize_topic_name,
+    _extract_article,
+    _process_article,
+    _run_extraction,
+    advance_watermark,
+    download_article,
+    discover_articles,
+    FeedState,
     parse_news,
 )
 
@@ -127,9 +136,10 @@ class TestNormalizeTopicName:
 class TestParseNews:
     """Тесты для функции parse_news."""
 
+    @patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(b"<rss/>", {})))
     @patch('app.services.news_parser.feedparser.parse')
-    @patch('app.services.news_parser._process_article')
-    def test_parse_rss_feed(self, mock_process, mock_feedparse):
+    @patch('app.services.news_parser._process_article', new_callable=AsyncMock)
+    async def test_parse_rss_feed(self, mock_process, mock_feedparse):
         """Тест парсинга RSS фида."""
         # Мокируем RSS feed
         mock_feed = MagicMock()
@@ -149,29 +159,459 @@ class TestParseNews:
             "topic": "Technology",
         }
 
-        result = parse_news("https://example.com/rss", limit=1)
+        result = await parse_news("https://example.com/rss", limit=1)
 
         assert len(result) == 1
         assert result[0]["title"] == "Test Article"
         assert result[0]["topic"] == "Technology"
         mock_process.assert_called_once()
 
+    @patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(b"<rss/>", {})))
     @patch('app.services.news_parser.feedparser.parse')
-    def test_parse_empty_rss_feed(self, mock_feedparse):
+    @patch('app.services.news_parser._process_article', new_callable=AsyncMock)
+    async def test_parse_rss_feed_skips_known_urls(self, mock_process, mock_feedparse):
+        """Тест что известные ссылки не скачиваются."""
+        mock_feed = MagicMock()
+        entries = []
+        for i in range(3):
+            entry = MagicMock()
+            entry.link = f"https://example.com/article{i}"
+            entry.published_parsed = None
+            entries.append(entry)
+        mock_feed.entries = entries
+        mock_feedparse.return_value = mock_feed
+        mock_process.return_value = None
+
+        known_urls = AsyncMock(return_value={"https://example.com/article0", "https://example.com/article2"})
+
+        await parse_news("https://example.com/rss", limit=10, known_urls=known_urls)
+
+        known_urls.assert_called_once_with([e.link for e in entries])
+        mock_process.assert_called_once()
+        assert mock_process.call_args[0][0] == "https://example.com/article1"
+
+    @patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(b"<rss/>", {})))
+    @patch('app.services.news_parser.feedparser.parse')
+    @patch('app.services.news_parser._process_article', new_callable=AsyncMock)
+    async def test_parse_rss_feed_all_known(self, mock_process, mock_feedparse):
+        """Тест что при отсутствии новых ссылок ничего не скачивается."""
+        mock_feed = MagicMock()
+        mock_entry = MagicMock()
+        mock_entry.link = "https://example.com/article1"
+        mock_entry.published_parsed = None
+        mock_feed.entries = [mock_entry]
+        mock_feedparse.return_value = mock_feed
+
+        result = await parse_news("https://example.com/rss", known_urls=AsyncMock(side_effect=lambda urls: set(urls)))
+
+        assert result == []
+        mock_process.assert_not_called()
+
+    @patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(b"<rss/>", {})))
+    @patch('app.services.news_parser._discover_from_sitemaps', new=AsyncMock(return_value=[]))
+    @patch('app.services.news_parser.feedparser.parse')
+    async def test_parse_empty_rss_feed(self, mock_feedparse):
         """Тест парсинга пустого RSS фида."""
         mock_feed = MagicMock()
         mock_feed.entries = []
         mock_feedparse.return_value = mock_feed
 
-        result = parse_news("https://example.com/rss", limit=10)
+        result = await parse_news("https://example.com/rss", limit=10)
 
         assert result == []
 
+    @patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(b"<rss/>", {})))
     @patch('app.services.news_parser.feedparser.parse')
-    def test_parse_invalid_url(self, mock_feedparse):
+    async def test_parse_invalid_url(self, mock_feedparse):
         """Тест обработки невалидного URL."""
         mock_feedparse.side_effect = Exception("Connection error")
 
-        result = parse_news("https://invalid-url.com/rss")
+        result = await parse_news("https://invalid-url.com/rss")
+
+        assert result == []
+
+class TestFastFeedPath:
+    """Тесты быстрого чтения фида через lxml."""
 
-        assert result == []
\ No newline at end of file
+    FEED = (
+        '<?xml version="1.0"?><rss version="2.0"><channel>'
+        + "".join(
+            f"<item><link>https://example.com/{i}</link><category>Science</category></item>"
+            for i in range(50)
+        )
+        + "</channel></rss>"
+    ).encode("utf-8")
+
+    @patch('app.services.news_parser.feedparser.parse')
+    async def test_well_formed_feed_skips_feedparser(self, mock_feedparse):
+        """Тест что корректный RSS читается без feedparser и только до limit."""
+        with patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(self.FEED, {}))):
+            links = await discover_articles("https://example.com/rss", limit=2)
+
+        assert links == [("https://example.com/0", None, "Science"), ("https://example.com/1", None, "Science")]
+        mock_feedparse.assert_not_called()
+
+
+class TestFeedWatermark:
+    """Тесты водяного знака фида."""
+
+    FEED = (
+        '<?xml version="1.0"?><rss version="2.0"><channel>'
+        + "".join(
+            f"<item><link>https://example.com/{i}</link><guid>id-{i}</guid>"
+            f"<pubDate>Sun, 21 Dec 2025 {12 - i:02d}:00:00 GMT</pubDate></item>"
+            for i in range(10)
+        )
+        + "</channel></rss>"
+    ).encode("utf-8")
+
+    async def test_first_poll_sets_watermark(self):
+        """Тест что после записи статей водяной знак берется из самой свежей записи."""
+        state = FeedState()
+        with patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(self.FEED, {}))):
+            links = await discover_articles("https://example.com/rss", limit=5, feed_state=state)
+
+        assert len(links) == 5
+        assert state.watermark_guid is None
+        advance_watermark(state, [link for link, _, _ in links])
+        assert state.watermark_guid == "id-0"
+        assert state.watermark_published_at == datetime(2025, 12, 21, 12, 0, tzinfo=timezone.utc)
+
+    async def test_stops_at_watermark_guid(self):
+        """Тест что чтение фида останавливается на уже виденной записи без запроса к БД."""
+        state = FeedState(watermark_guid="id-2")
+        known_urls = AsyncMock(return_value={"https://example.com/1"})
+        with patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(self.FEED, {}))):
+            links = await discover_articles("https://example.com/rss", limit=10,
+                                            known_urls=known_urls, feed_state=state)
+
+        assert [link for link, _, _ in links] == ["https://example.com/0"]
+        # Уже сохраненная запись тоже пропускается водяным знаком
+        advance_watermark(state, ["https://example.com/0"])
+        assert state.watermark_guid == "id-0"
+
+    async def test_watermark_stops_before_unsaved_entry(self):
+        """Тест что водяной знак не проходит запись, статья которой не сохранена."""
+        state = FeedState()
+        with patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(self.FEED, {}))):
+            await discover_articles("https://example.com/rss", limit=4, feed_state=state)
+
+        advance_watermark(state, ["https://example.com/0", "https://example.com/2", "https://example.com/3"])
+
+        assert state.watermark_guid == "id-2"
+        assert state.watermark_published_at == datetime(2025, 12, 21, 10, 0, tzinfo=timezone.utc)
+
+    async def test_validators_dropped_while_entries_pending(self):
+        """Тест что при несохраненной записи хеш и ETag не сохраняются и фид перечитывается."""
+        state = FeedState()
+        headers = {"ETag": '"v1"', "Last-Modified": "Sun, 21 Dec 2025 12:00:00 GMT"}
+        with patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(self.FEED, headers))):
+            await discover_articles("https://example.com/rss", limit=3, feed_state=state)
+            advance_watermark(state, ["https://example.com/0", "https://example.com/2"])
+
+            assert (state.etag, state.last_modified, state.content_hash) == (None, None, None)
+
+            links = await discover_articles("https://example.com/rss", limit=3, feed_state=state)
+            assert [link for link, _, _ in links] == ["https://example.com/0", "https://example.com/1"]
+            advance_watermark(state, ["https://example.com/0", "https://example.com/1"])
+
+        assert state.etag == '"v1"'
+        assert state.content_hash is not None
+        assert state.watermark_guid == "id-0"
+
+    async def test_watermark_kept_when_oldest_entry_failed(self):
+        """Тест что при ошибке на самой старой записи водяной знак не сдвигается."""
+        state = FeedState(watermark_guid="id-4")
+        with patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(self.FEED, {}))):
+            await discover_articles("https://example.com/rss", limit=10, feed_state=state)
+
+        advance_watermark(state, ["https://example.com/0", "https://example.com/1", "https://example.com/2"])
+
+        assert state.watermark_guid == "id-4"
+        assert state.watermark_published_at is None
+
+    async def test_long_guid_is_hashed(self):
+        """Тест что GUID длиннее колонки хранится хешем и по-прежнему останавливает чтение."""
+        guid = "https://example.com/item?" + "utm=x&" * 100
+        feed = (
+            '<?xml version="1.0"?><rss version="2.0"><channel>'
+            f"<item><link>https://example.com/1</link><guid>{guid}</guid></item>"
+            "<item><link>https://example.com/0</link><guid>id-0</guid></item>"
+            "</channel></rss>"
+        ).encode("utf-8")
+        state = FeedState()
+        with patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(feed, {}))):
+            links = await discover_articles("https://example.com/rss", limit=10, feed_state=state)
+        advance_watermark(state, [link for link, _, _ in links])
+
+        assert len(guid) > news_parser.WATERMARK_GUID_MAX_LENGTH
+        assert len(state.watermark_guid) <= news_parser.WATERMARK_GUID_MAX_LENGTH
+
+        state.content_hash = None
+        with patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(feed, {}))):
+            assert await discover_articles("https://example.com/rss", limit=10, feed_state=state) == []
+
+    @patch('app.services.news_parser.newspaper.build')
+    async def test_unchanged_feed_does_nothing(self, mock_build):
+        """Тест что без новых записей нет ни загрузок, ни запросов к БД, ни fallback на HTML."""
+        state = FeedState(watermark_published_at=datetime(2025, 12, 21, 12, 0))
+        known_urls = AsyncMock()
+        with patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(self.FEED, {}))):
+            links = await discover_articles("https://example.com/rss", limit=10,
+                                            known_urls=known_urls, feed_state=state)
+
+        assert links == []
+        known_urls.assert_not_called()
+        mock_build.assert_not_called()
+        assert state.watermark_guid is None
+
+
+def sitemap_response(body: bytes):
+    response = MagicMock(content=body)
+    response.raise_for_status = Mock()
+    return response
+
+
+class TestSitemapDiscovery:
+    """Тесты поиска статей по sitemap для источников без фида."""
+
+    HOME = b"<html><body><a href='/news/1'>1</a></body></html>"
+    INDEX = (
+        b'<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        b"<sitemap><loc>https://example.com/sitemap-old.xml</loc><lastmod>2025-11-01</lastmod></sitemap>"
+        b"<sitemap><loc>https://example.com/sitemap-new.xml</loc><lastmod>2025-12-21</lastmod></sitemap>"
+        b"</sitemapindex>"
+    )
+    NEW = (
+        b'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        b"<url><loc>https://example.com/news/1</loc><lastmod>2025-12-20T10:00:00Z</lastmod></url>"
+        b"<url><loc>https://example.com/news/2</loc><lastmod>2025-12-21T10:00:00Z</lastmod></url>"
+        b"</urlset>"
+    )
+
+    def make_fetcher(self, pages, sitemaps=None):
+        async def get(url, **kwargs):
+            if url not in pages:
+                raise Exception("404 Not Found")
+            return sitemap_response(pages[url])
+
+        fetcher = MagicMock()
+        fetcher.sitemaps = AsyncMock(return_value=sitemaps or [])
+        fetcher.get = AsyncMock(side_effect=get)
+        return fetcher
+
+    @patch('app.services.news_parser.newspaper.build')
+    async def test_sitemap_index_from_robots(self, mock_build):
+        """Тест что читается только свежий вложенный sitemap, статьи - от новых к старым."""
+        fetcher = self.make_fetcher(
+            {"https://example.com/sitemap_index.xml": self.INDEX, "https://example.com/sitemap-new.xml": self.NEW},
+            sitemaps=["https://example.com/sitemap_index.xml"],
+        )
+        state = FeedState(watermark_published_at=datetime(2025, 12, 1))
+        with patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(self.HOME, {}))), \
+                patch('app.services.news_parser.get_fetcher', return_value=fetcher):
+            links = await discover_articles("https://example.com/", limit=10, feed_state=state)
+
+        assert [link for link, _, _ in links] == ["https://example.com/news/2", "https://example.com/news/1"]
+        fetched = [call.args[0] for call in fetcher.get.call_args_list]
+        assert "https://example.com/sitemap-old.xml" not in fetched
+        advance_watermark(state, [link for link, _, _ in links])
+        assert state.watermark_published_at == datetime(2025, 12, 21, 10, 0, tzinfo=timezone.utc)
+        mock_build.assert_not_called()
+
+    @patch('app.services.news_parser.newspaper.build')
+    async def test_sitemap_without_new_entries(self, mock_build):
+        """Тест что sitemap без новых статей не приводит к newspaper.build."""
+        fetcher = self.make_fetcher({"https://example.com/sitemap.xml": self.NEW})
+        state = FeedState(watermark_published_at=datetime(2025, 12, 21, 10, 0))
+        with patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(self.HOME, {}))), \
+                patch('app.services.news_parser.get_fetcher', return_value=fetcher):
+            links = await discover_articles("https://example.com/", limit=10, feed_state=state)
+
+        assert links == []
+        mock_build.assert_not_called()
+
+    @patch('app.services.news_parser.newspaper.build')
+    async def test_build_result_is_cached(self, mock_build):
+        """Тест что без sitemap newspaper.build вызывается один раз, дальше ссылки берутся из кеша."""
+        mock_build.return_value = MagicMock(articles=[MagicMock(url="https://example.com/a1")])
+        cache = {}
+        redis = MagicMock()
+        redis.get = AsyncMock(side_effect=lambda key: cache.get(key))
+        redis.set = AsyncMock(side_effect=lambda key, value, ex=None: cache.__setitem__(key, value))
+        fetcher = self.make_fetcher({})
+
+        with patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(self.HOME, {}))), \
+                patch('app.services.news_parser.get_fetcher', return_value=fetcher), \
+                patch('app.services.news_parser.get_redis', return_value=redis):
+            first = await discover_articles("https://example.com/", limit=10)
+            second = await discover_articles("https://example.com/", limit=10)
+
+        assert first == second == [("https://example.com/a1", None, None)]
+        mock_build.assert_called_once()
+
+
+class TestFeedCache:
+    """Тесты для условного GET фида."""
+
+    @patch('app.services.news_parser.feedparser.parse')
+    @patch('app.services.news_parser._fetch_feed', new_callable=AsyncMock, return_value=(None, {}))
+    async def test_not_modified_skips_source(self, mock_fetch, mock_feedparse):
+        """Тест что при 304 источник пропускается."""
+        state = FeedState(etag='"abc"', last_modified="Sat, 20 Dec 2025 12:00:00 GMT")
+
+        result = await parse_news("https://example.com/rss", feed_state=state)
+
+        assert result == []
+        assert state.not_modified is True
+        mock_fetch.assert_called_once_with("https://example.com/rss", state)
+        mock_feedparse.assert_not_called()
+
+    @patch('app.services.news_parser.feedparser.parse')
+    @patch('app.services.news_parser._fetch_feed', new_callable=AsyncMock, return_value=(b"<rss>same</rss>", {}))
+    async def test_same_hash_skips_source(self, mock_fetch, mock_feedparse):
+        """Тест что при совпадении хеша фид не разбирается."""
+        import hashlib
+        state = FeedState(content_hash=hashlib.sha256(b"<rss>same</rss>").hexdigest())
+
+        result = await parse_news("https://example.com/rss", feed_state=state)
+
+        assert result == []
+        assert state.not_modified is True
+        mock_feedparse.assert_not_called()
+
+    @patch('app.services.news_parser._process_article', new_callable=AsyncMock, return_value=None)
+    @patch('app.services.news_parser.feedparser.parse')
+    @patch('app.services.news_parser._fetch_feed', new_callable=AsyncMock)
+    async def test_state_updated_after_fetch(self, mock_fetch, mock_feedparse, mock_process):
+        """Тест что валидаторы сохраняются после успешного опроса."""
+        mock_fetch.return_value = (b"<rss>new</rss>", {"ETag": '"v2"', "Last-Modified": "Sun, 21 Dec 2025 12:00:00 GMT"})
+        mock_entry = MagicMock()
+        mock_entry.link = "https://example.com/article1"
+        mock_entry.published_parsed = None
+        mock_feedparse.return_value = MagicMock(entries=[mock_entry])
+        state = FeedState(etag='"v1"')
+
+        await parse_news("https://example.com/rss", feed_state=state)
+
+        assert state.not_modified is False
+        assert state.etag == '"v2"'
+        assert state.last_modified == "Sun, 21 Dec 2025 12:00:00 GMT"
+        assert state.content_hash is not None
+
+
+    @patch('app.services.news_parser._process_article', new_callable=AsyncMock, return_value=None)
+    @patch('app.services.news_parser.feedparser.parse')
+    @patch('app.services.news_parser._fetch_feed', new_callable=AsyncMock)
+    async def test_oversized_validators_are_dropped(self, mock_fetch, mock_feedparse, mock_process):
+        """Тест что ETag и Last-Modified длиннее колонок Source не сохраняются."""
+        mock_fetch.return_value = (b"<rss>new</rss>", {"ETag": '"' + "e" * 300 + '"',
+                                                       "Last-Modified": "x" * 100})
+        mock_feedparse.return_value = MagicMock(entries=[MagicMock(link="https://example.com/a",
+                                                                   published_parsed=None)])
+        state = FeedState(etag='"v1"', last_modified="Sat, 20 Dec 2025 12:00:00 GMT")
+
+        await parse_news("https://example.com/rss", feed_state=state)
+
+        assert state.etag is None
+        assert state.last_modified is None
+        assert state.content_hash is not None
+
+
+class TestExtractArticle:
+    """Тесты разбора уже скачанного HTML."""
+
+    HTML = (
+        "<html><head><title>Test Article</title></head><body><article>"
+        "<h1>Test Article</h1>"
+        + "<p>" + "Это содержательный текст новости для проверки разбора. " * 10 + "</p>"
+        + "<p>" + "Второй абзац с дополнительными подробностями события. " * 10 + "</p>"
+        "</article></body></html>"
+    )
+
+    def test_extract_article_from_html(self):
+        """Тест что статья разбирается без сетевых запросов."""
+        result = _extract_article(
+            "https://example.com/article1", self.HTML,
+            rss_date=datetime(2025, 12, 20, 12, 0, 0), rss_category="technology",
+        )
+
+        assert result["title"] == "Test Article"
+        assert len(result["text"]) > 100
+        assert result["published_at"].tzinfo == timezone.utc
+        assert result["topic"] == "Technology"
+
+    def test_extract_article_too_short(self):
+        """Тест что страница-заглушка отбрасывается."""
+        html = "<html><body><p>Short</p></body></html>"
+        assert _extract_article("https://example.com/stub", html) is None
+
+    async def test_process_article_uses_shared_fetcher(self):
+        """Тест что HTML скачивается через общий fetcher."""
+        fetcher = MagicMock()
+        fetcher.fetch_html = AsyncMock(return_value=self.HTML)
+        with patch('app.services.news_parser.get_fetcher', return_value=fetcher):
+            result = await _process_article("https://example.com/article1")
+
+        fetcher.fetch_html.assert_awaited_once_with("https://example.com/article1")
+        assert result["url"] == "https://example.com/article1"
+
+    async def test_downloaded_html_is_stored(self, tmp_path):
+        """Тест что скачанная страница сохраняется в хранилище HTML."""
+        from app.services.html_store import HtmlStore
+
+        store = HtmlStore(tmp_path, max_bytes=10 ** 6)
+        fetcher = MagicMock()
+        fetcher.fetch_html = AsyncMock(return_value=self.HTML)
+        with patch('app.services.news_parser.get_fetcher', return_value=fetcher), \
+                patch('app.services.news_parser.get_html_store', return_value=store):
+            html = await download_article("https://example.com/article1")
+
+        assert store.get("https://example.com/article1") == html == self.HTML
+
+
+class TestExtractionPool:
+    """Тесты вынесения разбора HTML в пул процессов."""
+
+    @pytest.fixture(autouse=True)
+    def reset_pool(self):
+        news_parser._reset_extraction_pool()
+        yield
+        news_parser._reset_extraction_pool()
+
+    async def test_extraction_runs_in_process_pool(self):
+        """Тест что разбор выполняется в отдельном процессе и результат передается обратно."""
+        with patch.object(news_parser.settings, "EXTRACTION_PROCESSES", 1):
+            result = await _run_extraction(
+                "https://example.com/article1", TestExtractArticle.HTML,
+                datetime(2025, 12, 20, 12, 0, 0), "technology", "ru",
+            )
+            pool = news_parser._extraction_pool
+
+        assert pool is not None
+        assert result["title"] == "Test Article"
+        assert result["published_at"].tzinfo == timezone.utc
+
+    async def test_extraction_without_pool_uses_thread(self):
+        """Тест что при EXTRACTION_PROCESSES=0 пул не создается."""
+        with patch.object(news_parser.settings, "EXTRACTION_PROCESSES", 0):
+            result = await _run_extraction(
+                "https://example.com/article1", TestExtractArticle.HTML, None, None, "ru",
+            )
+
+        assert news_parser._extraction_pool is None
+        assert result["title"] == "Test Article"
+
+    async def test_broken_pool_falls_back_to_thread(self):
+        """Тест что упавший пул пересоздается, а статья разбирается в потоке."""
+        pool = MagicMock()
+        pool.submit.side_effect = BrokenProcessPool()
+        news_parser._extraction_pool = pool
+
+        result = await _run_extraction(
+            "https://example.com/article1", TestExtractArticle.HTML, None, None, "ru",
+        )
+
+        pool.shutdown.assert_called_once()
+        assert news_parser._extraction_pool is None
+        assert result["title"] == "Test Article"
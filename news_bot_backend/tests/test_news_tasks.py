@@ -2,95 +2,262 @@
 import pytest
 import pytest_asyncio
 from unittest.mock import AsyncMock, patch, MagicMock
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from app.tasks.news_tasks import (
-    _to_naive_utc,
-    _get_or_create_topic,
+    _get_known_urls,
+    _ingest_source,
+    _summarize_results,
+    process_source,
+    process_user_news,
     run_async,
+    run_news_pipeline,
 )
-from app.models import Topic, Source, Articles
+from app.models import Topic, Source, Articles, UserSources
+from app.services.ml_client import AnalysisResult
+from sqlalchemy import select
 
 
-class TestToNaiveUtc:
-    """Тесты для функции _to_naive_utc."""
+@pytest.mark.asyncio
+class TestGetKnownUrls:
+    """Тесты для функции _get_known_urls."""
+
+    async def test_empty_urls(self):
+        """Тест что пустой список не обращается к БД."""
+        mock_session = MagicMock()
+        result = await _get_known_urls(mock_session, [])
+
+        assert result == set()
+        mock_session.execute.assert_not_called()
+
+    async def test_single_bulk_query(self):
+        """Тест что все ссылки проверяются одним запросом."""
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = ["https://example.com/a"]
+        mock_session = MagicMock()
+        mock_session.execute = AsyncMock(return_value=mock_result)
+
+        result = await _get_known_urls(
+            mock_session, ["https://example.com/a", "https://example.com/b"]
+        )
+
+        assert result == {"https://example.com/a"}
+        mock_session.execute.assert_awaited_once()
+
+
+class TestIngestFanOut:
+    """Тесты для раскладки загрузки по источникам."""
+
+    @patch('app.tasks.news_tasks.chord')
+    @patch('app.tasks.news_tasks._claim_due_source_ids', new_callable=AsyncMock)
+    def test_run_news_pipeline_dispatches_one_task_per_source(self, mock_ids, mock_chord):
+        """Тест что на каждый источник создается отдельная задача."""
+        mock_ids.return_value = [1, 2, 3]
 
-    def test_to_naive_utc_with_aware_datetime(self):
-        """Тест конвертации aware datetime в naive UTC."""
-        aware_dt = datetime(2025, 12, 20, 12, 0, 0, tzinfo=timezone.utc)
-        result = _to_naive_utc(aware_dt)
+        result = run_news_pipeline()
 
-        assert result.tzinfo is None
-        assert result.year == 2025
-        assert result.month == 12
-        assert result.day == 20
+        assert result == {"sources": 3}
+        header = mock_chord.call_args[0][0]
+        assert [sig.args[0] for sig in header] == [1, 2, 3]
+        mock_chord.return_value.assert_called_once()
 
-    def test_to_naive_utc_with_naive_datetime(self):
-        """Тест что naive datetime остается без изменений."""
-        naive_dt = datetime(2025, 12, 20, 12, 0, 0)
-        result = _to_naive_utc(naive_dt)
+    @patch('app.tasks.news_tasks.chord')
+    @patch('app.tasks.news_tasks._claim_due_source_ids', new_callable=AsyncMock)
+    def test_run_news_pipeline_no_sources(self, mock_ids, mock_chord):
+        """Тест что без активных источников chord не запускается."""
+        mock_ids.return_value = []
 
-        assert result == naive_dt
-        assert result.tzinfo is None
+        assert run_news_pipeline() == {"sources": 0}
+        mock_chord.assert_not_called()
 
-    def test_to_naive_utc_with_none(self):
-        """Тест что None возвращается как есть."""
-        assert _to_naive_utc(None) is None
+    def test_summarize_results(self):
+        """Тест подсчета итогов прогона."""
+        results = [
+            {"source_id": 1, "status": "ok", "added": 3},
+            {"source_id": 2, "status": "error", "added": 0},
+            {"source_id": 3, "status": "skipped", "added": 0},
+            None,
+        ]
+
+        totals = _summarize_results(results, started_at=0)
+
+        assert totals["sources"] == 3
+        assert totals["failed"] == 1
+        assert totals["failed_source_ids"] == [2]
+        assert totals["articles"] == 3
+
+
+def _feed(*ids):
+    items = "".join(
+        f"<item><link>https://example.com/{i}</link><guid>g{i}</guid>"
+        f"<pubDate>Sun, 21 Dec 2025 {10 + i:02d}:00:00 GMT</pubDate></item>"
+        for i in ids
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>'.encode("utf-8")
 
 
 @pytest.mark.asyncio
-class TestGetOrCreateTopic:
-    """Тесты для функции _get_or_create_topic."""
-
-    @pytest.mark.skip(reason="Requires database connection - use integration tests")
-    async def test_get_existing_topic(self, test_db_session):
-        """Тест получения существующего топика."""
-        # Создаем топик
-        topic = Topic(name="Technology")
-        test_db_session.add(topic)
-        await test_db_session.commit()
-        await test_db_session.refresh(topic)
-
-        result = await _get_or_create_topic(test_db_session, "Technology")
-
-        assert result == topic.id
-
-    @pytest.mark.skip(reason="Requires database connection - use integration tests")
-    async def test_create_new_topic(self, test_db_session):
-        """Тест создания нового топика."""
-        result = await _get_or_create_topic(test_db_session, "Science")
-
-        assert result is not None
-        # Проверяем что топик создан
-        from sqlalchemy import select
-        stmt = select(Topic).where(Topic.name == "Science")
-        topic_result = await test_db_session.execute(stmt)
-        topic = topic_result.scalar_one()
-        assert topic.id == result
-
-    async def test_get_or_create_topic_empty_string(self):
-        """Тест с пустой строкой."""
-        # Мокируем сессию
-        mock_session = MagicMock()
-        result = await _get_or_create_topic(mock_session, "")
+class TestWatermarkAfterPersist:
+    """Тесты сдвига водяного знака только по записанным статьям."""
 
-        assert result is None
-        # Проверяем что execute не вызывался
-        mock_session.execute.assert_not_called()
+    @staticmethod
+    def _extract(failing):
+        async def extract(url, html, rss_date, rss_category, lang):
+            if url in failing:
+                return None
+            return {"title": url, "text": "Текст новости " * 10, "image_url": None,
+                    "published_at": rss_date, "url": url}
+        return extract
+
+    async def _poll(self, session, source, feed, failing=(), headers=None):
+        fetcher = MagicMock()
+        fetcher.fetch_html = AsyncMock(side_effect=lambda url: f"<html>{url}</html>")
+        with patch('app.services.news_parser._fetch_feed', new=AsyncMock(return_value=(feed, headers or {}))), \
+                patch('app.services.news_parser.get_fetcher', return_value=fetcher), \
+                patch('app.services.ingest_pipeline._run_extraction', new=self._extract(set(failing))), \
+                patch('app.services.ingest_pipeline.analyze_batch',
+                      new=AsyncMock(side_effect=lambda texts: [AnalysisResult(summary="s") for _ in texts])):
+            added = await _ingest_source(session, source, limit=10)
+        await session.commit()
+        return added
+
+    async def test_failed_entry_is_retried(self, sqlite_session):
+        """Тест что статья, которую не удалось разобрать, загружается при следующем опросе."""
+        source = Source(id=1, source_url="https://example.com/rss", language="ru", is_active=True)
+        sqlite_session.add(source)
+        await sqlite_session.commit()
+
+        added = await self._poll(sqlite_session, source, _feed(2, 1), failing={"https://example.com/1"})
+        assert added == 1
+        assert source.watermark_guid is None
+
+        added = await self._poll(sqlite_session, source, _feed(3, 2, 1))
+        assert added == 2
+        assert source.watermark_guid == "g3"
+        assert source.watermark_published_at == datetime(2025, 12, 21, 13, 0)
+        urls = (await sqlite_session.execute(select(Articles.url))).scalars().all()
+        assert sorted(urls) == [f"https://example.com/{i}" for i in (1, 2, 3)]
+
+    async def test_failed_entry_is_retried_from_unchanged_feed(self, sqlite_session):
+        """Тест что неизменный фид не отсекается по хешу, пока в нем есть несохраненные записи."""
+        source = Source(id=1, source_url="https://example.com/rss", language="ru", is_active=True)
+        sqlite_session.add(source)
+        await sqlite_session.commit()
+        feed, headers = _feed(2, 1), {"ETag": '"v1"'}
+
+        added = await self._poll(sqlite_session, source, feed, failing={"https://example.com/1"}, headers=headers)
+        assert added == 1
+        assert source.feed_hash is None
+        assert source.feed_etag is None
+
+        added = await self._poll(sqlite_session, source, feed, headers=headers)
+        assert added == 1
+        assert source.feed_hash is not None
+        assert source.feed_etag == '"v1"'
+        assert source.watermark_guid == "g2"
+
+        # Все записи сохранены: тот же фид теперь пропускается по хешу
+        assert await self._poll(sqlite_session, source, feed, headers=headers) == 0
+        urls = (await sqlite_session.execute(select(Articles.url))).scalars().all()
+        assert sorted(urls) == ["https://example.com/1", "https://example.com/2"]
+
+    async def test_oversized_url_does_not_block_watermark(self, sqlite_session):
+        """Тест что статья с url длиннее колонки пропускается и не держит фид непрочитанным."""
+        source = Source(id=1, source_url="https://example.com/rss", language="ru", is_active=True)
+        sqlite_session.add(source)
+        await sqlite_session.commit()
+        long_link = "https://example.com/" + "x" * 300
+        feed = _feed(1).replace(b"</channel>", f"<item><link>{long_link}</link><guid>g0</guid></item></channel>".encode())
+
+        added = await self._poll(sqlite_session, source, feed)
+
+        assert added == 1
+        assert source.watermark_guid == "g1"
+        assert source.feed_hash is not None
+
+
+@pytest.mark.asyncio
+class TestProcessSourceCircuitBreaker:
+    """Тесты учета ошибок опроса источника."""
+
+    @pytest_asyncio.fixture
+    async def session_factory(self, sqlite_session_factory):
+        async with sqlite_session_factory() as session:
+            session.add(Source(id=1, source_url="https://example.com/rss", language="ru", is_active=True))
+            await session.commit()
+        with patch('app.tasks.news_tasks.AsyncSessionLocal', sqlite_session_factory), \
+                patch('app.tasks.news_tasks.acquire_source_lock', new=AsyncMock(return_value="token")), \
+                patch('app.tasks.news_tasks.release_source_lock', new_callable=AsyncMock):
+            yield sqlite_session_factory
+
+    @patch('app.tasks.news_tasks._ingest_source', new_callable=AsyncMock)
+    async def test_error_is_recorded(self, mock_ingest, session_factory):
+        """Тест что ошибка сохраняется на источнике после rollback."""
+        mock_ingest.side_effect = RuntimeError("boom")
+
+        result = await process_source(1, limit=10)
+
+        assert result["status"] == "error"
+        async with session_factory() as session:
+            source = await session.get(Source, 1)
+            assert source.failure_count == 1
+            assert source.last_error == "RuntimeError: boom"
+            assert source.next_fetch_at is not None
+
+    @patch('app.tasks.news_tasks._ingest_source', new_callable=AsyncMock)
+    async def test_tripped_source_is_not_polled(self, mock_ingest, session_factory):
+        """Тест что источник с открытой цепью не опрашивается."""
+        async with session_factory() as session:
+            source = await session.get(Source, 1)
+            source.circuit_state = "open"
+            source.circuit_open_until = datetime(2999, 1, 1)
+            await session.commit()
+
+        result = await process_source(1, limit=10)
+
+        assert result["status"] == "tripped"
+        mock_ingest.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+class TestUserSync:
+    """Тесты синхронизации источников пользователя."""
+
+    @pytest_asyncio.fixture
+    async def session_factory(self, sqlite_session_factory):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        async with sqlite_session_factory() as session:
+            session.add_all([
+                Source(id=1, source_url="https://stale.com/rss", is_active=True,
+                       last_fetched_at=now - timedelta(hours=1)),
+                Source(id=2, source_url="https://fresh.com/rss", is_active=True,
+                       last_fetched_at=now - timedelta(minutes=1)),
+                Source(id=3, source_url="https://busy.com/rss", is_active=True),
+            ])
+            session.add_all([UserSources(user_id=1, source_id=i) for i in (1, 2, 3)])
+            await session.commit()
+        with patch('app.tasks.news_tasks.AsyncSessionLocal', sqlite_session_factory):
+            yield sqlite_session_factory
+
+    @patch('app.tasks.news_tasks.wait_source_locks', new_callable=AsyncMock)
+    @patch('app.tasks.news_tasks.release_source_lock', new_callable=AsyncMock)
+    @patch('app.tasks.news_tasks.acquire_source_lock', new_callable=AsyncMock)
+    @patch('app.tasks.news_tasks._ingest_sources', new_callable=AsyncMock)
+    async def test_only_stale_free_sources_are_fetched(self, mock_ingest, mock_acquire, mock_release,
+                                                       mock_wait, session_factory):
+        """Тест что свежие источники пропускаются, а занятые - дожидаются."""
+        mock_acquire.side_effect = lambda source_id: None if source_id == 3 else "token"
+        mock_ingest.return_value = {1: 0}
+        mock_wait.return_value = True
+
+        result = await process_user_news(1)
 
-    @pytest.mark.skip(reason="Requires database connection - use integration tests")
-    async def test_get_or_create_topic_long_name(self, test_db_session):
-        """Тест обрезки длинного имени топика."""
-        long_name = "a" * 100
-        result = await _get_or_create_topic(test_db_session, long_name)
-
-        assert result is not None
-        # Проверяем что имя обрезано
-        from sqlalchemy import select
-        stmt = select(Topic).where(Topic.id == result)
-        topic_result = await test_db_session.execute(stmt)
-        topic = topic_result.scalar_one()
-        assert len(topic.name) == 50
+        assert result == "Sync completed for user 1"
+        fetched = mock_ingest.call_args[0][1]
+        assert [source.id for source in fetched] == [1]
+        mock_release.assert_awaited_once_with(1, "token")
+        mock_wait.assert_awaited_once()
+        assert mock_wait.call_args[0][0] == [3]
 
 
 class TestRunAsync:
@@ -0,0 +1,46 @@
+# news_bot_backend/tests/test_poll_schedule.py
+from datetime import datetime, timedelta
+
+from app.services.poll_schedule import compute_poll_interval
+
+
+def hourly(count):
+    start = datetime(2025, 12, 20, 12, 0, 0)
+    return [start - timedelta(hours=i) for i in range(count)]
+
+
+class TestComputePollInterval:
+    """Тесты для адаптивного интервала опроса."""
+
+    def test_interval_from_publish_cadence(self):
+        """Тест что интервал равен половине типичного промежутка публикаций."""
+        interval = compute_poll_interval(hourly(10), new_articles=3, limit=10)
+        assert interval == timedelta(minutes=30)
+
+    def test_default_without_history(self):
+        """Тест интервала по умолчанию для нового источника."""
+        interval = compute_poll_interval([], new_articles=0, limit=10)
+        assert interval == timedelta(minutes=30)
+
+    def test_backoff_without_new_articles(self):
+        """Тест что пустой опрос увеличивает интервал."""
+        interval = compute_poll_interval([], new_articles=0, limit=10, previous=timedelta(hours=2))
+        assert interval == timedelta(hours=3)
+
+    def test_full_limit_shortens_interval(self):
+        """Тест что полный лимит новых статей сокращает интервал."""
+        interval = compute_poll_interval(hourly(10), new_articles=10, limit=10)
+        assert interval == timedelta(minutes=15)
+
+    def test_interval_is_clamped(self):
+        """Тест ограничения интервала сверху и снизу."""
+        wire = [datetime(2025, 12, 20, 12, 0, 0) - timedelta(seconds=30 * i) for i in range(10)]
+        weekly = [datetime(2025, 12, 20) - timedelta(weeks=i) for i in range(5)]
+
+        assert compute_poll_interval(wire, new_articles=10, limit=10) == timedelta(minutes=5)
+        assert compute_poll_interval(weekly, new_articles=1, limit=10) == timedelta(days=1)
+
+    def test_ignores_missing_dates(self):
+        """Тест что статьи без даты не ломают расчет."""
+        interval = compute_poll_interval([None, *hourly(3), None], new_articles=1, limit=10)
+        assert interval == timedelta(minutes=30)
@@ -0,0 +1,71 @@
+# news_bot_backend/tests/test_sitemap_reader.py
+import gzip
+from datetime import datetime, timezone
+
+from app.services.sitemap_reader import read_sitemap
+
+NEWS_SITEMAP = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">
+  <url>
+    <loc>https://example.com/news/1</loc>
+    <lastmod>2025-12-01</lastmod>
+    <news:news>
+      <news:publication>
+        <news:name>Example</news:name>
+        <news:language>ru</news:language>
+      </news:publication>
+      <news:publication_date>2025-12-20T09:00:00+03:00</news:publication_date>
+      <news:title>Новость</news:title>
+    </news:news>
+  </url>
+  <url>
+    <loc>https://example.com/news/2</loc>
+    <lastmod>2025-12-19T10:00:00Z</lastmod>
+  </url>
+  <url><loc>https://example.com/about</loc></url>
+</urlset>""".encode("utf-8")
+
+SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/sitemap-2025-12.xml</loc><lastmod>2025-12-20</lastmod></sitemap>
+  <sitemap><loc>https://example.com/sitemap-2025-11.xml</loc></sitemap>
+</sitemapindex>"""
+
+
+class TestReadSitemap:
+    """Тесты чтения sitemap."""
+
+    def test_news_sitemap(self):
+        """Тест что дата берется из news:publication_date, иначе из lastmod."""
+        sitemap = read_sitemap(NEWS_SITEMAP)
+
+        assert [entry.link for entry in sitemap.urls] == [
+            "https://example.com/news/1", "https://example.com/news/2", "https://example.com/about",
+        ]
+        assert sitemap.urls[0].published == datetime(2025, 12, 20, 6, 0, tzinfo=timezone.utc)
+        assert sitemap.urls[1].published == datetime(2025, 12, 19, 10, 0, tzinfo=timezone.utc)
+        assert sitemap.urls[2].published is None
+        assert sitemap.children == []
+
+    def test_sitemap_index(self):
+        """Тест чтения индекса sitemap-ов."""
+        sitemap = read_sitemap(SITEMAP_INDEX)
+
+        assert sitemap.urls == []
+        assert [child.link for child in sitemap.children] == [
+            "https://example.com/sitemap-2025-12.xml", "https://example.com/sitemap-2025-11.xml",
+        ]
+        assert sitemap.children[0].published == datetime(2025, 12, 20, tzinfo=timezone.utc)
+
+    def test_gzipped_sitemap(self):
+        """Тест что sitemap.xml.gz распаковывается."""
+        sitemap = read_sitemap(gzip.compress(NEWS_SITEMAP))
+
+        assert len(sitemap.urls) == 3
+
+    def test_not_a_sitemap(self):
+        """Тест что HTML и RSS не принимаются за sitemap."""
+        assert read_sitemap(b"<html><body>Not found</body></html>") is None
+        assert read_sitemap(b'<?xml version="1.0"?><rss version="2.0"><channel/></rss>') is None
+        assert read_sitemap(b"") is None
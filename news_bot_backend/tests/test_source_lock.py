@@ -0,0 +1,74 @@
+# news_bot_backend/tests/test_source_lock.py
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.source_lock import (
+    NO_LOCK,
+    acquire_source_lock,
+    release_source_lock,
+    wait_source_locks,
+)
+
+
+@pytest.fixture
+def redis():
+    client = MagicMock()
+    with patch('app.services.source_lock.get_redis', return_value=client):
+        yield client
+
+
+@pytest.mark.asyncio
+class TestSourceLock:
+    """Тесты для single-flight лока опроса источника."""
+
+    async def test_acquire_free_lock(self, redis):
+        """Тест что свободный лок берется через SET NX с TTL."""
+        redis.set = AsyncMock(return_value=True)
+
+        token = await acquire_source_lock(7)
+
+        assert token
+        args, kwargs = redis.set.call_args
+        assert args == ("source:fetch:7", token)
+        assert kwargs["nx"] is True
+        assert kwargs["ex"] > 0
+
+    async def test_acquire_busy_lock(self, redis):
+        """Тест что занятый лок не берется."""
+        redis.set = AsyncMock(return_value=None)
+        assert await acquire_source_lock(7) is None
+
+    async def test_redis_down_fetches_without_lock(self, redis):
+        """Тест что без Redis источник опрашивается без лока."""
+        redis.set = AsyncMock(side_effect=ConnectionError("down"))
+        redis.eval = AsyncMock()
+
+        token = await acquire_source_lock(7)
+        await release_source_lock(7, token)
+
+        assert token == NO_LOCK
+        redis.eval.assert_not_called()
+
+    async def test_release_checks_owner(self, redis):
+        """Тест что снимается только свой лок."""
+        redis.eval = AsyncMock(return_value=1)
+
+        await release_source_lock(7, "token")
+
+        args = redis.eval.call_args[0]
+        assert args[1:] == (1, "source:fetch:7", "token")
+
+    async def test_wait_until_released(self, redis):
+        """Тест ожидания чужого опроса."""
+        redis.exists = AsyncMock(side_effect=[1, 0])
+
+        with patch('app.services.source_lock.LOCK_POLL_INTERVAL', 0):
+            assert await wait_source_locks([3], timeout=5)
+        assert redis.exists.await_count == 2
+
+    async def test_wait_timeout(self, redis):
+        """Тест что ожидание ограничено по времени."""
+        redis.exists = AsyncMock(return_value=1)
+
+        with patch('app.services.source_lock.LOCK_POLL_INTERVAL', 0):
+            assert not await wait_source_locks([3], timeout=0)
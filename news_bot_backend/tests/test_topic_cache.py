@@ -0,0 +1,61 @@
+# news_bot_backend/tests/test_topic_cache.py
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy import select
+
+from app.models import Topic
+from app.services.topic_cache import TopicCache, invalidate_topic_cache
+
+
+@pytest.mark.asyncio
+class TestTopicCache:
+    """Тесты для кеша топиков."""
+
+    async def test_resolve_creates_missing_topics(self, sqlite_session_factory):
+        """Тест что недостающие топики создаются, а существующие переиспользуются."""
+        async with sqlite_session_factory() as session:
+            session.add(Topic(name="Technology"))
+            await session.commit()
+
+        cache = TopicCache(sqlite_session_factory)
+        result = await cache.resolve(["Technology", "Science"])
+
+        async with sqlite_session_factory() as session:
+            topics = {t.name: t.id for t in (await session.execute(select(Topic))).scalars()}
+        assert result == topics
+        assert len(topics) == 2
+
+    async def test_resolve_uses_cache(self):
+        """Тест что повторные имена не обращаются к БД."""
+        cache = TopicCache(MagicMock())
+        cache._ids = {"Technology": 1}
+
+        assert await cache.resolve(["Technology"]) == {"Technology": 1}
+        cache._session_factory.assert_not_called()
+
+    async def test_sync_clears_on_new_generation(self):
+        """Тест что кеш сбрасывается после удаления топика в другом процессе."""
+        cache = TopicCache(MagicMock())
+        redis = MagicMock()
+        redis.get = AsyncMock(return_value="1")
+
+        with patch('app.services.topic_cache.get_redis', return_value=redis):
+            await cache.sync()
+            cache._ids = {"Technology": 1}
+            await cache.sync()
+            assert cache._ids == {"Technology": 1}
+
+            redis.get.return_value = "2"
+            await cache.sync()
+            assert cache._ids == {}
+
+    async def test_invalidate_bumps_generation(self):
+        """Тест что удаление топика публикует новое поколение кеша."""
+        redis = MagicMock()
+        redis.incr = AsyncMock()
+
+        with patch('app.services.topic_cache.get_redis', return_value=redis):
+            await invalidate_topic_cache()
+
+        redis.incr.assert_awaited_once()
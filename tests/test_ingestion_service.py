@@ -32,11 +32,14 @@ async def test_ingest_sources_deduplicates(session_factory, monkeypatch):
         ]
         monkeypatch.setattr("app.services.news_ingestion.parse_news", lambda *_, **__: fake_articles)
 
-        async def fake_analyze(*args, **kwargs):
+        async def fake_analyze_batch(texts, *args, **kwargs):
             sentiment = types.SimpleNamespace(label="neutral", score=0.5)
-            return types.SimpleNamespace(summary="Summary", sentiment=sentiment, entities=[])
+            return [types.SimpleNamespace(summary="Summary", sentiment=sentiment, entities=[]) for _ in texts]
 
-        monkeypatch.setattr("app.services.news_ingestion.ml_client", types.SimpleNamespace(analyze=fake_analyze))
+        monkeypatch.setattr(
+            "app.services.news_ingestion.ml_client",
+            types.SimpleNamespace(analyze_batch=fake_analyze_batch),
+        )
 
         created = await news_ingestion.ingest_sources(session, source_ids=[source.id], limit=5)
         assert len(created) == 1